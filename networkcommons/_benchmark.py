@@ -0,0 +1,527 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Benchmarks of the inference methods and evaluation metrics.
+
+The benchmarks run offline, on synthetic signed scale-free prior knowledge
+networks (PKNs) of fixed sizes, with seeded source and target sets, hence
+their results are comparable across versions and machines. Run them from
+the command line::
+
+    python -m networkcommons._benchmark --output results.json
+    python -m networkcommons._benchmark --baseline results.json
+
+The second call exits with a non-zero status if any benchmark is slower
+or uses more memory than in the baseline, beyond the thresholds.
+"""
+
+from __future__ import annotations
+
+__all__ = [
+    'BENCHMARKS',
+    'SIZES',
+    'compare',
+    'load_results',
+    'run_benchmarks',
+    'save_results',
+    'synthetic_inputs',
+    'synthetic_pkn',
+]
+
+from collections.abc import Callable
+import os
+import sys
+import json
+import time
+import argparse
+import functools as ft
+import platform
+import statistics
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from networkcommons import _metadata
+from networkcommons.eval import _metrics
+from networkcommons.methods import _graph, _moon
+from networkcommons._session import _log
+
+SIZES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+}
+
+# new edges per node in the preferential attachment, which gives a mean
+# degree close to that of OmniPath
+_ATTACHMENT = 4
+_NEGATIVE = .3
+_N_SOURCES = 5
+_N_TARGETS = 50
+
+
+def synthetic_pkn(
+        n_edges: int,
+        seed: int = 0,
+        negative: float = _NEGATIVE,
+    ) -> nx.DiGraph:
+    """
+    Signed, directed scale-free network.
+
+    The network is a Barabási-Albert graph with randomly oriented edges,
+    each edge having a `sign` attribute of -1 with probability `negative`
+    and of 1 otherwise. The nodes are strings, as gene symbols in real
+    PKNs.
+
+    Args:
+        n_edges:
+            Number of edges.
+        seed:
+            Seed of the random number generator.
+        negative:
+            Fraction of inhibitory edges.
+    """
+
+    rng = np.random.default_rng(seed)
+    n_nodes = max(n_edges // _ATTACHMENT + _ATTACHMENT, _ATTACHMENT + 1)
+    graph = nx.barabasi_albert_graph(n_nodes, _ATTACHMENT, seed = seed)
+    edges = np.array(graph.edges())[:n_edges]
+    flip = rng.random(len(edges)) < .5
+    edges[flip] = edges[flip, ::-1]
+    signs = np.where(rng.random(len(edges)) < negative, -1, 1)
+    width = len(str(n_nodes))
+
+    pkn = nx.DiGraph()
+    pkn.add_edges_from(
+        (f'N{u:0{width}}', f'N{v:0{width}}', {'sign': int(s)})
+        for (u, v), s in zip(edges, signs)
+    )
+
+    return pkn
+
+
+def synthetic_inputs(
+        pkn: nx.DiGraph,
+        n_sources: int = _N_SOURCES,
+        n_targets: int = _N_TARGETS,
+        seed: int = 0,
+    ) -> dict:
+    """
+    Seeded sources, targets and omics inputs for a synthetic PKN.
+
+    Sources are drawn among the nodes with outgoing edges, with a random
+    sign of perturbation; targets among the nodes with incoming edges, with
+    normally distributed measurements. The inputs of MOON are derived from
+    these: a TF regulatory network of the edges pointing to the targets,
+    and RNA measurements of the targets.
+
+    Returns:
+        Dict with the keys `source_dict`, `target_dict`, `tf_regn` and
+        `rna_input`.
+    """
+
+    rng = np.random.default_rng(seed)
+    nodes = np.array(sorted(pkn.nodes))
+    out_degree = np.array([pkn.out_degree(n) for n in nodes])
+    in_degree = np.array([pkn.in_degree(n) for n in nodes])
+
+    sources = rng.choice(
+        nodes[out_degree > 0],
+        min(n_sources, (out_degree > 0).sum()),
+        replace = False,
+    )
+    targets = rng.choice(
+        nodes[(in_degree > 0) & ~np.isin(nodes, sources)],
+        min(n_targets, ((in_degree > 0) & ~np.isin(nodes, sources)).sum()),
+        replace = False,
+    )
+    source_dict = {
+        str(s): float(v)
+        for s, v in zip(sources, rng.choice([-1., 1.], len(sources)))
+    }
+    target_dict = {
+        str(t): float(v)
+        for t, v in zip(targets, rng.normal(size = len(targets)))
+    }
+    tf_regn = pd.DataFrame(
+        [
+            (u, v, d['sign'])
+            for v in target_dict
+            for u, _, d in pkn.in_edges(v, data = True)
+        ],
+        columns = ['source', 'target', 'weight'],
+    )
+
+    return {
+        'source_dict': source_dict,
+        'target_dict': target_dict,
+        'tf_regn': tf_regn,
+        'rna_input': dict(target_dict),
+    }
+
+
+def _bench_shortest_paths(pkn, inputs):
+
+    return ft.partial(
+        _graph.run_shortest_paths,
+        pkn,
+        inputs['source_dict'],
+        inputs['target_dict'],
+    )
+
+
+def _bench_sign_consistency(pkn, inputs):
+
+    _, paths = _graph.run_shortest_paths(
+        pkn,
+        inputs['source_dict'],
+        inputs['target_dict'],
+    )
+
+    return ft.partial(
+        _graph.run_sign_consistency,
+        pkn,
+        paths,
+        inputs['source_dict'],
+        inputs['target_dict'],
+    )
+
+
+def _bench_all_paths(pkn, inputs):
+
+    return ft.partial(
+        _graph.run_all_paths,
+        pkn,
+        inputs['source_dict'],
+        inputs['target_dict'],
+        depth_cutoff = 3,
+    )
+
+
+def _bench_ppr(pkn, inputs):
+
+    def run():
+
+        network = pkn.copy()
+
+        for personalize_for in ('source', 'target'):
+
+            network = _graph.add_pagerank_scores(
+                network,
+                inputs['source_dict'],
+                inputs['target_dict'],
+                personalize_for = personalize_for,
+            )
+
+        return _graph.compute_ppr_overlap(network)
+
+    return run
+
+
+def _bench_moon(pkn, inputs):
+
+    return ft.partial(
+        _moon.run_moon,
+        pkn,
+        inputs['source_dict'],
+        inputs['target_dict'],
+        inputs['tf_regn'],
+        inputs['rna_input'],
+    )
+
+
+def _bench_graph_metrics(pkn, inputs):
+
+    return ft.partial(
+        _metrics.get_graph_metrics,
+        pkn,
+        inputs['target_dict'],
+        betweenness_k = 64,
+        seed = 0,
+    )
+
+
+# each benchmark prepares its task from the PKN and the inputs, outside of
+# the measurement, and returns a function running only the measured task
+BENCHMARKS: dict[str, Callable[[nx.DiGraph, dict], Callable]] = {
+    'shortest_paths': _bench_shortest_paths,
+    'sign_consistency': _bench_sign_consistency,
+    'all_paths': _bench_all_paths,
+    'ppr': _bench_ppr,
+    'moon': _bench_moon,
+    'graph_metrics': _bench_graph_metrics,
+}
+
+
+def _measure(task: Callable, repeat: int) -> dict:
+    """
+    Wall time of `repeat` runs, and peak memory of one more run.
+
+    The memory is traced in a separate run, as tracing slows down the
+    allocations, and would distort the timings.
+    """
+
+    times = []
+
+    for _ in range(repeat):
+
+        start = time.perf_counter()
+        task()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+
+    try:
+
+        task()
+        _, peak = tracemalloc.get_traced_memory()
+
+    finally:
+
+        tracemalloc.stop()
+
+    return {
+        'time': min(times),
+        'time_median': statistics.median(times),
+        'times': times,
+        'memory': peak,
+    }
+
+
+def run_benchmarks(
+        sizes: list[str] | None = None,
+        benchmarks: list[str] | None = None,
+        repeat: int = 3,
+        seed: int = 0,
+    ) -> dict:
+    """
+    Run benchmarks on synthetic PKNs.
+
+    Failing benchmarks do not stop the run, their error is recorded in the
+    results instead of the measurements.
+
+    Args:
+        sizes:
+            Labels of network sizes from `SIZES`; by default all.
+        benchmarks:
+            Names of benchmarks from `BENCHMARKS`; by default all.
+        repeat:
+            Number of timed runs of each benchmark; the fastest is
+            reported as `time`.
+        seed:
+            Seed of the synthetic networks and inputs.
+
+    Returns:
+        Dict with the environment under `meta` and a list of records, one
+        for each benchmark and size, under `results`.
+    """
+
+    sizes = list(sizes or SIZES)
+    benchmarks = list(benchmarks or BENCHMARKS)
+
+    for what, requested, available in (
+        ('sizes', sizes, SIZES),
+        ('benchmarks', benchmarks, BENCHMARKS),
+    ):
+
+        if unknown := set(requested) - set(available):
+
+            raise ValueError(
+                f"Unknown {what}: {', '.join(sorted(unknown))}. "
+                f"Available {what}: {', '.join(available)}."
+            )
+
+    results = []
+
+    for size in sizes:
+
+        pkn = synthetic_pkn(SIZES[size], seed = seed)
+        inputs = synthetic_inputs(pkn, seed = seed)
+
+        for name in benchmarks:
+
+            _log(f'Benchmark: running `{name}` on the {size} edges PKN.')
+            record = {
+                'benchmark': name,
+                'size': size,
+                'nodes': pkn.number_of_nodes(),
+                'edges': pkn.number_of_edges(),
+            }
+
+            try:
+
+                task = BENCHMARKS[name](pkn, inputs)
+                record.update(_measure(task, repeat))
+
+            except Exception as e:
+
+                record['error'] = f'{type(e).__name__}: {e}'
+                _log(f'Benchmark: `{name}` failed: {record["error"]}')
+
+            results.append(record)
+
+    return {
+        'meta': {
+            'networkcommons': _metadata.__version__,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'networkx': nx.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+            'seed': seed,
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def save_results(results: dict, path: str) -> None:
+
+    with open(path, 'w') as fp:
+
+        json.dump(results, fp, indent = 2)
+
+
+def load_results(path: str) -> dict:
+
+    with open(path) as fp:
+
+        return json.load(fp)
+
+
+def compare(
+        results: dict,
+        baseline: dict,
+        time_threshold: float = 1.25,
+        memory_threshold: float = 1.25,
+        min_time: float = .01,
+    ) -> pd.DataFrame:
+    """
+    Compare benchmark results to a baseline.
+
+    A benchmark is a regression if its time or peak memory exceeds the
+    baseline by more than the threshold ratio, or if it fails while it
+    succeeded in the baseline. Time differences shorter than `min_time`
+    are ignored, as these are dominated by noise.
+
+    Args:
+        results:
+            Results of `run_benchmarks`.
+        baseline:
+            Results of an earlier run of `run_benchmarks`.
+        time_threshold:
+            Largest acceptable ratio of time to baseline time.
+        memory_threshold:
+            Largest acceptable ratio of memory to baseline memory.
+        min_time:
+            Smallest time difference in seconds considered as a regression.
+
+    Returns:
+        Data frame with one row for each benchmark and size present in
+        both, with the measurements, their ratios to the baseline and a
+        boolean `regression` column.
+    """
+
+    cols = ['benchmark', 'size', 'time', 'memory', 'error']
+
+    def records(res):
+
+        return pd.DataFrame(res['results']).reindex(columns = cols)
+
+    result = records(results).merge(
+        records(baseline),
+        on = ['benchmark', 'size'],
+        suffixes = ('', '_baseline'),
+    )
+    result['time_ratio'] = result.time / result.time_baseline
+    result['memory_ratio'] = result.memory / result.memory_baseline
+    result['regression'] = (
+        (
+            (result.time_ratio > time_threshold) &
+            (result.time - result.time_baseline > min_time)
+        ) |
+        (result.memory_ratio > memory_threshold) |
+        (result.error.notna() & result.error_baseline.isna())
+    )
+
+    return result[[
+        'benchmark',
+        'size',
+        'time',
+        'time_baseline',
+        'time_ratio',
+        'memory',
+        'memory_baseline',
+        'memory_ratio',
+        'error',
+        'regression',
+    ]]
+
+
+def main(argv: list[str] | None = None) -> int:
+
+    parser = argparse.ArgumentParser(
+        prog = 'python -m networkcommons._benchmark',
+        description = 'Benchmark the inference methods on synthetic PKNs.',
+    )
+    parser.add_argument('--sizes', nargs = '+', choices = list(SIZES))
+    parser.add_argument('--benchmarks', nargs = '+', choices = list(BENCHMARKS))
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--output', help = 'Save the results to this JSON file.')
+    parser.add_argument('--baseline', help = 'Compare to the results in this JSON file.')
+    parser.add_argument('--time-threshold', type = float, default = 1.25)
+    parser.add_argument('--memory-threshold', type = float, default = 1.25)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        sizes = args.sizes,
+        benchmarks = args.benchmarks,
+        repeat = args.repeat,
+        seed = args.seed,
+    )
+
+    if args.output:
+
+        save_results(results, args.output)
+
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+
+        if args.baseline:
+
+            comparison = compare(
+                results,
+                load_results(args.baseline),
+                time_threshold = args.time_threshold,
+                memory_threshold = args.memory_threshold,
+            )
+            print(comparison.to_string(index = False))
+
+            return int(comparison.regression.any())
+
+        print(pd.DataFrame(results['results']).drop(columns = 'times', errors = 'ignore').to_string(index = False))
+
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -18,6 +18,7 @@ Handling of imports.
 """
 
 import contextlib
+import importlib
 import warnings
 
 
@@ -55,3 +56,34 @@ def optional(error: str = 'ignore'):
                 f'Missing optional dependency "{e.name}". '
                 'Use pip or conda to install.'
             )
+
+
+def require(name: str, extra: str):
+    """
+    Import an optional dependency needed by a feature.
+
+    Args:
+        name:
+            Name of the module.
+        extra:
+            The extra of `networkcommons` that installs the dependency.
+
+    Returns:
+        The module.
+
+    Raises:
+        ImportError: If the module is not available; the message tells
+            which extra to install.
+    """
+
+    try:
+
+        return importlib.import_module(name)
+
+    except ImportError as e:
+
+        raise ImportError(
+            f'Missing optional dependency "{name.split(".")[0]}", install '
+            f'it by `pip install networkcommons[{extra}]`.',
+            name = e.name,
+        ) from e
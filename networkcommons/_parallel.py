@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Executors for running independent tasks in parallel.
+"""
+
+from __future__ import annotations
+
+__all__ = ['cpu_count', 'executor']
+
+from collections.abc import Callable, Iterator
+import contextlib
+import multiprocessing
+import concurrent.futures
+
+from networkcommons import _conf
+
+
+class SerialExecutor(concurrent.futures.Executor):
+    """
+    Executor running the tasks immediately, in the calling process.
+    """
+
+
+    def __init__(
+            self,
+            initializer: Callable | None = None,
+            initargs: tuple = (),
+        ):
+
+        if initializer is not None:
+
+            initializer(*initargs)
+
+
+    def submit(self, fn: Callable, /, *args, **kwargs):
+
+        future = concurrent.futures.Future()
+
+        try:
+
+            future.set_result(fn(*args, **kwargs))
+
+        except BaseException as e:
+
+            future.set_exception(e)
+
+        return future
+
+
+def cpu_count(n_jobs: int | None = None) -> int:
+    """
+    Number of parallel jobs: by default the `cpu_count` config value or
+    the number of CPUs.
+    """
+
+    return _conf.get(
+        'cpu_count',
+        override = n_jobs or None,
+        default = multiprocessing.cpu_count(),
+    )
+
+
+@contextlib.contextmanager
+def executor(
+        n_jobs: int | None = None,
+        executor: concurrent.futures.Executor | None = None,
+        initializer: Callable | None = None,
+        initargs: tuple = (),
+    ) -> Iterator[concurrent.futures.Executor]:
+    """
+    Executor for parallel processing, in a context.
+
+    Worker processes are started by the "spawn" method: forked workers
+    inherit the state of the logger and of other libraries, which may
+    prevent them from exiting.
+
+    Args:
+        n_jobs:
+            Number of worker processes. With 1, the tasks run serially in
+            the calling process.
+        executor:
+            An existing executor: if provided, it is used as it is, and it
+            is not shut down at the end of the context.
+        initializer:
+            Called with `initargs` once in each worker when it starts, e.g.
+            to set up data shared by all tasks. Not applied to existing
+            executors.
+        initargs:
+            Arguments for `initializer`.
+
+    Yields:
+        An executor.
+    """
+
+    if executor is not None:
+
+        yield executor
+
+    elif (n := cpu_count(n_jobs)) == 1:
+
+        yield SerialExecutor(initializer, initargs)
+
+    else:
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers = n,
+            mp_context = multiprocessing.get_context('spawn'),
+            initializer = initializer,
+            initargs = initargs,
+        ) as pool:
+
+            yield pool
@@ -18,3 +18,5 @@ Network metrics and analysis methods.
 """
 
 from ._metrics import *
+from ._store import *
+from ._topology import *
@@ -27,27 +27,45 @@ __all__ = [
     'get_mean_closeness',
     'get_connected_targets',
     'get_recovered_offtargets',
+    'GoldStandard',
     'get_offtarget_panacea_evaluation',
     'get_graph_metrics',
     'get_metric_from_networks',
+    'get_network_distances',
     'get_ec50_evaluation',
+    'get_ec50_evaluation_batch',
     'run_ora',
+    'run_ora_batch',
     'perform_random_controls',
     'get_phosphorylation_status',
+    'get_phosphorylation_status_batch',
     'shuffle_dict_keys'
 ]
 
+import os
+import time
+import functools as ft
+from collections.abc import Callable
+import concurrent.futures
+
 import pandas as pd
 import networkx as nx
 import decoupler as dc
 import numpy as np
+import scipy.sparse as sp
+from scipy import stats, special
+from pypath_common import _misc
 
 import networkcommons.utils as utils
+from networkcommons import _parallel
 from networkcommons._session import _log
 
 from networkcommons.data import omics as omics
 from networkcommons.data import network as network
 import networkcommons.methods as methods
+from networkcommons.methods import _snapshot
+from . import _store
+from . import _topology
 
 import random
 
@@ -94,32 +112,46 @@ def get_mean_degree(network: nx.Graph) -> float:
     return np.mean(list(dict(nx.degree(network)).values()))
 
 
-def get_mean_betweenness(network: nx.Graph) -> float:
+def get_mean_betweenness(
+        network: nx.Graph,
+        k: int | None = None,
+        seed: int | None = None,
+        n_jobs: int | None = 1,
+    ) -> float:
     """
     Get the mean betweenness centrality of the network.
 
     Args:
         network (nx.Graph): The network to get the mean betweenness from.
+        k (int, optional): Estimate the betweenness from this number of
+            pivot sources instead of computing it exactly.
+        seed (int, optional): Seed for sampling the pivots.
+        n_jobs (int, optional): Number of worker processes.
 
     Returns:
         float: The mean betweenness of the network.
     """
 
-    return np.mean(list(nx.betweenness_centrality(network).values()))
+    betweenness = _topology.get_betweenness(network, k=k, seed=seed, n_jobs=n_jobs)
+
+    return betweenness.attrs['mean']
 
 
-def get_mean_closeness(network: nx.Graph) -> float:
+def get_mean_closeness(network: nx.Graph, n_jobs: int | None = 1) -> float:
     """
     Get the mean closeness centrality of the network.
 
     Args:
         network (nx.Graph): The network to get the mean closeness from.
+        n_jobs (int, optional): Number of worker processes.
 
     Returns:
         float: The mean closeness of the network.
     """
 
-    return np.mean(list(nx.closeness_centrality(network).values()))
+    distances = _topology.get_distance_metrics(network, n_jobs=n_jobs)
+
+    return np.mean(distances.closeness.to_numpy())
 
 
 def get_connected_targets(network, target_dict, percent=False):
@@ -149,31 +181,284 @@ def get_connected_targets(network, target_dict, percent=False):
         return connected_nodes
 
 
-def get_recovered_offtargets(network, offtargets):
+def get_recovered_offtargets(network, offtargets, compound=None):
     """
     Get the number of off-targets recovered by the network.
 
+    Duplicated off-targets are counted once, both among the recovered ones
+    and in the total the percentage is taken of; formerly the total
+    included the duplicates. Without off-targets the percentage is NaN.
+
     Args:
-        network (nx.Graph): The network to get the off-targets from.
-        offtargets (list): A list of off-targets.
-        percent (bool, optional): If True, return the percentage of
-            off-targets recovered. Defaults to False.
+        network (nx.Graph, dict): The network to get the off-targets from. If
+            a dictionary of networks, the recovery of all networks is
+            computed at once.
+        offtargets (list, np.ndarray, GoldStandard): The off-targets, or a
+            gold standard to look up the off-targets of `compound` in.
+        compound (str, optional): The compound, if `offtargets` is a gold
+            standard.
 
     Returns:
-        int: The number/percentage of off-targets recovered by the network.
+        pd.DataFrame: The number and percentage of distinct off-targets
+        recovered by the network; for a dictionary, one row for each
+        network, with the network names in the "network" column.
     """
 
-    recovered_offtargets = len(set(offtargets).intersection(
-        set(network.nodes()))
-        )
+    if isinstance(offtargets, GoldStandard):
+        if compound is None:
+            raise ValueError("A compound is required to look up the off-targets in a gold standard.")
+        offtargets = offtargets.offtargets(compound)
 
-    return pd.DataFrame({
+    offtarget_set = set(offtargets)
+    networks = network if isinstance(network, dict) else {None: network}
+
+    recovered_offtargets = np.fromiter(
+        (sum(offtarget in graph for offtarget in offtarget_set) for graph in networks.values()),
+        dtype=np.int64,
+        count=len(networks),
+    )
+
+    result = pd.DataFrame({
         'n_offtargets': recovered_offtargets,
-        'perc_offtargets': recovered_offtargets / len(offtargets) * 100
-    }, index=[0])
+        'perc_offtargets': (
+            recovered_offtargets / len(offtarget_set) * 100
+            if offtarget_set else
+            np.full(len(networks), np.nan)
+        ),
+    })
+
+    if isinstance(network, dict):
+        result['network'] = list(networks)
+
+    return result
+
+
+class GoldStandard:
+    """
+    Drug target gold standard indexed by compound.
+
+    The table is grouped by compound only once: the primary targets (rank
+    1) and the off-targets (all other targets) of each compound are kept in
+    arrays, and looked up by compound in constant time.
+    """
+
+    def __init__(self, gold_standard, compound='cmpd', target='target', rank='rank'):
+        """
+        Args:
+            gold_standard (pd.DataFrame): Compound-target pairs with the rank
+                of the targets, e.g. from `nc.data.omics.panacea_gold_standard`.
+            compound (str, optional): Column of the compounds.
+            target (str, optional): Column of the targets.
+            rank (str, optional): Column of the target ranks.
+        """
+
+        codes, compounds = pd.factorize(gold_standard[compound])
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(compounds) + 1))
+        targets = gold_standard[target].to_numpy()[order]
+        primary = (gold_standard[rank] == 1).to_numpy()[order]
+
+        self._primary = {}
+        self._offtargets = {}
+
+        for i, cmpd in enumerate(compounds):
+            cmpd_targets = targets[bounds[i]:bounds[i + 1]]
+            cmpd_primary = cmpd_targets[primary[bounds[i]:bounds[i + 1]]]
+            self._primary[cmpd] = cmpd_primary
+            self._offtargets[cmpd] = cmpd_targets[~np.isin(cmpd_targets, cmpd_primary)]
+
+    def __len__(self):
+
+        return len(self._primary)
+
+    def __contains__(self, compound):
+
+        return compound in self._primary
+
+    def __repr__(self):
+
+        return f'<GoldStandard: {len(self)} compounds>'
+
+    def __fingerprint__(self):
+        """
+        Content based hash of the targets, see `_store.fingerprint`.
+        """
+
+        return _store.fingerprint({
+            cmpd: [self._primary[cmpd], self._offtargets[cmpd]]
+            for cmpd in self._primary
+        })
+
+    @property
+    def compounds(self):
+        """
+        The compounds in the gold standard.
+        """
+
+        return list(self._primary)
+
+    def primary_targets(self, compound):
+        """
+        Targets of rank 1 of a compound; empty if the compound is unknown.
+        """
+
+        return self._primary.get(compound, np.array([], dtype=object))
+
+    def offtargets(self, compound):
+        """
+        Targets of a compound other than its primary targets; empty if the
+        compound is unknown.
+        """
+
+        return self._offtargets.get(compound, np.array([], dtype=object))
+
+
+_SHARED = {}
+
+
+def _init_shared(shared: dict) -> None:
+    """
+    Make data available to all tasks in a worker.
+    """
+
+    _SHARED.clear()
+    _SHARED.update(shared)
+
+
+_PANACEA_METHODS = {
+    'shortest_path': {},
+    'shortest_path_sc': {},
+    'all_paths': {'depth_cutoff': 3},
+    'all_paths_sc': {'depth_cutoff': 3},
+    'shortest_ppr_network': {'percentage': 1},
+    'shortest_ppr_sc_network': {'percentage': 1},
+    'corneto': {'betaWeight': 0.01, 'solver': 'GUROBI'},
+}
+
+
+def _offtarget_panacea_task(cell_drug: str) -> pd.DataFrame | None:
+    """
+    Off-target recovery of all methods for one PANACEA cell-drug
+    combination. The network, the gold standard and optionally the
+    result store are taken from the data shared with the workers. Methods
+    with results in the store are not run again, and new results are
+    persisted one by one.
+
+    Returns:
+        The off-target recovery of the networks inferred by each method,
+        or None if the combination has been skipped.
+    """
+
+    graph = _SHARED['graph']
+    gold_standard = _SHARED['gold_standard']
+    store = _SHARED.get('store')
+    pkn = _SHARED.get('pkn', '')
+
+    cell, drug = cell_drug.split('_')
+
+    # get first rank of offtargets gold standard + inhibition
+    primary_targets = gold_standard.primary_targets(drug)
+
+    if len(primary_targets) == 0:
+        _log(f"EVAL: no primary target found for {drug}. Skipping...")
+        return
+
+    source_dict = {primary_targets.item(): -1}
+
+    if next(iter(source_dict.keys())) not in graph.nodes():
+        _log(f"EVAL: primary target {list(source_dict.keys())} not found in the network. Skipping...")
+        return
+
+    offtargets = gold_standard.offtargets(drug)
+
+    if len(offtargets) == 0:
+        _log(f"EVAL: no off-targets found for {drug}. Skipping...")
+        return
+
+    def unit(method):
+        return {
+            'dataset': 'panacea',
+            'condition': cell_drug,
+            'method': method,
+            'params': _PANACEA_METHODS[method],
+            'pkn': pkn,
+        }
+
+    stored = {
+        method: res
+        for method in _PANACEA_METHODS
+        if store and (res := store.get(**unit(method))) is not None
+    }
+    todo = [method for method in _PANACEA_METHODS if method not in stored]
+
+    if stored:
+        _log(f"EVAL: {cell_drug}: {len(stored)} methods found in the store, running {len(todo)}.")
+
+    if not todo:
+        return pd.concat(stored.values())
+
+    # get measurements from downstream layer
+    dc_estimates = omics.panacea_tables(cell_line=cell, drug=drug, type='TF_scores')
+    dc_estimates.set_index('items', inplace=True)
+    measurements = utils.targetlayer_formatter(dc_estimates, act_col='act')
+
+    # NETWORK INFERENCE
+    # intermediate results shared by more than one method
+    @ft.cache
+    def shortest_paths():
+        return methods.run_shortest_paths(graph, source_dict, measurements)
+
+    @ft.cache
+    def all_paths():
+        return methods.run_all_paths(graph, source_dict, measurements, **_PANACEA_METHODS['all_paths'])
+
+    @ft.cache
+    def ppr_shortest_paths():
+        # diffusion-like methods
+        ppr_network = methods.add_pagerank_scores(graph, source_dict, measurements, personalize_for='source')
+        ppr_network = methods.add_pagerank_scores(ppr_network, source_dict, measurements, personalize_for='target')
+        ppr_network = methods.compute_ppr_overlap(ppr_network, **_PANACEA_METHODS['shortest_ppr_network'])
+        return methods.run_shortest_paths(ppr_network, source_dict, measurements)
+
+    recipes = {
+        # topological methods
+        'shortest_path': lambda: shortest_paths()[0],
+        'shortest_path_sc': lambda: methods.run_sign_consistency(*shortest_paths(), source_dict, measurements)[0],
+        'all_paths': lambda: all_paths()[0],
+        'all_paths_sc': lambda: methods.run_sign_consistency(*all_paths(), source_dict, measurements)[0],
+        'shortest_ppr_network': lambda: ppr_shortest_paths()[0],
+        'shortest_ppr_sc_network': lambda: methods.run_sign_consistency(*ppr_shortest_paths(), source_dict, measurements)[0],
+        # ILP-based
+        'corneto': lambda: methods.run_corneto_carnival(graph, source_dict, measurements, **_PANACEA_METHODS['corneto']),
+    }
+
+    networks = {method: recipes[method]() for method in todo}
+
+    offtarget_res_partial = get_metric_from_networks(
+        networks,
+        get_recovered_offtargets,
+        offtargets=gold_standard,
+        compound=drug,
+    )
+    offtarget_res_partial['cell_drug'] = cell_drug
+
+    if store:
+        for method, res in offtarget_res_partial.groupby('network', sort=False):
+            store.put(res, **unit(method))
+            stored[method] = res
 
+        offtarget_res_partial = pd.concat([stored[method] for method in _PANACEA_METHODS if method in stored])
 
-def get_offtarget_panacea_evaluation(cell=None, drug=None):
+    return offtarget_res_partial
+
+
+def get_offtarget_panacea_evaluation(
+        cell=None,
+        drug=None,
+        n_jobs=1,
+        partial_path=None,
+        store=None,
+    ):
     """
     This is a wrapper function around get_recovered_offtargets, which uses all the drug-cell line
     combinations that are available in the PANACEA data to evaluate the recovery of off-targets
@@ -182,6 +467,17 @@ def get_offtarget_panacea_evaluation(cell=None, drug=None):
     Args:
         cell (str, optional): The cell line to evaluate. If None, all cell lines are evaluated.
         drug (str, optional): The drug to evaluate. If None, all drugs are evaluated.
+        n_jobs (int, optional): Number of processes to evaluate the cell-drug
+            combinations in parallel. The network and the gold standard are
+            loaded only once, and sent once to each process. If None, the
+            `cpu_count` config value or the number of CPUs. Defaults to 1,
+            evaluating the combinations serially, in the current process.
+        partial_path (str, optional): Path to a tab separated file: the results
+            of each combination are appended to it as soon as they are ready.
+        store (EvalStore, optional): Persist the results of each method and
+            combination as soon as they are ready, and skip the ones already
+            in the store, e.g. from an interrupted run, or from a run before
+            a new method has been added.
 
     Returns:
         pd.DataFrame: A DataFrame containing the results of the off-target evaluation.
@@ -212,118 +508,278 @@ def get_offtarget_panacea_evaluation(cell=None, drug=None):
     network_df = network.get_omnipath()
     graph = utils.network_from_df(network_df)
 
-    for cell_drug in cell_drug_combs:
-        _log(f"EVAL: processing cell-drug combination {cell_drug_combs.index(cell_drug) + 1} of {len(cell_drug_combs)}: {cell_drug}...")
-
-        cell, drug = cell_drug.split('_')
-        
-        # get first rank of offtargets gold standard + inhibition
-        source_df = panacea_gold_standard[
-            (panacea_gold_standard['cmpd'] == drug) &
-            (panacea_gold_standard['rank'] == 1)
-            ]
-        
-        if source_df.empty:
-            _log(f"EVAL: no primary target found for {drug}. Skipping...")
-            continue
-        
-        source_dict = {source_df.target.item(): -1}
+    shared = {
+        'graph': graph,
+        'gold_standard': GoldStandard(panacea_gold_standard),
+        'store': store,
+        'pkn': _store.fingerprint(network_df) if store else '',
+    }
+    results = {}
 
-        if next(iter(source_dict.keys())) not in graph.nodes():
-            _log(f"EVAL: primary target {list(source_dict.keys())} not found in the network. Skipping...")
-            continue
-        
-        # get measurements from downstream layer
-        dc_estimates = omics.panacea_tables(cell_line=cell, drug=drug, type='TF_scores')
-        dc_estimates.set_index('items', inplace=True)
-        measurements = utils.targetlayer_formatter(dc_estimates, act_col='act')
+    try:
 
-        # NETWORK INFERENCE
-        # topological methods
-        shortest_path_network, shortest_paths_list = methods.run_shortest_paths(graph, source_dict, measurements)
-        shortest_sc_network, shortest_sc_list = methods.run_sign_consistency(shortest_path_network, shortest_paths_list, source_dict, measurements)
-        all_paths_network, all_paths_list = methods.run_all_paths(graph, source_dict, measurements, depth_cutoff=3)
-        allpaths_sc_network, allpaths_sc_list = methods.run_sign_consistency(all_paths_network, all_paths_list, source_dict, measurements)
+        with _parallel.executor(
+            n_jobs,
+            initializer = _init_shared,
+            initargs = (shared,),
+        ) as executor:
 
+            futures = {
+                executor.submit(_offtarget_panacea_task, cell_drug): (i, cell_drug)
+                for i, cell_drug in enumerate(cell_drug_combs)
+            }
 
-        # diffusion-like methods
-        ppr_network = methods.add_pagerank_scores(graph, source_dict, measurements, personalize_for='source')
-        ppr_network = methods.add_pagerank_scores(ppr_network, source_dict, measurements, personalize_for='target')
-        ppr_network = methods.compute_ppr_overlap(ppr_network, percentage=1)
-        shortest_ppr_network, shortest_ppr_list = methods.run_shortest_paths(ppr_network, source_dict, measurements)
-        shortest_sc_ppr_network, shortest_sc_ppr_list = methods.run_sign_consistency(shortest_ppr_network, shortest_ppr_list, source_dict, measurements)
+            for future in concurrent.futures.as_completed(futures):
 
-        # ILP-based
-        corneto_network = methods.run_corneto_carnival(graph, source_dict, measurements, betaWeight=0.01, solver='GUROBI')
-
-        networks = {
-            'shortest_path': shortest_path_network,
-            'shortest_path_sc': shortest_sc_network,
-            'all_paths': all_paths_network,
-            'all_paths_sc': allpaths_sc_network,
-            'shortest_ppr_network': shortest_ppr_network,
-            'shortest_ppr_sc_network': shortest_sc_ppr_network,
-            'corneto': corneto_network
-        }
+                i, cell_drug = futures[future]
+                _log(f"EVAL: finished cell-drug combination {i + 1} of {len(cell_drug_combs)}: {cell_drug}...")
 
-        offtargets = panacea_gold_standard[(panacea_gold_standard['cmpd'] == drug) & (~panacea_gold_standard['target'].isin(source_dict.keys()))].target.tolist()
-        
-        if len(offtargets) == 0:
-            _log(f"EVAL: no off-targets found for {drug}. Skipping...")
-            continue
+                if (offtarget_res_partial := future.result()) is None:
+                    continue
+
+                results[i] = offtarget_res_partial
 
-        offtarget_res_partial = get_metric_from_networks(networks, get_recovered_offtargets, offtargets=offtargets)
-        offtarget_res_partial['cell_drug'] = cell_drug
+                if partial_path:
+                    offtarget_res_partial.to_csv(
+                        partial_path,
+                        sep='\t',
+                        index=False,
+                        mode='a',
+                        header=not os.path.exists(partial_path),
+                    )
+
+    finally:
+
+        _SHARED.clear()
+
+    if results:
+        offtarget_res = pd.concat([results[i] for i in sorted(results)])
 
-        offtarget_res = pd.concat([offtarget_res, offtarget_res_partial])
-    
     _log('EVAL: finished offtarget recovery evaluation using PANACEA TF activity scores.')
 
     return offtarget_res
 
 
-def get_graph_metrics(network, target_dict):
+_GRAPH_METRICS = {
+    'nodes': 'Number of nodes',
+    'edges': 'Number of edges',
+    'degree': 'Mean degree',
+    'betweenness': 'Mean betweenness',
+    'closeness': 'Mean closeness',
+    'eccentricity': 'Mean eccentricity',
+    'diameter': 'Diameter',
+    'connected_targets': 'Connected targets',
+}
+_DEFAULT_GRAPH_METRICS = (
+    'nodes',
+    'edges',
+    'degree',
+    'betweenness',
+    'closeness',
+    'connected_targets',
+)
+_INT_GRAPH_METRICS = {'nodes', 'edges', 'diameter', 'connected_targets'}
+_DISTANCE_METRICS = {'closeness', 'eccentricity', 'diameter'}
+
+
+def _graph_metrics_row(
+        network: nx.Graph,
+        target_dict: dict,
+        metrics: tuple[str, ...],
+        betweenness_k: int | None = None,
+        seed: int | None = None,
+        n_jobs: int | None = 1,
+    ) -> dict:
+    """
+    Graph metrics of one network, all computed from one snapshot of it.
+
+    Returns:
+        The value of each metric by metric name; with `betweenness_k`, also
+        the standard error of the betweenness as "betweenness_stderr".
+    """
+
+    snapshot = _snapshot.Snapshot(network)
+    n = len(snapshot)
+    row = {}
+
+    if 'nodes' in metrics:
+        row['nodes'] = n
+
+    if 'edges' in metrics:
+        row['edges'] = network.number_of_edges()
+
+    if 'degree' in metrics:
+        # every edge, including loops, adds 2 to the sum of degrees
+        row['degree'] = 2 * network.number_of_edges() / n if n else np.nan
+
+    if 'betweenness' in metrics:
+        betweenness = _topology.get_betweenness(snapshot, k=betweenness_k, seed=seed, n_jobs=n_jobs)
+        row['betweenness'] = betweenness.attrs['mean']
+        row['betweenness_stderr'] = betweenness.attrs['mean_stderr']
+
+    if _DISTANCE_METRICS.intersection(metrics):
+        distances = _topology.get_distance_metrics(snapshot, n_jobs=n_jobs)
+        row['closeness'] = np.mean(distances.closeness.to_numpy())
+        row['eccentricity'] = np.mean(distances.eccentricity.to_numpy())
+        row['diameter'] = distances.attrs['diameter']
+
+    if 'connected_targets' in metrics:
+        row['connected_targets'] = sum(target in snapshot.index for target in set(target_dict))
+
+    return row
+
+
+def get_graph_metrics(network, target_dict, betweenness_k=None, seed=None, n_jobs=1, metrics=None):
     """
     Get the graph metrics of a network.
 
+    All metrics of a network are computed from one compressed snapshot of
+    it, and the distance based metrics (closeness, eccentricity, diameter)
+    from one pass of breadth-first searches. Dictionaries of networks are
+    processed in parallel, one network per task.
+
     Args:
         network (nx.Graph, dict): The network to get the graph metrics from. If a dictionary, will iterate over it.
         target_dict (dict): A dictionary containing the targets and sign
             of measurements.
+        betweenness_k (int, optional): Estimate the betweenness from this
+            number of pivot sources; the standard error of the estimate is
+            added in the column "Mean betweenness stderr".
+        seed (int, optional): Seed for sampling the betweenness pivots.
+        n_jobs (int, optional): Number of worker processes: for a
+            dictionary, each processes whole networks, otherwise blocks of
+            nodes in the betweenness and distance computations.
+        metrics (list, optional): Names of the metrics to compute, out of
+            "nodes", "edges", "degree", "betweenness", "closeness",
+            "eccentricity", "diameter" and "connected_targets". By default
+            all except eccentricity and diameter.
 
     Returns:
         DataFrame: The graph metrics of the network.
     """
+    metrics = tuple(_misc.to_list(metrics) or _DEFAULT_GRAPH_METRICS)
+
+    if unknown := set(metrics) - set(_GRAPH_METRICS):
+        raise ValueError(
+            f"Unknown graph metrics: {', '.join(sorted(unknown))}. "
+            f"Available metrics: {', '.join(_GRAPH_METRICS)}."
+        )
+
+    networks = network if isinstance(network, dict) else {None: network}
+
+    if not all(isinstance(graph, nx.DiGraph) for graph in networks.values()):
+        raise TypeError("The network must be a networkx graph or a dictionary of networkx graphs.")
+
     if isinstance(network, dict):
         _log(f"EVAL: Calculating graph metrics for {len(network)} networks.")
+        task = ft.partial(
+            _graph_metrics_row,
+            target_dict=target_dict,
+            metrics=metrics,
+            betweenness_k=betweenness_k,
+            seed=seed,
+        )
+        chunksize = max(1, len(networks) // (4 * _parallel.cpu_count(n_jobs)))
 
-        metrics = pd.DataFrame()
-        for network_name, graph in network.items():
-            network_df = get_graph_metrics(graph, target_dict)
-            network_df['network'] = network_name
-            metrics = pd.concat([metrics, network_df])
-
-        metrics.reset_index(inplace=True, drop=True)
+        with _parallel.executor(n_jobs) as pool:
+            rows = list(pool.map(task, networks.values(), chunksize=chunksize))
 
-    elif isinstance(network, nx.DiGraph):
-        _log("EVAL: Calculating graph metrics for a single network.")
-        metrics = pd.DataFrame({
-            'Number of nodes': get_number_nodes(network),
-            'Number of edges': get_number_edges(network),
-            'Mean degree': get_mean_degree(network),
-            'Mean betweenness': get_mean_betweenness(network),
-            'Mean closeness': get_mean_closeness(network),
-            'Connected targets': get_connected_targets(network, target_dict)
-        }, index=[0])
     else:
-        raise TypeError("The network must be a networkx graph or a dictionary of networkx graphs.")
-    
-    _log("EVAL: Graph metrics calculated: number of nodes, number of edges, mean degree, mean betweenness, mean closeness, connected targets.")
+        _log("EVAL: Calculating graph metrics for a single network.")
+        rows = [_graph_metrics_row(network, target_dict, metrics, betweenness_k, seed, n_jobs)]
 
-    return metrics
+    columns = list(metrics)
+
+    if betweenness_k is not None and 'betweenness' in metrics:
+        columns.insert(columns.index('betweenness') + 1, 'betweenness_stderr')
+
+    result = {
+        name: np.fromiter(
+            (row[name] for row in rows),
+            dtype=np.int64 if name in _INT_GRAPH_METRICS else np.float64,
+            count=len(rows),
+        )
+        for name in columns
+    }
+    result = pd.DataFrame({
+        _GRAPH_METRICS.get(name, 'Mean betweenness stderr'): values
+        for name, values in result.items()
+    })
+
+    if isinstance(network, dict):
+        result['network'] = list(networks)
+
+    _log(f"EVAL: Graph metrics calculated: {', '.join(_GRAPH_METRICS[name].lower() for name in metrics)}.")
 
+    return result
 
-def get_metric_from_networks(networks, function, **kwargs):
+
+# networks are processed in chunks of about this many edges
+_CHUNK_EDGES = 10000
+
+
+def _chunk_networks(networks: dict, n_jobs: int | None = 1) -> list[list[tuple]]:
+    """
+    Group consecutive networks into chunks of similar size, small enough to
+    provide at least a few chunks for each worker.
+    """
+
+    sizes = [
+        graph.number_of_edges() if hasattr(graph, 'number_of_edges') else _CHUNK_EDGES
+        for graph in networks.values()
+    ]
+    limit = min(_CHUNK_EDGES, -(-sum(sizes) // (4 * _parallel.cpu_count(n_jobs))))
+    chunks, chunk, size = [], [], 0
+
+    for item, item_size in zip(networks.items(), sizes):
+        chunk.append(item)
+        size += item_size
+        if size >= limit:
+            chunks.append(chunk)
+            chunk, size = [], 0
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
+
+
+def _metric_chunk(
+        networks: list[tuple[str, nx.Graph]],
+        function: Callable,
+        store: _store.EvalStore | None,
+        kwargs: dict,
+    ) -> list[tuple[pd.DataFrame, float]]:
+    """
+    Apply a metric function to a chunk of networks.
+
+    Returns:
+        The metric of each network and the time it took in seconds.
+    """
+
+    results = []
+
+    for network_name, graph in networks:
+        start = time.perf_counter()
+        if store is None:
+            network_df = function(graph, **kwargs)
+        else:
+            unit = {
+                'dataset': 'metrics',
+                'condition': network_name,
+                'method': function.__name__,
+                'params': kwargs,
+                'pkn': _store.fingerprint(graph),
+            }
+            if (network_df := store.get(**unit)) is None:
+                network_df = function(graph, **kwargs)
+                store.put(network_df, **unit)
+        results.append((network_df, time.perf_counter() - start))
+
+    return results
+
+
+def get_metric_from_networks(networks, function, store=None, n_jobs=1, executor=None, timing=False, **kwargs):
     """
     Get the graph metrics of multiple networks.
 
@@ -331,12 +787,22 @@ def get_metric_from_networks(networks, function, **kwargs):
         networks (Dict[str, nx.Graph]): A dictionary of network names and
             their corresponding graphs.
         function (function): The function to get the graph metrics.
+        store (EvalStore, optional): Persist the metric of each network as
+            soon as it is ready, and reuse results already in the store. The
+            results are identified by the network name, the function, the
+            keyword arguments and the fingerprint of the network.
+        n_jobs (int, optional): Number of worker processes. Small networks
+            are sent to the workers in chunks. The function and its
+            arguments must be picklable if more than 1.
+        executor (concurrent.futures.Executor, optional): An existing
+            executor to use instead of starting new worker processes.
+        timing (bool, optional): Add the time spent on each network, in
+            seconds, in the "time" column.
         **kwargs: Additional keyword arguments to pass to the function.
 
     Returns:
         DataFrame: The graph metrics of the networks.
     """
-    metrics = pd.DataFrame()
     try:
         callable(function)
         if not callable(function):
@@ -346,23 +812,115 @@ def get_metric_from_networks(networks, function, **kwargs):
 
     _log(f"EVAL: Calculating {function.__name__} for {len(networks)} networks.")
 
-    for network_name, graph in networks.items():
-        network_df = function(graph, **kwargs)
+    task = ft.partial(_metric_chunk, function=function, store=store, kwargs=kwargs)
+
+    with _parallel.executor(n_jobs, executor=executor) as pool:
+        results = [
+            result
+            for chunk in pool.map(task, _chunk_networks(networks, n_jobs))
+            for result in chunk
+        ]
+
+    for network_name, (network_df, seconds) in zip(networks, results):
         network_df['network'] = network_name
         if 'random' in network_name:
             network_df['type'] = 'random'
         else:
             network_df['type'] = 'real'
         network_df['method'] = network_name.split('__')[0]
-        metrics = pd.concat([metrics, network_df])
+        if timing:
+            network_df['time'] = seconds
 
-    metrics.reset_index(inplace=True, drop=True)
+    metrics = (
+        pd.concat([network_df for network_df, _ in results], ignore_index=True)
+        if results else
+        pd.DataFrame()
+    )
 
     _log(f"EVAL: {function.__name__} calculated for {len(networks)} networks.")
 
     return metrics
 
 
+_SET_DISTANCES = ('jaccard', 'overlap', 'hamming')
+
+
+def get_network_distances(networks, elements='nodes', metric='jaccard'):
+    """
+    Pairwise distances between networks by their node or edge sets.
+
+    The sets of all networks are encoded as one sparse boolean network x
+    element matrix, and the sizes of all pairwise intersections are
+    computed by a single sparse matrix product.
+
+    Args:
+        networks (Dict[str, nx.Graph]): A dictionary of network names and
+            their corresponding graphs.
+        elements (str, optional): Compare the "nodes" or the "edges" of the
+            networks. Edges of undirected networks are unordered pairs.
+        metric (str, optional): "jaccard": 1 - |A & B| / |A | B|;
+            "overlap": 1 - |A & B| / min(|A|, |B|); "hamming": the size of
+            the symmetric difference, divided by the number of distinct
+            elements in all networks. Two empty sets have zero distance.
+
+    Returns:
+        pd.DataFrame: Square distance matrix, with the network names as
+        index and columns, as expected by
+        `visual.build_heatmap_with_tree`.
+    """
+    if elements not in ('nodes', 'edges'):
+        raise ValueError(f"Unknown elements: {elements}. Available: nodes, edges.")
+
+    if metric not in _SET_DISTANCES:
+        raise ValueError(f"Unknown distance: {metric}. Available: {', '.join(_SET_DISTANCES)}.")
+
+    def items(graph):
+        if elements == 'nodes':
+            return graph.nodes
+        if graph.is_directed():
+            return graph.edges
+        return (frozenset(edge) for edge in graph.edges)
+
+    index = {}
+    codes = [
+        np.unique(np.fromiter(
+            (index.setdefault(item, len(index)) for item in items(graph)),
+            dtype=np.int64,
+        ))
+        for graph in networks.values()
+    ]
+    sizes = np.fromiter(map(len, codes), dtype=np.int64, count=len(codes))
+    membership = sp.csr_array(
+        (
+            np.ones(sizes.sum(), dtype=np.int64),
+            np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64),
+            np.concatenate([[0], np.cumsum(sizes)]),
+        ),
+        shape=(len(codes), len(index)),
+    )
+
+    shared = (membership @ membership.T).toarray().astype(np.float64)
+    size_i, size_j = sizes[:, None], sizes[None, :]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if metric == 'jaccard':
+            union = size_i + size_j - shared
+            distances = np.where(union > 0, 1 - shared / union, 0.)
+        elif metric == 'overlap':
+            smaller = np.minimum(size_i, size_j)
+            distances = np.where(
+                smaller > 0,
+                1 - shared / smaller,
+                np.where(np.maximum(size_i, size_j) > 0, 1., 0.),
+            )
+        else:
+            distances = (size_i + size_j - 2 * shared) / max(len(index), 1)
+
+    np.fill_diagonal(distances, 0.)
+
+    return pd.DataFrame(distances, index=list(networks), columns=list(networks))
+
+
 def get_ec50_evaluation(network, ec50_dict):
     """
     Get the EC50 evaluation of a network.
@@ -398,6 +956,91 @@ def get_ec50_evaluation(network, ec50_dict):
     }, index=[0])
 
 
+def _node_membership(networks, keys):
+    """
+    Sparse network x key indicator matrix of the network nodes.
+
+    Args:
+        networks (list): Graphs.
+        keys (pd.Index): Unique node labels.
+
+    Returns:
+        The indicator matrix, and the number of nodes of each network.
+    """
+
+    index = {key: i for i, key in enumerate(keys)}
+    codes = [
+        np.fromiter((index[node] for node in graph.nodes if node in index), dtype=np.int64)
+        for graph in networks
+    ]
+    sizes = np.fromiter(map(len, codes), dtype=np.int64, count=len(codes))
+    membership = sp.csr_array(
+        (
+            np.ones(sizes.sum()),
+            np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64),
+            np.concatenate([[0], np.cumsum(sizes)]),
+        ),
+        shape=(len(codes), len(keys)),
+    )
+    n_nodes = np.fromiter((graph.number_of_nodes() for graph in networks), dtype=np.int64, count=len(networks))
+
+    return membership, n_nodes
+
+
+def _label_networks(result, names):
+    """
+    Add the network, type and method columns, as `get_metric_from_networks`.
+    """
+
+    result['network'] = names
+    result['type'] = ['random' if 'random' in name else 'real' for name in names]
+    result['method'] = [name.split('__')[0] for name in names]
+
+    return result
+
+
+def get_ec50_evaluation_batch(networks, ec50_dict):
+    """
+    Get the EC50 evaluation of many networks at once.
+
+    Equivalent to `get_metric_from_networks(networks, get_ec50_evaluation,
+    ec50_dict=ec50_dict)`: the EC50 values are converted to an array only
+    once, and the means inside and outside of all networks are computed by
+    one product with a sparse network x node membership matrix.
+
+    Args:
+        networks (Dict[str, nx.Graph]): A dictionary of network names and
+            their corresponding graphs.
+        ec50_dict (dict): A dictionary containing the EC50 values.
+
+    Returns:
+        DataFrame: The EC50 evaluation of the networks.
+    """
+    keys = pd.Index(list(ec50_dict.keys()))
+    values = np.array(list(ec50_dict.values()), dtype=np.float64)
+    membership, n_nodes = _node_membership(list(networks.values()), keys)
+
+    n_in = membership @ np.ones(len(keys))
+    sum_in = membership @ values
+    n_out = len(keys) - n_in
+    sum_out = values.sum() - sum_in
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_in = np.where(n_in > 0, sum_in / n_in, np.nan)
+        avg_out = np.where(n_out > 0, sum_out / n_out, np.nan)
+        coverage = np.where(n_nodes > 0, n_in / n_nodes * 100, np.nan)
+
+    result = pd.DataFrame({
+        'avg_EC50_in': avg_in,
+        'avg_EC50_out': avg_out,
+        'diff_EC50': avg_in - avg_out,
+        'nodes_with_EC50': n_in.astype(np.int64),
+        'coverage': coverage,
+    })
+
+    return _label_networks(result, list(networks))
+
+
 def run_ora(graph, net, metric='ora_Combined score', ascending=False, **kwargs):
     """
     Run over-representation analysis on a custom set of genes.
@@ -406,7 +1049,8 @@ def run_ora(graph, net, metric='ora_Combined score', ascending=False, **kwargs):
         graph (nx.Graph, nx.DiGraph): A (contextualised) graph.
         net (pd.DataFrame): A DataFrame containing source (gene set name) and
         target columns (elements which will be mapped to the network nodes),
-        and containing the gene sets of interest.
+        and containing the gene sets of interest. Repeated rows are counted
+        once, as in `run_ora_batch`.
         **kwargs: Additional keyword arguments to pass to the function
         decoupler.get_ora_df().
 
@@ -414,6 +1058,8 @@ def run_ora(graph, net, metric='ora_Combined score', ascending=False, **kwargs):
         pd.DataFrame: The results of the over-representation analysis.
     """
     custom_set = list(graph.nodes())
+    # decoupler refuses repeated gene set members
+    net = net.drop_duplicates([kwargs.get('source', 'source'), kwargs.get('target', 'target')])
 
     ora_results = dc.get_ora_df(
         df=custom_set,
@@ -428,12 +1074,328 @@ def run_ora(graph, net, metric='ora_Combined score', ascending=False, **kwargs):
     return ora_results
 
 
+def _hypergeom_sf(k, M, n, N):
+    """
+    Hypergeometric upper tail P(X >= k), vectorised.
+
+    The probabilities of all values from `k` to the largest possible are
+    computed at once, from log-binomial coefficients, and summed by
+    segments; in blocks, to keep the memory bounded. Much faster than
+    `scipy.stats.hypergeom.sf` for many small tables.
+    """
+
+    k, n, N = (np.broadcast_to(x, np.shape(k)).astype(np.int64) for x in (k, n, N))
+    start = np.maximum(k, np.maximum(0, n + N - M))
+    counts = np.maximum(np.minimum(n, N) - start + 1, 0)
+    sf = np.zeros(len(k))
+    bounds = np.searchsorted(np.cumsum(counts), np.arange(0, counts.sum(), 1 << 22), side='right')
+    bounds = np.unique(np.concatenate([[0], bounds, [len(k)]]))
+
+    def lnbinom(x, y):
+        return special.gammaln(x + 1) - special.gammaln(y + 1) - special.gammaln(x - y + 1)
+
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        c = counts[lo:hi]
+        total = c.sum()
+        if not total:
+            continue
+        group = np.repeat(np.arange(hi - lo), c)
+        offsets = np.concatenate([[0], np.cumsum(c)[:-1]])
+        x = start[lo:hi][group] + np.arange(total) - offsets[group]
+        ng, Ng = n[lo:hi][group], N[lo:hi][group]
+        pmf = np.exp(lnbinom(ng, x) + lnbinom(M - ng, Ng - x) - lnbinom(M, N[lo:hi])[group])
+        sf[lo:hi] = np.bincount(group, weights=pmf, minlength=hi - lo)
+
+    return np.minimum(sf, 1.)
+
+
+class _GeneSets:
+    """
+    Gene set table compiled into a sparse gene set x feature membership
+    matrix, with terms and features in the order used by decoupler.
+    """
+
+    def __init__(self, net, source='source', target='target'):
+        set_codes, terms = pd.factorize(net[source], sort=True)
+        features = net[target].to_numpy().astype('U')
+        self.features, feature_codes = np.unique(features, return_inverse=True)
+        self.terms = terms.to_numpy().astype('U')
+        self.index = {feature: i for i, feature in enumerate(self.features)}
+        membership = sp.csr_array(
+            (np.ones(len(set_codes), dtype=np.int64), (set_codes, feature_codes)),
+            shape=(len(self.terms), len(self.features)),
+        )
+        membership.sum_duplicates()
+        membership.data[:] = 1
+        self.membership = membership
+        self.membership_csc = membership.tocsc()
+        self.sizes = np.diff(membership.indptr)
+
+    def indicators(self, networks):
+        """
+        Feature x network indicator matrix of the network nodes, and the
+        number of distinct nodes in each network.
+        """
+        codes = []
+        n_nodes = np.zeros(len(networks), dtype=np.int64)
+        for j, graph in enumerate(networks):
+            nodes = np.unique(np.array(list(graph.nodes), dtype='U'))
+            n_nodes[j] = len(nodes)
+            codes.append(np.sort([self.index[node] for node in nodes if node in self.index]).astype(np.int64))
+        indicators = sp.csc_array(
+            (
+                np.ones(sum(map(len, codes)), dtype=np.int64),
+                np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64),
+                np.concatenate([[0], np.cumsum(list(map(len, codes)))]).astype(np.int64),
+            ),
+            shape=(len(self.features), len(networks)),
+        )
+        return indicators, codes, n_nodes
+
+
+def run_ora_batch(
+        networks,
+        net,
+        metric='ora_Combined score',
+        ascending=False,
+        source='source',
+        target='target',
+        n_background=20000,
+    ):
+    """
+    Run over-representation analysis on the nodes of many networks at once.
+
+    Gives the same result as `get_metric_from_networks(networks, run_ora,
+    net=net)` with the same `metric`, `ascending`, `source`, `target` and
+    `n_background`: the parameters of `decoupler.get_ora_df` that affect its
+    result. Other keyword arguments of `run_ora` are not accepted. The gene
+    set table is compiled only once into a sparse membership matrix, the
+    overlaps of all networks with all gene sets are computed by
+    one sparse matrix product, and the hypergeometric p-values and the FDR
+    are computed by vectorised SciPy functions.
+
+    Args:
+        networks (Dict[str, nx.Graph]): A dictionary of network names and
+            their corresponding graphs.
+        net (pd.DataFrame): A DataFrame containing source (gene set name) and
+            target columns (elements which will be mapped to the network nodes),
+            and containing the gene sets of interest. Repeated rows are
+            counted once.
+        metric (str, optional): The column to rank the gene sets by.
+        ascending (bool, optional): Rank in ascending order.
+        source (str, optional): Column of `net` with the gene set names.
+        target (str, optional): Column of `net` with the genes.
+        n_background (int, optional): Size of the background; if None, the
+            distinct targets of `net`, as in decoupler.
+
+    Returns:
+        pd.DataFrame: The results of the over-representation analysis, with
+        the columns of `run_ora` and those added by `get_metric_from_networks`.
+    """
+    _log(f"EVAL: Running ORA for {len(networks)} networks.")
+
+    gene_sets = _GeneSets(net, source=source, target=target)
+    indicators, codes, n_nodes = gene_sets.indicators(list(networks.values()))
+
+    if n_background is None:
+        n_background = len(gene_sets.features)
+        n_nodes = np.array([len(c) for c in codes], dtype=np.int64)
+
+    overlaps = (gene_sets.membership @ indicators).tocsc()
+    overlaps.sort_indices()
+    overlaps.eliminate_zeros()
+    set_idx = overlaps.indices
+    net_idx = np.repeat(np.arange(len(networks)), np.diff(overlaps.indptr))
+    a = overlaps.data.astype(np.int64)
+    sizes = gene_sets.sizes[set_idx]
+    nfeatures = n_nodes[net_idx]
+
+    # one sided Fisher's exact test, the Haldane-Anscombe corrected odds ratio
+    pvals = _hypergeom_sf(a, n_background, sizes, nfeatures)
+    odds = ((a + 0.5) * (n_background - sizes + 0.5)) / ((sizes + 0.5) * (nfeatures - a + 0.5))
+    fdr = np.zeros(len(pvals))
+    features = []
+
+    for j, (start, end) in enumerate(zip(overlaps.indptr[:-1], overlaps.indptr[1:])):
+        if start == end:
+            continue
+        # zero p-values are replaced by the smallest non-zero, as decoupler does
+        p = pvals[start:end]
+        p[p == 0] = p[p != 0].min() if (p != 0).any() else 1.
+        fdr[start:end] = stats.false_discovery_control(p, method='bh')
+        hits = gene_sets.membership_csc[:, codes[j]].tocsr()
+        hits = hits[set_idx[start:end]]
+        names = gene_sets.features[codes[j]][hits.indices]
+        features.extend(
+            ';'.join(names[hits.indptr[i]:hits.indptr[i + 1]])
+            for i in range(end - start)
+        )
+
+    ora_results = pd.DataFrame({
+        'ora_Term': gene_sets.terms[set_idx],
+        'ora_Set size': sizes,
+        'ora_Overlap ratio': a / sizes,
+        'ora_p-value': pvals,
+        'ora_FDR p-value': fdr,
+        'ora_Odds ratio': odds,
+        'ora_Combined score': -np.log(pvals) * odds,
+        'ora_Features': features,
+    })
+    names = np.array(list(networks), dtype=object)[net_idx]
+    ora_results['ora_rank'] = (
+        ora_results.groupby(names, sort=False)[metric].
+        rank(ascending=ascending, method='min')
+    )
+    ora_results = _label_networks(ora_results, list(names))
+
+    _log(f"EVAL: ORA finished for {len(networks)} networks.")
+
+    return ora_results
+
+
+def _swap_edges(
+        snapshot: _snapshot.Snapshot,
+        rng: np.random.Generator,
+        n_swaps: int | None = None,
+    ) -> nx.Graph:
+    """
+    Degree preserving randomisation by a double edge swap Markov chain.
+
+    Two random edges (a, b) and (c, d) are replaced by (a, d) and (c, b),
+    unless this would create a loop or a multiple edge. Each edge keeps
+    its attributes, the in- and out-degrees of all nodes are preserved.
+
+    Args:
+        snapshot:
+            Snapshot of the graph to randomise.
+        rng:
+            Random number generator.
+        n_swaps:
+            Number of successful swaps, by default the number of edges. At
+            most ten times this many swaps are attempted.
+
+    Returns:
+        The randomised graph, with the nodes and node attributes of the
+        original.
+    """
+
+    n = len(snapshot)
+    src, tgt = snapshot.src, snapshot.indices
+
+    if not snapshot.directed:
+        # undirected edges are stored in both directions
+        src, tgt = src[src <= tgt], tgt[src <= tgt]
+
+    orig_src, orig_tgt = src, tgt
+    src, tgt = src.tolist(), tgt.tolist()
+    m = len(src)
+    n_swaps = m if n_swaps is None else n_swaps
+
+    def key(u, v):
+        return u * n + v if snapshot.directed or u <= v else v * n + u
+
+    existing = {key(u, v) for u, v in zip(src, tgt)}
+    n_tries = 10 * n_swaps if m > 1 else 0
+    pairs = rng.integers(0, max(m, 1), size=(n_tries, 2)).tolist()
+    flips = (rng.random(n_tries) < .5).tolist() if not snapshot.directed else [False] * n_tries
+    done = 0
+
+    for (i, j), flip in zip(pairs, flips):
+
+        if done >= n_swaps:
+            break
+
+        a, b, c, d = src[i], tgt[i], src[j], tgt[j]
+
+        if flip:
+            c, d = d, c
+
+        if i == j or a == d or c == b:
+            continue
+
+        new1, new2 = key(a, d), key(c, b)
+
+        if new1 in existing or new2 in existing or new1 == new2:
+            continue
+
+        existing -= {key(a, b), key(c, d)}
+        existing |= {new1, new2}
+        tgt[i] = d
+        src[j], tgt[j] = c, b
+        done += 1
+
+    labels = snapshot.labels
+    graph = snapshot.graph
+    randomised = graph.__class__()
+    randomised.add_nodes_from(graph.nodes(data=True))
+    randomised.add_edges_from(
+        (labels[u], labels[v], graph.get_edge_data(labels[u0], labels[v0]))
+        for u, v, u0, v0 in zip(src, tgt, orig_src.tolist(), orig_tgt.tolist())
+    )
+
+    return randomised
+
+
+_RANDOMISATIONS = ('labels', 'edge_swap')
+
+
+def _random_control_task(seed: np.random.SeedSequence) -> nx.Graph:
+    """
+    Infer one random control network.
+
+    The graph, the inference function and its arguments are taken from the
+    data shared with the workers. Node labels are permuted without touching
+    the graph: the node keyed arguments are mapped back to the original
+    labels, and the permutation is applied to the inferred network only.
+    This is equivalent to relabelling the whole graph.
+    """
+
+    snapshot = _SHARED['snapshot']
+    kwargs = dict(_SHARED['kwargs'])
+    inference_function = _SHARED['inference_function']
+    rng = np.random.default_rng(seed)
+
+    if _SHARED['item_list']:
+        kwargs['target_dict'] = shuffle_dict_keys(kwargs['target_dict'], _SHARED['item_list'], rng=rng)
+
+    if _SHARED['randomisation'] == 'edge_swap':
+        graph = _swap_edges(snapshot, rng, _SHARED['n_swaps'])
+        inferred_network, _ = inference_function(graph, **kwargs)
+
+        return inferred_network
+
+    labels, index = snapshot.labels, snapshot.index
+    perm = rng.permutation(len(snapshot))
+    inverse = np.argsort(perm)
+
+    for arg in _SHARED['node_kwargs']:
+        if isinstance(kwargs.get(arg), dict):
+            kwargs[arg] = {
+                labels[inverse[index[node]]] if node in index else node: value
+                for node, value in kwargs[arg].items()
+            }
+
+    inferred_network, _ = inference_function(snapshot.graph, **kwargs)
+    mapping = {
+        node: labels[perm[index[node]]]
+        for node in inferred_network.nodes
+        if node in index
+    }
+
+    return nx.relabel_nodes(inferred_network, mapping, copy=True)
+
+
 def perform_random_controls(graph,
                             inference_function,
                             n_iterations,
                             network_name,
                             randomise_measurements=True,
                             item_list=None,
+                            randomisation='labels',
+                            n_swaps=None,
+                            node_kwargs=('source_dict', 'target_dict'),
+                            seed=None,
+                            n_jobs=1,
                             **kwargs):
     """
     Performs random controls of a network by shuffling node labels and running the inference function.
@@ -447,64 +1409,129 @@ def perform_random_controls(graph,
     Requires a target_dict in the kwargs and an item_list with the possible labels.
     item_list (list, optional): A dictionary containing the measurements to randomise. Defaults to None.
     If randomise_measurements is True, this is required.
+    randomisation (str, optional): "labels" to shuffle the node labels, or "edge_swap" for a degree
+    preserving randomisation by double edge swaps. Defaults to "labels".
+    n_swaps (int, optional): Number of edge swaps, by default the number of edges.
+    node_kwargs (tuple, optional): The keyword arguments of the inference function keyed by nodes.
+    Instead of relabelling the graph, these are mapped to the permuted labels, which is equivalent
+    but leaves the graph untouched.
+    seed (int, optional): Seed for the random number generators; each iteration has its own
+    independent stream, hence the results do not depend on the number of jobs.
+    n_jobs (int, optional): Number of worker processes. The inference function and its arguments
+    must be picklable if more than 1.
     **kwargs: Additional keyword arguments to pass to the inference function.
 
     Returns:
     dict: A dictionary containing the inferred networks.
     """
+    if randomisation not in _RANDOMISATIONS:
+        raise ValueError(
+            f"Unknown randomisation: {randomisation}. "
+            f"Available: {', '.join(_RANDOMISATIONS)}."
+        )
+
     _log(f"EVAL: Performing {n_iterations} random controls")
-    # Initialize the dictionary to store the networks
-    inferred_networks = {}
 
-    # Get the list of nodes
-    nodes = list(graph.nodes)
+    if randomisation == 'labels':
+        _log(f"EVAL: Shuffling node labels")
+    else:
+        _log(f"EVAL: Randomising edges by degree preserving swaps")
 
-    _log(f"EVAL: Shuffling node labels")
-    if randomise_measurements and item_list:
+    randomise_measurements = randomise_measurements and bool(item_list)
+
+    if randomise_measurements:
         _log("EVAL: Shuffling measurements")
 
-    for i in range(n_iterations):
-        # Shuffle the node labels
-        shuffled_nodes = nodes[:]
-        random.shuffle(shuffled_nodes)
+    shared = {
+        'snapshot': _snapshot.Snapshot(graph),
+        'inference_function': inference_function,
+        'kwargs': kwargs,
+        'item_list': list(item_list) if randomise_measurements else None,
+        'randomisation': randomisation,
+        'n_swaps': n_swaps,
+        'node_kwargs': tuple(node_kwargs),
+    }
+    seeds = np.random.SeedSequence(seed).spawn(n_iterations)
+
+    try:
 
-        # Create a mapping from original to shuffled node labels
-        mapping = {original: shuffled for original, shuffled in zip(nodes, shuffled_nodes)}
+        with _parallel.executor(n_jobs, initializer=_init_shared, initargs=(shared,)) as pool:
 
-        # Relabel the nodes in the graph
-        shuffled_graph = nx.relabel_nodes(graph, mapping, copy=True)
+            inferred_networks = {
+                f"{network_name}__random{i+1:03d}": inferred_network
+                for i, inferred_network in enumerate(pool.map(_random_control_task, seeds))
+            }
 
-        # Shuffle the target_dict if required
-        if randomise_measurements and item_list:
-            shuffled_target_dict = shuffle_dict_keys(kwargs['target_dict'], item_list)
-            # Update kwargs with the shuffled target_dict
-            kwargs['target_dict'] = shuffled_target_dict
+    finally:
 
-        # Perform the network inference on the shuffled graph
-        inferred_network, _ = inference_function(shuffled_graph, **kwargs)
+        _SHARED.clear()
 
-        # Add the inferred network to the dictionary with a unique name
-        network_label = f"{network_name}__random{i+1:03d}"
-        inferred_networks[network_label] = inferred_network
-    
     _log(f"EVAL: Random controls performed")
 
     return inferred_networks
 
 
-def shuffle_dict_keys(dictionary, items):
+def get_phosphorylation_status_batch(networks, dataframe, col='stat'):
+    """
+    Calculates the phosphorylation status metrics for many networks at once.
+
+    Equivalent to `get_metric_from_networks(networks,
+    get_phosphorylation_status, dataframe=dataframe, col=col)`: the absolute
+    values are summed by node and the overall mean is computed only once,
+    and the means of all networks come from one product with a sparse
+    network x node membership matrix.
+
+    Parameters:
+    networks (Dict[str, nx.DiGraph]): A dictionary of network names and their corresponding graphs.
+    dataframe (pandas DataFrame): The dataframe containing the phosphorylation data.
+    col (str, optional): The column name in the dataframe to use to infer the metrics. Defaults to 'stat'.
+
+    Returns:
+    pandas DataFrame: A dataframe with the metrics of `get_phosphorylation_status` for each network.
+    """
+    codes, keys = pd.factorize(dataframe.index)
+    values = np.abs(dataframe[col].to_numpy(dtype=np.float64))
+    sums = np.bincount(codes, weights=values, minlength=len(keys))
+    rows = np.bincount(codes, minlength=len(keys)).astype(np.float64)
+    membership, n_nodes = _node_membership(list(networks.values()), keys)
+
+    n_in = membership @ rows
+    avg_overall = np.mean(values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_in = np.where(n_in > 0, (membership @ sums) / n_in, np.nan)
+        coverage = np.where(n_nodes > 0, n_in / n_nodes * 100, 0)
+
+    result = pd.DataFrame({
+        'avg_relabundance': avg_in,
+        'avg_relabundance_overall': avg_overall,
+        'diff_dysregulation': avg_in - avg_overall,
+        'nodes_with_phosphoinfo': n_in.astype(np.int64),
+        'coverage': coverage,
+    })
+
+    return _label_networks(result, list(networks))
+
+
+def shuffle_dict_keys(dictionary, items, rng=None):
     """
     Shuffle the keys of a dictionary.
 
     Args:
         dictionary (dict): The dictionary to shuffle.
         items (list): The list of items to shuffle.
+        rng (np.random.Generator, optional): Random number generator; by
+            default the `random` module is used.
 
     Returns:
         dict: The dictionary with shuffled keys.
     """
     old_labels = list(dictionary.keys())
-    new_labels = random.sample(items, len(dictionary))
+    new_labels = (
+        random.sample(items, len(dictionary))
+        if rng is None else
+        [items[i] for i in rng.choice(len(items), len(dictionary), replace=False)]
+    )
 
     random_dict = {new_label: dictionary[old_label] for old_label, new_label in zip(old_labels, new_labels)}
 
@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Persistent store of evaluation results.
+"""
+
+from __future__ import annotations
+
+__all__ = ['EvalStore', 'fingerprint']
+
+from collections.abc import Iterator
+import os
+import json
+import glob
+import hashlib
+import tempfile
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from networkcommons import _conf, _imports
+from networkcommons._session import _log
+
+KEY_COLS = ('dataset', 'condition', 'method', 'params', 'pkn')
+
+
+def _content(obj):
+    """
+    JSON serializable content of objects within JSON-like objects.
+    """
+
+    if (
+        isinstance(obj, (nx.Graph, pd.DataFrame, pd.Series)) or
+        hasattr(obj, '__fingerprint__')
+    ):
+
+        return fingerprint(obj)
+
+    if isinstance(obj, (np.generic, np.ndarray)):
+
+        return obj.tolist()
+
+    if isinstance(obj, (set, frozenset)):
+
+        return sorted(_json(v) for v in obj)
+
+    raise TypeError(
+        f'Can not fingerprint object of type `{type(obj).__name__}`.'
+    )
+
+
+def _json(obj) -> str:
+
+    return json.dumps(obj, sort_keys = True, default = _content)
+
+
+def fingerprint(obj) -> str:
+    """
+    Content based hash of networks, data frames and JSON-like objects.
+
+    Networks are hashed by their edges and edge attributes, independently
+    of the order of the edges. Other objects can provide their own content
+    based hash by a `__fingerprint__` method returning a string.
+
+    Args:
+        obj:
+            A networkx graph, a pandas data frame or series, an object with
+            a `__fingerprint__` method, or any object serializable to JSON,
+            e.g. a dict of parameters. Within these, also NumPy arrays and
+            sets, and any of the former.
+
+    Returns:
+        MD5 hex digest.
+
+    Raises:
+        TypeError: If the object, or any object within it, is of none of
+            the types above.
+    """
+
+    md5 = hashlib.md5()
+
+    if isinstance(obj, nx.Graph):
+
+        edges = sorted(_json([u, v, d]) for u, v, d in obj.edges(data = True))
+        md5.update(str(obj.is_directed()).encode())
+        md5.update('\n'.join(edges).encode())
+
+    elif isinstance(obj, (pd.DataFrame, pd.Series)):
+
+        md5.update(pd.util.hash_pandas_object(obj).to_numpy().tobytes())
+
+        if isinstance(obj, pd.DataFrame):
+
+            md5.update(str(list(obj.columns)).encode())
+
+    elif hasattr(obj, '__fingerprint__'):
+
+        md5.update(type(obj).__name__.encode())
+        md5.update(obj.__fingerprint__().encode())
+
+    elif isinstance(obj, dict):
+
+        md5.update(json.dumps(
+            {str(k): fingerprint(v) for k, v in obj.items()},
+            sort_keys = True,
+        ).encode())
+
+    else:
+
+        md5.update(_json(obj).encode())
+
+    return md5.hexdigest()
+
+
+class EvalStore:
+    """
+    Resumable store of evaluation results in Parquet files.
+
+    Each unit of evaluation is identified by a dataset, a condition (e.g. a
+    cell line-drug combination or a network name), a method, the parameters
+    and the fingerprint of the prior knowledge network (PKN). Every unit is
+    written to its own file as soon as it is ready, hence an interrupted
+    evaluation loses only the units in progress, and already computed units
+    can be skipped when the evaluation is run again. Requires `pyarrow`,
+    from the `parquet` extra.
+    """
+
+
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path:
+                Directory of the store. By default `eval_store` in the
+                cache directory.
+        """
+
+        _imports.require('pyarrow', 'parquet')
+        self.path = path or os.path.join(_conf.get('cachedir'), 'eval_store')
+        os.makedirs(self.path, exist_ok = True)
+
+
+    def __repr__(self) -> str:
+
+        return f'<EvalStore {self.path}>'
+
+
+    @staticmethod
+    def _key(
+            dataset: str,
+            condition: str,
+            method: str,
+            params: dict | None = None,
+            pkn: str = '',
+        ) -> dict[str, str]:
+
+        return {
+            'dataset': str(dataset),
+            'condition': str(condition),
+            'method': str(method),
+            'params': fingerprint(params or {}),
+            'pkn': str(pkn),
+        }
+
+
+    def _file(self, key: dict[str, str]) -> str:
+
+        digest = hashlib.md5(json.dumps(key, sort_keys = True).encode())
+
+        return os.path.join(
+            self.path,
+            key['dataset'],
+            key['method'],
+            f'{digest.hexdigest()}.parquet',
+        )
+
+
+    def has(
+            self,
+            dataset: str,
+            condition: str,
+            method: str,
+            params: dict | None = None,
+            pkn: str = '',
+        ) -> bool:
+        """
+        Whether a unit of evaluation has been computed already.
+        """
+
+        key = self._key(dataset, condition, method, params, pkn)
+
+        return os.path.exists(self._file(key))
+
+
+    def put(
+            self,
+            result: pd.DataFrame,
+            dataset: str,
+            condition: str,
+            method: str,
+            params: dict | None = None,
+            pkn: str = '',
+        ) -> None:
+        """
+        Persist the result of one unit of evaluation.
+
+        The key variables are added as columns to the stored table. The
+        file is written in a temporary location and then moved in place,
+        so incomplete files never appear in the store.
+        """
+
+        key = self._key(dataset, condition, method, params, pkn)
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        result = result.assign(**{f'_{k}': v for k, v in key.items()})
+        fd, tmp = tempfile.mkstemp(dir = os.path.dirname(path))
+        os.close(fd)
+
+        try:
+
+            result.to_parquet(tmp, index = False)
+            os.replace(tmp, path)
+
+        finally:
+
+            if os.path.exists(tmp):
+
+                os.remove(tmp)
+
+
+    def get(
+            self,
+            dataset: str,
+            condition: str,
+            method: str,
+            params: dict | None = None,
+            pkn: str = '',
+        ) -> pd.DataFrame | None:
+        """
+        Result of one unit of evaluation, None if not available.
+        """
+
+        key = self._key(dataset, condition, method, params, pkn)
+        path = self._file(key)
+
+        if os.path.exists(path):
+
+            result = pd.read_parquet(path)
+
+            return result.drop(columns = [f'_{k}' for k in KEY_COLS])
+
+
+    def _files(
+            self,
+            dataset: str | None = None,
+            method: str | None = None,
+        ) -> list[str]:
+
+        return sorted(glob.glob(os.path.join(
+            self.path,
+            dataset or '*',
+            method or '*',
+            '*.parquet',
+        )))
+
+
+    def iter(
+            self,
+            dataset: str | None = None,
+            method: str | None = None,
+            columns: list[str] | None = None,
+        ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over stored results, reading one unit at a time.
+
+        The key variables of the units are included as columns prefixed
+        by underscore.
+
+        Args:
+            dataset:
+                Read only this dataset.
+            method:
+                Read only this method.
+            columns:
+                Read only these columns.
+        """
+
+        for path in self._files(dataset, method):
+
+            yield pd.read_parquet(path, columns = columns)
+
+
+    def read(
+            self,
+            dataset: str | None = None,
+            method: str | None = None,
+            columns: list[str] | None = None,
+        ) -> pd.DataFrame:
+        """
+        Read stored results into one data frame.
+
+        Args:
+            dataset:
+                Read only this dataset.
+            method:
+                Read only this method.
+            columns:
+                Read only these columns.
+        """
+
+        results = list(self.iter(dataset, method, columns))
+
+        _log(f'EVAL: read {len(results)} units from store `{self.path}`.')
+
+        return (
+            pd.concat(results, ignore_index = True)
+                if results else
+            pd.DataFrame()
+        )
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Array based topological metrics of networks.
+"""
+
+from __future__ import annotations
+
+__all__ = ['get_betweenness', 'get_distance_metrics']
+
+from collections.abc import Callable
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+
+from networkcommons import _parallel
+from networkcommons.methods import _snapshot
+
+# upper limit for the number of cells in the node x source arrays
+# processed at once: 4M cells, 32 MB per float array
+_BLOCK_CELLS = 1 << 22
+
+_ADJACENCY = {}
+
+
+def _init_adjacency(indptr: np.ndarray, indices: np.ndarray) -> None:
+    """
+    Make the adjacency of a network available to all tasks in a worker.
+    """
+
+    n = len(indptr) - 1
+    adjacency = sp.csr_array(
+        (np.ones(len(indices), dtype = np.float64), indices, indptr),
+        shape = (n, n),
+    )
+    _ADJACENCY.clear()
+    _ADJACENCY['adjacency'] = adjacency
+    _ADJACENCY['adjacency_t'] = adjacency.T.tocsr()
+
+
+def _block_size(n: int) -> int:
+
+    return max(1, _BLOCK_CELLS // max(n, 1))
+
+
+def _run_blocks(
+        snapshot: _snapshot.Snapshot,
+        task: Callable[[np.ndarray], tuple],
+        sources: np.ndarray,
+        n_jobs: int | None = 1,
+    ) -> list[tuple]:
+    """
+    Run a task over blocks of source nodes, in parallel.
+
+    The blocks are small enough to keep the node x source arrays of the
+    tasks within `_BLOCK_CELLS`, and there is at least one block for each
+    worker.
+    """
+
+    size = min(
+        _block_size(len(snapshot)),
+        -(-len(sources) // _parallel.cpu_count(n_jobs)) or 1,
+    )
+    blocks = [sources[i:i + size] for i in range(0, len(sources), size)]
+
+    try:
+
+        with _parallel.executor(
+            n_jobs,
+            initializer = _init_adjacency,
+            initargs = (snapshot.indptr, snapshot.indices),
+        ) as pool:
+
+            return list(pool.map(task, blocks))
+
+    finally:
+
+        _ADJACENCY.clear()
+
+
+def _distance_block(targets: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Distances from all nodes to a block of targets, by breadth-first
+    searches along the edges backwards.
+
+    Returns:
+        The sum of the distances and the number of nodes reaching each
+        target (including itself), and the largest distance from each
+        node to the targets of the block (-1 if none reached).
+    """
+
+    dist = csgraph.shortest_path(
+        _ADJACENCY['adjacency_t'],
+        directed = True,
+        unweighted = True,
+        indices = targets,
+    )
+    reached = np.isfinite(dist)
+    dist[~reached] = -1
+
+    return (
+        np.where(reached, dist, 0).sum(axis = 1),
+        reached.sum(axis = 1),
+        dist.max(axis = 0, initial = -1).astype(np.int64),
+    )
+
+
+def _brandes_block(sources: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Dependencies of all nodes on a block of sources, by Brandes' algorithm.
+
+    Both the shortest path counting and the dependency accumulation
+    proceed level by level, with one sparse matrix product per level, for
+    all sources of the block at once.
+
+    Returns:
+        The sum and the sum of squares of the dependencies of each node
+        over the sources, and the mean dependency of the nodes for each
+        source.
+    """
+
+    adj = _ADJACENCY['adjacency']
+    adj_t = _ADJACENCY['adjacency_t']
+    n, b = adj.shape[0], len(sources)
+    cols = np.arange(b)
+
+    depth = np.full((n, b), -1, dtype = np.int32)
+    depth[sources, cols] = 0
+    sigma = np.zeros((n, b))
+    sigma[sources, cols] = 1
+    frontier = sigma.copy()
+    level = 0
+
+    while frontier.any():
+
+        level += 1
+        paths = adj_t @ frontier
+        reached = (paths > 0) & (depth < 0)
+        depth[reached] = level
+        sigma[reached] = paths[reached]
+        frontier = np.where(reached, paths, 0)
+
+    delta = np.zeros((n, b))
+
+    for level in range(level - 1, 0, -1):
+
+        weights = np.where(depth == level, (1 + delta) / np.where(sigma, sigma, 1), 0)
+        upstream = depth == level - 1
+        delta[upstream] += sigma[upstream] * (adj @ weights)[upstream]
+
+    delta[sources, cols] = 0
+
+    return (
+        delta.sum(axis = 1),
+        np.square(delta).sum(axis = 1),
+        delta.mean(axis = 0),
+    )
+
+
+def _betweenness_scale(
+        n: int,
+        directed: bool,
+        normalized: bool,
+    ) -> float:
+    """
+    Scaling factor of the accumulated dependencies, as in networkx.
+    """
+
+    if normalized:
+
+        return 1 / ((n - 1) * (n - 2)) if n > 2 else 1.
+
+    return 1. if directed else .5
+
+
+def get_betweenness(
+        network: nx.Graph | _snapshot.Snapshot,
+        k: int | None = None,
+        seed: int | None = None,
+        normalized: bool = True,
+        n_jobs: int | None = 1,
+    ) -> pd.DataFrame:
+    """
+    Shortest path betweenness centrality of the nodes of a network.
+
+    Exact values are computed by Brandes' algorithm over the compressed
+    sparse row snapshot of the network, processing blocks of sources in
+    parallel. The approximation samples `k` pivot sources uniformly and
+    extrapolates their dependencies, as `nx.betweenness_centrality` does
+    with `k`; the standard error of the estimate is computed from the
+    variance of the dependencies across pivots. Edge weights are ignored.
+
+    Args:
+        network:
+            A networkx graph or its snapshot.
+        k:
+            Number of pivot sources; by default all nodes, i.e. the exact
+            betweenness.
+        seed:
+            Seed for sampling the pivots.
+        normalized:
+            Normalize by the number of node pairs, as networkx does.
+        n_jobs:
+            Number of worker processes, each processing a block of sources.
+
+    Returns:
+        Data frame indexed by the nodes, with the betweenness and its
+        standard error (zero for exact values). The mean betweenness and
+        its standard error are available as the `mean` and `mean_stderr`
+        items of the `attrs` of the data frame.
+    """
+
+    snapshot = (
+        network
+            if isinstance(network, _snapshot.Snapshot) else
+        _snapshot.Snapshot(network)
+    )
+    n = len(snapshot)
+    exact = k is None or k >= n
+    sources = (
+        np.arange(n)
+            if exact else
+        np.sort(np.random.default_rng(seed).choice(n, k, replace = False))
+    )
+    total = np.zeros(n)
+    total_sq = np.zeros(n)
+    per_source = []
+
+    for block_sum, block_sq, block_means in _run_blocks(
+        snapshot,
+        _brandes_block,
+        sources,
+        n_jobs,
+    ):
+
+        total += block_sum
+        total_sq += block_sq
+        per_source.append(block_means)
+
+    scale = _betweenness_scale(n, snapshot.directed, normalized)
+    m = len(sources)
+    per_source = np.concatenate(per_source) if per_source else np.zeros(0)
+
+    if exact:
+
+        betweenness = total * scale
+        stderr = np.zeros(n)
+        mean_stderr = 0.
+
+    else:
+
+        # each pivot is an unbiased estimate of n times its dependencies
+        scale *= n
+        betweenness = total / m * scale
+        correction = (1 - m / n) / m
+        variance = (total_sq - total ** 2 / m) / max(m - 1, 1)
+        stderr = np.sqrt(np.clip(variance, 0, None) * correction) * scale
+        mean_stderr = (
+            np.std(per_source, ddof = 1) * np.sqrt(correction) * scale
+                if m > 1 else
+            np.nan
+        )
+
+    result = pd.DataFrame(
+        {'betweenness': betweenness, 'stderr': stderr},
+        index = pd.Index(snapshot.labels, name = 'node'),
+    )
+    result.attrs['mean'] = betweenness.mean() if n else np.nan
+    result.attrs['mean_stderr'] = mean_stderr
+
+    return result
+
+
+def get_distance_metrics(
+        network: nx.Graph | _snapshot.Snapshot,
+        wf_improved: bool = True,
+        n_jobs: int | None = 1,
+    ) -> pd.DataFrame:
+    """
+    Closeness centrality and eccentricity from one all-pairs distance pass.
+
+    The hop distances are computed by `scipy.sparse.csgraph` over the
+    compressed sparse row snapshot of the network, in blocks of nodes of
+    bounded memory, processed in parallel. Only the sums, counts and
+    maxima of the distances are kept, never the whole distance matrix.
+
+    Closeness is computed from the incoming distances as in
+    `nx.closeness_centrality`. Eccentricity is the largest distance from a
+    node to the nodes reachable from it, hence it is defined also for
+    networks which are not (strongly) connected; the diameter is the
+    largest eccentricity.
+
+    Args:
+        network:
+            A networkx graph or its snapshot.
+        wf_improved:
+            Scale the closeness by the fraction of nodes reaching the node,
+            the Wasserman and Faust formula, as networkx does by default.
+        n_jobs:
+            Number of worker processes, each processing a block of nodes.
+
+    Returns:
+        Data frame indexed by the nodes, with their closeness and
+        eccentricity. The diameter is available as the `diameter` item of
+        the `attrs` of the data frame.
+    """
+
+    snapshot = (
+        network
+            if isinstance(network, _snapshot.Snapshot) else
+        _snapshot.Snapshot(network)
+    )
+    n = len(snapshot)
+    blocks = _run_blocks(snapshot, _distance_block, np.arange(n), n_jobs)
+    total = np.concatenate([b[0] for b in blocks]) if blocks else np.zeros(0)
+    reaching = np.concatenate([b[1] for b in blocks]) if blocks else np.zeros(0)
+    eccentricity = np.zeros(n, dtype = np.int64)
+
+    for _, _, block_max in blocks:
+
+        np.maximum(eccentricity, block_max, out = eccentricity)
+
+    others = reaching - 1.0
+    closeness = np.divide(
+        others,
+        total,
+        out = np.zeros(n),
+        where = total > 0,
+    )
+
+    if wf_improved and n > 1:
+
+        closeness *= others / (n - 1)
+
+    result = pd.DataFrame(
+        {'closeness': closeness, 'eccentricity': eccentricity},
+        index = pd.Index(snapshot.labels, name = 'node'),
+    )
+    result.attrs['diameter'] = eccentricity.max() if n else 0
+
+    return result
@@ -22,22 +22,140 @@ from __future__ import annotations
 
 __all__ = [
     'run_signalingprofiler',
+    'run_signalingprofiler_batch',
 ]
 
 from typing import Literal
 from collections.abc import Collection
 from collections import ChainMap
+import os
+import time
+import pickle
+import hashlib
 import functools as ft
 
+import numpy as np
 import pandas as pd
 import networkx as nx
 from pypath_common import _misc
 
+from networkcommons import _conf, _parallel
 from networkcommons._session import _log
-from networkcommons.methods import _causal, _graph
+from networkcommons.methods import _causal, _graph, _snapshot
 from networkcommons.data.omics import _common as _downloader
 
 
+_GO_MF_URL = (
+    'https://filedn.eu/ld7S7VEWtgOf5uN0V7fbp84/'
+    'gomf_annotation_networkcommons.tsv'
+)
+_MF_INDEX = {}
+_ENGINES = ('networkx', 'layered')
+
+
+def _mf_index_path() -> str:
+
+    cachedir = _conf.get('cachedir')
+    md5 = hashlib.md5(_GO_MF_URL.encode()).hexdigest()
+
+    return os.path.join(cachedir, f'{md5}-gomf_index.pickle')
+
+
+def _mf_source_stamp() -> tuple[int, int] | None:
+    """
+    Modification time and size of the downloaded GO MF table; None if it
+    has not been downloaded yet.
+    """
+
+    path = _downloader._cache_path(_GO_MF_URL)
+
+    if os.path.exists(path):
+
+        stat = os.stat(path)
+
+        return stat.st_mtime_ns, stat.st_size
+
+
+def _mf_index(update: bool = False) -> tuple[tuple[str, ...], pd.Series]:
+    """
+    Gene to molecular function (MF) index derived from Gene Ontology.
+
+    The GO MF table is parsed only once per process, and the index is pickled
+    next to the downloaded table, hence later sessions can skip the parsing
+    and grouping as well. The index is rebuilt if the modification time or
+    the size of the table changed since the index was built.
+
+    Args:
+        update: Rebuild the index from the GO MF table, ignoring both the
+            in-memory and the on-disk cache.
+
+    Returns:
+        A tuple of MF category labels and a Series of integer bitmasks
+        indexed by gene names: the i-th bit of a mask is set if the gene
+        belongs to the i-th category.
+    """
+
+    path = _mf_index_path()
+    stamp = _mf_source_stamp()
+    cached = None if update else _MF_INDEX.get(path)
+
+    if cached is not None and cached[0] == stamp:
+
+        return cached[1:]
+
+    cached = None
+
+    if not update and os.path.exists(path):
+
+        _log('SignalingProfiler: loading GO molecular function index...')
+
+        with open(path, 'rb') as fp:
+
+            cached = pickle.load(fp)
+
+        if cached[0] != stamp:
+
+            _log('SignalingProfiler: GO molecular function table changed.')
+            cached = None
+
+    if cached is None:
+
+        _log('SignalingProfiler: building GO molecular function index...')
+
+        GO_mf_df = _downloader._open(_GO_MF_URL, ftype = 'tsv')
+        GO_mf_df = GO_mf_df[['gene_name', 'mf']].drop_duplicates()
+        mf = pd.Categorical(GO_mf_df['mf'])
+        labels = tuple(mf.categories)
+
+        if len(labels) > 64:
+
+            raise ValueError(
+                f'Too many molecular function categories ({len(labels)}) '
+                'for 64 bit masks.'
+            )
+
+        dtype = np.min_scalar_type(1 << max(len(labels) - 1, 0))
+        # shift in the mask type: the codes might be narrower
+        bits = np.left_shift(dtype.type(1), mf.codes.astype(dtype))
+        # genes have one row per MF, hence the sum of bits equals their union
+        index = (
+            pd.Series(bits, index = GO_mf_df['gene_name'].to_numpy())
+            .groupby(level = 0)
+            .sum()
+            .astype(dtype)
+        )
+        # the table is downloaded by `_open` if it was missing
+        cached = (_mf_source_stamp(), labels, index)
+
+        with open(path, 'wb') as fp:
+
+            pickle.dump(cached, fp)
+
+    _MF_INDEX[path] = cached
+
+    return cached[1:]
+
+
 def _mf_classifier(
         proteins: dict[str, float],
         with_exp: bool = False,
@@ -63,35 +181,22 @@ def _mf_classifier(
 
         proteins = {k: v for k, v in proteins.items() if k in only_proteins}
 
-    # Read the GO molecular function (MF) data
-    GO_mf_df = _downloader._open(
-        (
-            'https://filedn.eu/ld7S7VEWtgOf5uN0V7fbp84/'
-            'gomf_annotation_networkcommons.tsv'
-        ),
-        ftype = 'tsv',
-    )
-
-    mf_dict = GO_mf_df.groupby('mf')['gene_name'].apply(set).to_dict()
+    labels, index = _mf_index()
+    genes = np.array(list(proteins), dtype = object)
+    masks = index.reindex(genes, fill_value = 0).to_numpy()
 
     proteins_dict = {
         mf: {
             gene: proteins[gene] if with_exp else ''
-            for gene in genes
-            if gene in proteins
+            for gene in genes[(masks >> i) & 1 == 1]
         }
-        for mf, genes in mf_dict.items()
+        for i, mf in enumerate(labels)
     }
 
     # Identify unclassified proteins
-    classified_proteins = {
-        gene
-        for genes in proteins_dict.values()
-        for gene in set(genes)
-    }
-    unclassified_proteins = set(proteins) - classified_proteins
+    unclassified_proteins = genes[masks == 0]
 
-    if unclassified_proteins:
+    if len(unclassified_proteins):
 
         proteins_dict['other'] = (
             {
@@ -110,6 +215,7 @@ def _validate_inputs(
         graph: nx.Graph,
         layers: int,
         max_length: int | list[int],
+        engine: str = 'networkx',
     ) -> None:
 
     err = []
@@ -159,6 +265,11 @@ def _validate_inputs(
     if isinstance(max_length, int) and max_length <= 0:
         err.append("'max_length' must be a positive integer.")
 
+    if engine not in _ENGINES:
+        err.append(
+            f"The 'engine' parameter must be one of {', '.join(_ENGINES)}."
+        )
+
     if err:
 
         msg = 'Problem(s) with SignalingProfiler inputs: '
@@ -170,12 +281,161 @@ def _validate_inputs(
         raise ValueError(f'{msg}{"; ".join(err)}')
 
 
+class _LayeredPathSearch:
+    """
+    All paths search for the layers of SignalingProfiler.
+
+    Works on an array snapshot of the graph built once, and collects the
+    edges of the paths instead of the paths themselves. The depth-first
+    search is pruned by the distance of each node to the nearest target,
+    hence only branches that can still reach a target within the cutoff are
+    explored. The forward reach of each source and the edges found from it
+    are cached, and reused by later stages and later calls.
+    """
+
+
+    def __init__(self, graph: nx.Graph | _snapshot.Snapshot):
+
+        self.snapshot = (
+            graph
+                if isinstance(graph, _snapshot.Snapshot) else
+            _snapshot.Snapshot(graph)
+        )
+        self._reach = {}
+        self._edges = {}
+
+
+    def _forward(self, source: int, cutoff: int) -> np.ndarray:
+
+        key = (source, cutoff)
+
+        if key not in self._reach:
+
+            self._reach[key] = self.snapshot.distances(
+                np.array([source]),
+                cutoff = cutoff,
+            )
+
+        return self._reach[key]
+
+
+    def stage(
+            self,
+            sources: Collection,
+            targets: Collection,
+            cutoff: int,
+        ) -> set[tuple[int, int]]:
+        """
+        Edges of all simple paths between sources and targets.
+
+        Equivalent to the edges of the network returned by
+        `run_all_paths`; sources and targets missing from the graph are
+        ignored.
+
+        Args:
+            sources:
+                Source nodes.
+            targets:
+                Target nodes.
+            cutoff:
+                Maximum length of the paths.
+
+        Returns:
+            Pairs of source and target node codes.
+        """
+
+        snap = self.snapshot
+        tgt = snap.codes(targets)
+        is_target = np.zeros(len(snap), dtype = bool)
+        is_target[tgt] = True
+        to_target = None
+        edges = set()
+
+        for source in snap.codes(sources):
+
+            fwd = self._forward(source, cutoff)
+            reached = np.unique(tgt[fwd[tgt] > 0])
+
+            if not len(reached):
+
+                continue
+
+            key = (source, cutoff, reached.tobytes())
+
+            if key not in self._edges:
+
+                if to_target is None:
+
+                    to_target = snap.distances(
+                        tgt,
+                        cutoff = cutoff,
+                        reverse = True,
+                    ).tolist()
+
+                self._edges[key] = frozenset(
+                    self._dfs(source, is_target.tolist(), to_target, cutoff)
+                )
+
+            edges |= self._edges[key]
+
+        return edges
+
+
+    def _dfs(
+            self,
+            source: int,
+            is_target: list[bool],
+            to_target: list[int],
+            cutoff: int,
+        ) -> set[tuple[int, int]]:
+
+        successors = self.snapshot.successors
+        edges = set()
+        path = [source]
+        on_path = {source}
+        stack = [iter(successors[source])]
+
+        while stack:
+
+            for node in stack[-1]:
+
+                dist = to_target[node]
+
+                if (
+                    node in on_path or
+                    dist < 0 or
+                    len(path) + dist > cutoff
+                ):
+
+                    continue
+
+                if is_target[node]:
+
+                    edges.update(zip(path, path[1:] + [node]))
+
+                if len(path) < cutoff:
+
+                    path.append(node)
+                    on_path.add(node)
+                    stack.append(iter(successors[node]))
+                    break
+
+            else:
+
+                stack.pop()
+                on_path.discard(path.pop())
+
+        return edges
+
+
 def _generate_naive_network(
         sources: dict,
         measurements: dict,
         graph: nx.Graph,
         layers: int,
         max_length: int | list[int],
+        engine: Literal['networkx', 'layered'] = 'networkx',
+        search: _LayeredPathSearch | None = None,
     ) -> nx.Graph:
 
     """
@@ -193,6 +453,13 @@ def _generate_naive_network(
         max_length: The depth cutoff for finding paths.
             If `layers` is 1, this should be an int. For 2 or 3,
             it should be a list of ints.
+        engine: Path search implementation. "networkx" runs
+            `run_all_paths` for each layer and composes the resulting
+            networks, "layered" searches all layers on one array snapshot
+            of the graph and builds the network once, from the union of
+            the edges.
+        search: An existing search object for the "layered" engine, to
+            reuse its snapshot and caches across calls on the same graph.
 
     Returns:
         The constructed multi-layered network.
@@ -200,7 +467,7 @@ def _generate_naive_network(
 
     _log('SignalingProfiler naive network building via all paths algorithm...')
 
-    _validate_inputs(sources, measurements, graph, layers, max_length)
+    _validate_inputs(sources, measurements, graph, layers, max_length, engine)
 
 
     def _by_func(
@@ -228,18 +495,42 @@ def _generate_naive_network(
     stages = (stages[0],) + stages[-layers:]
     networks = []
 
+    if engine == 'layered':
+
+        search = search or _LayeredPathSearch(graph)
+        edges = set()
+
     for i, (src_funcs, tgt_funcs) in enumerate(zip(stages[:-1], stages[1:])):
 
         _log(f'SignalingProfiler naive network: stage {i + 1}')
 
-        networks.append(
-            _graph.run_all_paths(
+        # the last cutoff applies to all further stages
+        cutoff = max_length[min(i, len(max_length) - 1)]
+
+        if engine == 'layered':
+
+            stage_edges = search.stage(
+                _by_func(sources, src_funcs),
+                _by_func(targets, tgt_funcs),
+                cutoff,
+            )
+            edges |= stage_edges
+            stage_nodes = set(
+                search.snapshot.labels[
+                    list({node for edge in stage_edges for node in edge})
+                ]
+            )
+
+        else:
+
+            network, _ = _graph.run_all_paths(
                 graph,
                 _by_func(sources, src_funcs),
                 _by_func(targets, tgt_funcs),
-                depth_cutoff = max_length[i],
+                depth_cutoff = cutoff,
             )
-        )
+            networks.append(network)
+            stage_nodes = network.nodes()
 
         if i == layers - 1:
 
@@ -248,10 +539,14 @@ def _generate_naive_network(
         sources = _mf_classifier(
             measurements,
             with_exp = True,
-            only_proteins = networks[-1].nodes(),
+            only_proteins = stage_nodes,
         )
 
-    naive_network = ft.reduce(nx.compose, networks)
+    naive_network = (
+        search.snapshot.to_networkx(sorted(edges))
+            if engine == 'layered' else
+        ft.reduce(nx.compose, networks)
+    )
 
     _log('SignalingProfiler naive network building ready.')
 
@@ -267,6 +562,7 @@ def run_signalingprofiler(
         betaWeight: float = 0.2,
         solver: str | None = None,
         verbose: bool = False,
+        engine: Literal['networkx', 'layered'] = 'networkx',
     ) -> nx.Graph:
     """
     Contextualize networks by the SignalingProfiler algorithm.
@@ -286,6 +582,11 @@ def run_signalingprofiler(
         max_length: The depth cutoff for finding paths. If `layers` is 1,
             this should be an int. For 2 or 3, it should be a list of
             ints.
+        engine: Implementation of the naive network building. "networkx"
+            enumerates the paths of each layer separately, "layered"
+            collects the edges of all layers in a single pruned search over
+            an array snapshot of the graph, which is considerably faster for
+            longer cutoffs. Both give the same network.
 
     Returns:
         The constructed multi-layered network.
@@ -298,6 +599,7 @@ def run_signalingprofiler(
         graph = graph,
         layers = layers,
         max_length = max_length,
+        engine = engine,
     )
 
     # Optimize network using CORNETO
@@ -311,3 +613,127 @@ def run_signalingprofiler(
     )
 
     return opt_net
+
+
+def _timed_carnival(*args, **kwargs) -> tuple[nx.Graph, float]:
+
+    t0 = time.perf_counter()
+    opt_net = _causal.run_corneto_carnival(*args, **kwargs)
+
+    return opt_net, time.perf_counter() - t0
+
+
+def run_signalingprofiler_batch(
+        sources: dict | dict[str, dict],
+        measurements: dict[str, dict],
+        graph: nx.Graph,
+        layers: int,
+        max_length: int | list[int],
+        betaWeight: float = 0.2,
+        solver: str | None = None,
+        verbose: bool = False,
+        engine: Literal['networkx', 'layered'] = 'layered',
+        n_jobs: int | None = None,
+    ) -> tuple[dict[str, nx.Graph], pd.DataFrame]:
+    """
+    Run SignalingProfiler for many samples against the same network.
+
+    The molecular function index and, with the "layered" engine, the array
+    snapshot of the graph and the path search caches are shared across
+    the samples. The naive networks are built in the main process, then the
+    CARNIVAL optimisations run in parallel, in a pool of processes.
+
+    Args:
+        sources: A dictionary containing the sources and sign of
+            perturbation, either one for all samples, or a dictionary of
+            such dictionaries with sample names as keys.
+        measurements: A dictionary with sample names as keys and
+            dictionaries of targets and sign of measurements as values.
+        graph: The network.
+        layers: specifies the number of layers to generate.
+            Must be > 0 and < 4.
+        max_length: The depth cutoff for finding paths. If `layers` is 1,
+            this should be an int. For 2 or 3, it should be a list of
+            ints.
+        engine: Implementation of the naive network building, see
+            `run_signalingprofiler`. Both engines build the same naive
+            networks; by default "layered", as its snapshot of the graph and
+            its path caches are shared by all samples.
+        n_jobs: Number of processes for the CARNIVAL step. By default
+            the `cpu_count` config value or the number of CPUs. With 1, all
+            samples are processed in the current process.
+
+    Returns:
+        A dictionary of the optimised networks with sample names as keys,
+        and a data frame with the time in seconds each stage took for each
+        sample.
+    """
+
+    per_sample = all(isinstance(v, dict) for v in sources.values())
+    missing = set(measurements) - set(sources) if per_sample else set()
+
+    if missing:
+
+        missing = ', '.join(map(str, missing))
+
+        raise ValueError(f'No sources provided for sample(s): {missing}.')
+
+    n_jobs = _parallel.cpu_count(n_jobs)
+    search = _LayeredPathSearch(graph) if engine == 'layered' else None
+    _mf_index()
+
+    _log(
+        f'SignalingProfiler: running for {len(measurements)} samples, '
+        f'CARNIVAL in {n_jobs} processes.'
+    )
+
+    naive_networks = {}
+    timings = []
+
+    for sample, sample_measurements in measurements.items():
+
+        t0 = time.perf_counter()
+        naive_networks[sample] = _generate_naive_network(
+            sources = sources[sample] if per_sample else sources,
+            measurements = sample_measurements,
+            graph = graph,
+            layers = layers,
+            max_length = max_length,
+            engine = engine,
+            search = search,
+        )
+        timings.append((sample, 'naive_network', time.perf_counter() - t0))
+
+    carnival = ft.partial(
+        _timed_carnival,
+        betaWeight = betaWeight,
+        solver = solver,
+        verbose = verbose,
+    )
+    args = {
+        sample: (
+            naive_networks[sample],
+            sources[sample] if per_sample else sources,
+            measurements[sample],
+        )
+        for sample in measurements
+    }
+
+    with _parallel.executor(n_jobs) as executor:
+
+        futures = {
+            sample: executor.submit(carnival, *a)
+            for sample, a in args.items()
+        }
+        results = {sample: f.result() for sample, f in futures.items()}
+
+    opt_nets = {sample: net for sample, (net, _) in results.items()}
+    timings.extend(
+        (sample, 'carnival', elapsed)
+        for sample, (_, elapsed) in results.items()
+    )
+    timings = pd.DataFrame(timings, columns = ['sample', 'stage', 'time'])
+
+    _log('SignalingProfiler: batch finished.')
+
+    return opt_nets, timings
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Compact, array based snapshots of networkx graphs.
+"""
+
+from __future__ import annotations
+
+__all__ = ['Snapshot']
+
+from collections.abc import Hashable, Iterable
+import functools as ft
+
+import numpy as np
+import networkx as nx
+import scipy.sparse as sp
+from pypath_common import _misc
+
+
+class Snapshot:
+    """
+    Read-only compressed sparse row (CSR) representation of a graph.
+
+    Nodes are mapped to consecutive integer codes in the order of
+    `graph.nodes`; edges are stored sorted by source and target code.
+    Undirected edges are stored in both directions. The snapshot does not
+    follow later modifications of the graph.
+    """
+
+
+    def __init__(
+            self,
+            graph: nx.Graph,
+            edge_attrs: str | Iterable[str] = (),
+        ):
+        """
+        Args:
+            graph:
+                A networkx graph.
+            edge_attrs:
+                Edge attributes to copy into arrays aligned with the edges,
+                available in `edge_data`. Missing values become NaN.
+        """
+
+        self.graph = graph
+        self.directed = graph.is_directed()
+        self.labels = np.empty(graph.number_of_nodes(), dtype = object)
+        self.labels[:] = list(graph.nodes)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+
+        edge_attrs = _misc.to_list(edge_attrs)
+        edges = list(graph.edges(data = True))
+        src = np.fromiter(
+            (self.index[u] for u, _, _ in edges),
+            dtype = np.int64,
+            count = len(edges),
+        )
+        tgt = np.fromiter(
+            (self.index[v] for _, v, _ in edges),
+            dtype = np.int64,
+            count = len(edges),
+        )
+        data = {
+            attr: np.array(
+                [d.get(attr, np.nan) for _, _, d in edges],
+                dtype = float,
+            )
+            for attr in edge_attrs
+        }
+
+        if not self.directed:
+
+            loops = src == tgt
+            src, tgt = (
+                np.concatenate([src, tgt[~loops]]),
+                np.concatenate([tgt, src[~loops]]),
+            )
+            data = {
+                attr: np.concatenate([values, values[~loops]])
+                for attr, values in data.items()
+            }
+
+        order = np.lexsort((tgt, src))
+        self.src = src[order]
+        self.indices = tgt[order]
+        self.indptr = np.zeros(len(self.labels) + 1, dtype = np.int64)
+        np.cumsum(
+            np.bincount(self.src, minlength = len(self.labels)),
+            out = self.indptr[1:],
+        )
+        self.edge_data = {attr: values[order] for attr, values in data.items()}
+
+
+    def __len__(self) -> int:
+
+        return len(self.labels)
+
+
+    def __repr__(self) -> str:
+
+        return f'<Snapshot {len(self)}N x {len(self.indices)}E>'
+
+
+    @property
+    def ecount(self) -> int:
+        """
+        Number of stored (directed) edges.
+        """
+
+        return len(self.indices)
+
+
+    @ft.cached_property
+    def adjacency(self) -> sp.csr_array:
+        """
+        Adjacency matrix, rows are sources, columns are targets.
+        """
+
+        return sp.csr_array(
+            (
+                np.ones(self.ecount, dtype = np.int8),
+                self.indices,
+                self.indptr,
+            ),
+            shape = (len(self), len(self)),
+        )
+
+
+    @ft.cached_property
+    def adjacency_t(self) -> sp.csr_array:
+        """
+        Transposed adjacency matrix, rows are targets, columns are sources.
+        """
+
+        return self.adjacency.T.tocsr()
+
+
+    @ft.cached_property
+    def successors(self) -> list[list[int]]:
+        """
+        Successor codes of each node as plain lists, for pure Python loops.
+        """
+
+        return [
+            self.indices[self.indptr[i]:self.indptr[i + 1]].tolist()
+            for i in range(len(self))
+        ]
+
+
+    def codes(self, nodes: Iterable[Hashable]) -> np.ndarray:
+        """
+        Integer codes of nodes; nodes missing from the graph are dropped.
+        """
+
+        return np.fromiter(
+            (self.index[n] for n in nodes if n in self.index),
+            dtype = np.int64,
+        )
+
+
+    def mask(self, nodes: Iterable[Hashable]) -> np.ndarray:
+        """
+        Boolean indicator array of nodes; missing nodes are ignored.
+        """
+
+        mask = np.zeros(len(self), dtype = bool)
+        mask[self.codes(nodes)] = True
+
+        return mask
+
+
+    def distances(
+            self,
+            sources: Iterable[Hashable] | np.ndarray,
+            cutoff: int | None = None,
+            reverse: bool = False,
+        ) -> np.ndarray:
+        """
+        Multi-source breadth-first search distances.
+
+        Each level of the search is a single sparse matrix-vector product.
+
+        Args:
+            sources:
+                Node labels, or integer codes if a numpy array.
+            cutoff:
+                Maximum depth of the search.
+            reverse:
+                Follow edges backwards, i.e. compute the distance from each
+                node to the nearest of `sources`.
+
+        Returns:
+            The hop distance of each node from the nearest source, -1 for
+            nodes not reached.
+        """
+
+        sources = (
+            sources
+                if isinstance(sources, np.ndarray) else
+            self.codes(sources)
+        )
+        adj = self.adjacency if reverse else self.adjacency_t
+        dist = np.full(len(self), -1, dtype = np.int64)
+        dist[sources] = 0
+        frontier = np.zeros(len(self), dtype = np.int32)
+        frontier[sources] = 1
+        depth = 0
+
+        while frontier.any() and (cutoff is None or depth < cutoff):
+
+            depth += 1
+            reached = (adj @ frontier > 0) & (dist < 0)
+            dist[reached] = depth
+            frontier = reached.astype(np.int32)
+
+        return dist
+
+
+    def to_networkx(self, edges: Iterable[tuple[int, int]]) -> nx.Graph:
+        """
+        Subgraph of the original graph built from a collection of edges.
+
+        Args:
+            edges:
+                Pairs of source and target codes.
+
+        Returns:
+            A new graph of the same directedness as the original, with the
+            attributes of the selected edges.
+        """
+
+        graph = nx.DiGraph() if self.directed else nx.Graph()
+        labels = self.labels
+        graph.add_edges_from(
+            (u, v, self.graph.get_edge_data(u, v))
+            for u, v in ((labels[i], labels[j]) for i, j in edges)
+        )
+
+        return graph
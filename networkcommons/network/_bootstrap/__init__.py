@@ -17,8 +17,9 @@
 Preprocess arguments of the Network object into its internal representation.
 """
 
-__all__ = ['Bootstrap', 'BootstrapDf', 'BootstrapCopy']
+__all__ = ['Bootstrap', 'BootstrapDf', 'BootstrapCopy', 'BootstrapStream']
 
 from ._df import BootstrapDf
 from ._edgelist import Bootstrap
 from ._copy import BootstrapCopy
+from ._stream import BootstrapStream
@@ -42,6 +42,15 @@ class BootstrapBase(abc.ABC):
             _nodes:
                 Adjacency information. A dict with node IDs as keys and tuples
                 of two sets of edge IDs (source vs target side) as values.
+            _incidence:
+                Array based incidence, if the bootstrap builds it directly;
+                `_edges` and `_nodes` are views of it then.
+            _shared:
+                Attribute data frames shared with another network, these
+                have to be copied before modification.
+            _indexes:
+                Secondary indexes of attribute columns by entity and
+                attribute name, if the bootstrap provides them.
             _node_attrs:
                 Data frame of node attributes.
             _edge_attrs:
@@ -54,6 +63,9 @@ class BootstrapBase(abc.ABC):
 
         self._edges = {}
         self._nodes = {}
+        self._incidence = None
+        self._shared = set()
+        self._indexes = {}
         self._node_attrs = pd.DataFrame()
         self._edge_attrs = pd.DataFrame()
         self._edge_node_attrs = pd.DataFrame()
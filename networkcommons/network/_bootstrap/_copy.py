@@ -19,8 +19,6 @@ Create Network object by copying another Network object.
 
 __all__ = ['BootstrapCopy']
 
-import copy
-
 from . import _base as _bsbase
 
 
@@ -34,10 +32,27 @@ class BootstrapCopy(_bsbase.BootstrapBase):
 
 
     def _bootstrap(self, edges):
-
-        self._edges = copy.deepcopy(edges.edges)
-        self._nodes = copy.deepcopy(edges.nodes)
-        self._node_attrs = copy.deepcopy(edges.node_attrs)
-        self._edge_attrs = copy.deepcopy(edges.edge_attrs)
-        self._edge_node_attrs = copy.deepcopy(edges.edge_node_attrs)
+        """
+        Clone a network without copying its data.
+
+        The incidence arrays are read-only, hence always shared. The
+        attribute data frames and their indexes are shared until either
+        instance accesses a frame by its public property (`edge_attrs`,
+        etc.). Then the frame is copied, unless the copy-on-write mode of
+        pandas is enabled, in which case pandas copies it at the first
+        modification (see `NetworkBase._share`). Hence the cost of cloning
+        depends on which frames the clone or the original accesses
+        afterwards, not on their size; reading frames only internally, e.g.
+        by `select_edges` or the exports, does not copy them.
+        """
+
+        shared = edges._share()
+        self._incidence = edges._incidence
+        self._edges = self._incidence.edges
+        self._nodes = self._incidence.nodes
+        self._node_attrs = shared['node']
+        self._edge_attrs = shared['edge']
+        self._edge_node_attrs = shared['edge_node']
+        self._shared = set(edges._shared)
+        self._indexes = dict(edges._indexes)
         self.node_key = edges.node_key
@@ -21,13 +21,15 @@ Preprocess inputs for the Network object from data frames.
 
 __all__ = ['BootstrapDf']
 
-import copy
+from collections.abc import Iterable
 
+import numpy as np
 import pandas as pd
 from pypath_common import _misc
 from pypath_common import _constants
 
 from .. import _constants as _nconstants
+from .. import _incidence
 from . import _base as _bsbase
 
 
@@ -111,12 +113,8 @@ class BootstrapDf(_bsbase.BootstrapBase):
             ignore: list[str] | None = None,
         ):
 
-        nodes = copy.deepcopy(nodes)
-        edges = copy.deepcopy(edges)
-
-        self._set_node_key(node_key)
-        self.node_key_sep = node_key_sep
-        self.inner_sep = inner_sep
+        # the input data frames are never modified, hence no need to copy them
+        self._init_keys(node_key, inner_sep, node_key_sep)
         self._bootstrap_nodes(
             nodes = nodes,
             node_key_col = node_key_col,
@@ -130,63 +128,245 @@ class BootstrapDf(_bsbase.BootstrapBase):
         )
 
 
+    def _init_keys(
+            self,
+            node_key: str | tuple[str] | None,
+            inner_sep: str | None,
+            node_key_sep: str | None,
+        ):
+        """
+        Set up the node key processing and the interning of node keys.
+        """
+
+        self._set_node_key(node_key)
+        self.node_key_sep = node_key_sep
+        self.inner_sep = inner_sep
+        self._node_keys = []
+        self._node_codes = {}
+        self._raw_codes = {}
+        self._node_attr_codes = np.array([], dtype = np.int64)
+
+
     def _bootstrap_edges(
             self,
-            edges: pd.DataFrame,
+            edges: pd.DataFrame | None,
             source_key: str = 'source',
             target_key: str = 'target',
             ignore: list[str] | None = None,
         ):
 
-        edges.insert(0, _nconstants.EDGE_ID, range(len(edges)))
-
-        for col in (source_key, target_key):
+        if edges is None:
 
-            edges[col] = edges[col].apply(self._proc_nodes_in_edge)
+            edges = pd.DataFrame(columns = [source_key, target_key])
 
-        ignore = _misc.to_set(ignore) & set(edges.columns)
-        edges = edges.drop(columns = ignore)
-
-        new_nodes = (
-            (
-                set.union(*edges[source_key]) |
-                set.union(*edges[target_key])
-            ) -
-            set(self._nodes.keys())
+        n_existing = len(self._node_keys)
+        self._bootstrap_incidence(
+            *self._edge_pairs(edges, source_key, target_key),
+            len(edges),
+        )
+        self._add_new_nodes(n_existing)
+        self._edge_attrs = self._edge_attr_cols(
+            edges,
+            source_key,
+            target_key,
+            ignore,
         )
+        self._edge_attrs.insert(0, _nconstants.EDGE_ID, np.arange(len(edges)))
+
+
+    def _edge_pairs(
+            self,
+            edges: pd.DataFrame,
+            source_key: str,
+            target_key: str,
+        ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Node-edge pairs of the edges data frame, interning new node keys.
+
+        Returns:
+            The edge position, node code and side of each pair.
+        """
 
-        self._nodes = {
-            **self._nodes,
-            **{n: (set(), set()) for n in new_nodes}
-        }
+        eids, codes, sides = [], [], []
 
+        for si, col in enumerate((source_key, target_key)):
 
+            eid, code = self._nodes_long(edges[col])
+            eids.append(eid)
+            codes.append(code)
+            sides.append(
+                np.full(len(eid), si if self.directed else 0, dtype = np.int8),
+            )
+
+        return np.concatenate(eids), np.concatenate(codes), np.concatenate(sides)
+
+
+    def _add_new_nodes(self, n_existing: int):
+        """
+        Add the nodes interned after the first `n_existing` to the node
+        attributes.
+        """
+
+        new_keys = self._node_keys[n_existing:]
         self._node_attrs = pd.concat([
             self._node_attrs,
-            pd.DataFrame([dict(zip(self.node_key, n)) for n in new_nodes])
+            pd.DataFrame.from_records(
+                [_misc.to_tuple(k) for k in new_keys],
+                columns = list(self.node_key),
+            ),
         ])
-        self._update_node_key_col()
+        self._set_node_key_col(np.concatenate([
+            self._node_attr_codes,
+            np.arange(n_existing, len(self._node_keys)),
+        ]))
+
+
+    @staticmethod
+    def _edge_attr_cols(
+            edges: pd.DataFrame,
+            source_key: str,
+            target_key: str,
+            ignore: list[str] | None = None,
+        ) -> pd.DataFrame:
+        """
+        The edge attribute columns of the edges data frame.
+        """
+
+        ignore = _misc.to_set(ignore) & set(edges.columns)
+
+        return edges.drop(columns = [source_key, target_key, *ignore])
+
+
+    def _nodes_long(self, col: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Nodes of the edges from one column of the edges data frame.
+
+        Hashable cells (strings, tuples) are factorized first, and only the
+        distinct cells are split and processed into node keys. Cells equal
+        to a raw node key seen before are single nodes, these are looked up
+        without processing. Cells of sets or lists are processed one by one.
+
+        Returns:
+            The position of the edge and the code of the node key for each
+            node in the column.
+        """
+
+        values = pd.Series(col.to_numpy(), dtype = object)
+
+        try:
+
+            cell_codes, cells = pd.factorize(values, use_na_sentinel = False)
+            hits = np.array(
+                [self._raw_codes.get(c, -1) for c in cells.tolist()],
+                dtype = np.int64,
+            )
 
-        cols = [_nconstants.EDGE_ID, source_key, target_key]
-        self._edges = {
-            i: (s, t) if self.directed else (s | t, set())
-            for j, (i, s, t) in edges[cols].iterrows()
-        }
-        self._edge_attrs = edges.drop(columns = [source_key, target_key])
+        except TypeError:
 
-        for eid, nodes in self._edges.items():
+            cell_codes, cells = np.arange(len(values)), values
+            hits = np.full(len(values), -1, dtype = np.int64)
 
-            for si, side in self._sides():
+        cells = pd.Series(cells, dtype = object)
+        string = pd.api.types.infer_dtype(cells, skipna = False) == 'string'
+        cells = cells[hits < 0]
 
-                for node in nodes[si]:
+        if string:
 
-                    self._nodes[node][si].add(eid)
+            nodes = cells.str.split(self.inner_sep) if self.inner_sep else cells
+
+        else:
+
+            nodes = cells.map(self._proc_nodes_in_edge)
+
+        nodes = nodes.explode().dropna()
+        raw_codes, raw_keys = pd.factorize(nodes)
+        hit_cells = (hits >= 0).nonzero()[0]
+        node_cells = np.concatenate([
+            hit_cells,
+            nodes.index.to_numpy(dtype = np.int64),
+        ])
+        order = np.argsort(node_cells, kind = 'stable')
+        codes = np.concatenate([
+            hits[hit_cells],
+            self._intern_raw(raw_keys)[raw_codes],
+        ])[order]
+
+        # expand the nodes of the distinct cells to the edges
+        sizes = np.bincount(node_cells, minlength = len(hits))
+        offsets = np.cumsum(sizes) - sizes
+        lengths = sizes[cell_codes]
+        eid = np.repeat(np.arange(len(values)), lengths)
+        within = np.arange(len(eid)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        return eid, codes[np.repeat(offsets[cell_codes], lengths) + within]
+
+
+    def _intern(self, keys: Iterable[str | tuple]) -> np.ndarray:
+        """
+        Integer codes of node keys, adding the new keys.
+        """
+
+        codes = self._node_codes
+        result = []
+
+        for key in keys:
+
+            if key not in codes:
+
+                codes[key] = len(self._node_keys)
+                self._node_keys.append(key)
+
+            result.append(codes[key])
+
+        return np.array(result, dtype = np.int64)
+
+
+    def _intern_raw(self, raw_keys: np.ndarray) -> np.ndarray:
+        """
+        Integer codes of unprocessed node keys, as found in the edges.
+
+        Raw keys seen before are looked up directly, only the new ones are
+        processed and interned. This matters when edges are processed in
+        chunks, as the same raw keys recur in every chunk.
+        """
+
+        known = self._raw_codes
+        raw_keys = raw_keys.tolist()
+        codes = np.array([known.get(k, -1) for k in raw_keys], dtype = np.int64)
+
+        if (new := (codes < 0).nonzero()[0]).size:
+
+            new_raw = [raw_keys[i] for i in new]
+            codes[new] = self._intern(self._proc_node_key(k) for k in new_raw)
+            known.update(zip(new_raw, codes[new].tolist()))
+
+        return codes
+
+
+    def _bootstrap_incidence(
+            self,
+            eid: np.ndarray,
+            code: np.ndarray,
+            side: np.ndarray,
+            n_edges: int,
+        ):
+
+        self._incidence = _incidence.Incidence.from_pairs(
+            keys = self._node_keys,
+            eids = np.arange(n_edges),
+            edge = eid,
+            node = code,
+            side = side,
+            codes = self._node_codes,
+        )
+        self._edges = self._incidence.edges
+        self._nodes = self._incidence.nodes
 
 
     def _proc_nodes_in_edge(
             self,
             nodes: str | int | tuple | list | set,
-        ):
+        ) -> list:
 
         if self.inner_sep and isinstance(nodes, str):
 
@@ -196,9 +376,7 @@ class BootstrapDf(_bsbase.BootstrapBase):
 
             nodes = [nodes]
 
-        nodes = {self._proc_node_key(n) for n in nodes}
-
-        return nodes
+        return list(nodes)
 
 
     def _bootstrap_nodes(
@@ -224,15 +402,11 @@ class BootstrapDf(_bsbase.BootstrapBase):
                         'found in the `nodes` data frame.'
                     )
 
-                nodes[node_key_col] = nodes[node_key_col].apply(
-                    self._proc_node_key,
-                )
+                nodes = nodes.assign(**{
+                    node_key_col: nodes[node_key_col].map(self._proc_node_key),
+                })
 
-                nodes.rename(
-                    {node_key_col: _nconstants.NODE_KEY},
-                    axis = 1,
-                    inplace = True,
-                )
+                nodes = nodes.rename({node_key_col: _nconstants.NODE_KEY}, axis = 1)
 
                 keys = pd.DataFrame(
                     nodes[_nconstants.NODE_KEY].tolist(),
@@ -248,12 +422,12 @@ class BootstrapDf(_bsbase.BootstrapBase):
                     f'in `nodes` data frame: `{", ".join(missing)}`.'
                 )
 
-            self._node_attrs = nodes
-            self._update_node_key_col()
-            self._nodes = {
-                k: (set(), set())
-                for k in nodes[_nconstants.NODE_KEY]
-            }
+            self._node_attrs = nodes.copy(deep = False)
+            self._node_attr_codes = self._intern(
+                self._node_attrs[_nconstants.NODE_KEY]
+                    if _nconstants.NODE_KEY in self._node_attrs.columns else
+                self._node_key_values(self._node_attrs)
+            )
 
 
     def _proc_node_key(self, key: str | tuple) -> str | tuple:
@@ -269,14 +443,34 @@ class BootstrapDf(_bsbase.BootstrapBase):
 
         return key
 
-    def _update_node_key_col(self):
+    def _node_key_values(self, df: pd.DataFrame) -> list[str | tuple]:
+        """
+        Node keys from the node key columns of a data frame.
+        """
+
+        if len(self.node_key) == 1:
 
-        nattrs = self._node_attrs
+            return df[self.node_key[0]].tolist()
+
+        return list(zip(*(df[col].tolist() for col in self.node_key)))
+
+
+    def _set_node_key_col(self, codes: np.ndarray):
+        """
+        Add the node key column as a categorical of the interned keys.
+
+        Args:
+            codes:
+                Code of the node key of each row of the node attributes.
+        """
 
-        # bravo, pandas...
-        nattrs[_nconstants.NODE_KEY] = pd.Series(zip(
-            *nattrs[list(self.node_key)].T.values
-        )).apply(lambda x: x[0] if len(x) == 1 else x)
+        nattrs = self._node_attrs
+        nattrs[_nconstants.NODE_KEY] = pd.Categorical.from_codes(
+            codes,
+            dtype = pd.CategoricalDtype(
+                pd.Index(self._node_keys, dtype = object, tupleize_cols = False),
+            ),
+        )
 
         for col in reversed((_nconstants.NODE_KEY,) + self.node_key):
 
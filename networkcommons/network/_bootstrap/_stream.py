@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Create Network object from edge files, reading them in chunks.
+"""
+
+from __future__ import annotations
+
+__all__ = ['BootstrapStream']
+
+from collections.abc import Iterator
+import os
+
+import numpy as np
+import pandas as pd
+
+from networkcommons import _imports
+
+from .. import _constants as _nconstants
+from . import _base as _bsbase
+from . import _df
+
+_READERS = ('csv', 'tsv', 'sif', 'parquet')
+_SEPARATORS = {'csv': ',', 'tsv': '\t', 'sif': '\t'}
+_EXTENSIONS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.tab': 'tsv',
+    '.txt': 'tsv',
+    '.sif': 'sif',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+_COMPRESSION = ('.gz', '.bz2', '.xz', '.zip', '.zst')
+
+
+class _Buffer:
+    """
+    Growable one dimensional array.
+
+    The capacity is doubled when exceeded, hence appending is amortised
+    constant time per element. The data type is promoted if a later chunk
+    requires so.
+    """
+
+
+    def __init__(self, capacity: int = 1024):
+
+        self._data = None
+        self._capacity = capacity
+        self._n = 0
+
+
+    def __len__(self) -> int:
+
+        return self._n
+
+
+    def extend(self, values: np.ndarray):
+
+        dtype = (
+            values.dtype
+                if self._data is None else
+            np.result_type(self._data.dtype, values.dtype)
+        )
+        need = self._n + len(values)
+
+        if self._data is None or dtype != self._data.dtype or need > len(self._data):
+
+            size = self._capacity if self._data is None else len(self._data)
+            data = np.empty(max(need, 2 * size), dtype = dtype)
+
+            if self._n:
+
+                data[:self._n] = self._data[:self._n]
+
+            self._data = data
+
+        self._data[self._n:need] = values
+        self._n = need
+
+
+    def array(self) -> np.ndarray:
+        """
+        The contents, without the unused capacity; empties the buffer.
+        """
+
+        if self._data is None:
+
+            return np.array([], dtype = np.int64)
+
+        data, n = self._data, self._n
+        self._data, self._n = None, 0
+        # the buffer is not referenced elsewhere: shrink in place
+        data.resize(n, refcheck = False)
+
+        return data
+
+
+def file_format(path: str) -> str:
+    """
+    Guess the format of an edge file from its extension.
+    """
+
+    name = os.fspath(path).lower()
+
+    for ext in _COMPRESSION:
+
+        name = name.removesuffix(ext)
+
+    ext = os.path.splitext(name)[1]
+
+    if ext not in _EXTENSIONS:
+
+        raise ValueError(
+            f'Can not guess the format of `{path}`, '
+            f'please provide it (one of {", ".join(_READERS)}).'
+        )
+
+    return _EXTENSIONS[ext]
+
+
+def _read_parquet(path: str, chunksize: int, **kwargs) -> Iterator[pd.DataFrame]:
+
+    pq = _imports.require('pyarrow.parquet', 'parquet')
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size = chunksize, **kwargs):
+
+        yield batch.to_pandas()
+
+
+def _read_table(
+        path: str,
+        chunksize: int,
+        fmt: str,
+        source_key: str,
+        target_key: str,
+        **kwargs,
+    ) -> Iterator[pd.DataFrame]:
+
+    kwargs.setdefault('sep', _SEPARATORS[fmt])
+
+    if fmt == 'sif':
+
+        kwargs.setdefault('header', None)
+        kwargs.setdefault('names', [source_key, 'interaction', target_key])
+
+    with pd.read_csv(path, chunksize = chunksize, **kwargs) as reader:
+
+        yield from reader
+
+
+class BootstrapStream(_df.BootstrapDf):
+    """
+    Bootstrap Network object data structures from an edge file, in chunks.
+
+    Only one chunk of the file is in memory at a time. The node keys are
+    interned chunk by chunk, the node-edge pairs and the edge attributes are
+    appended to growable arrays, which are finalised into the same data
+    structures as `BootstrapDf` builds from a data frame.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            file_format: str | None = None,
+            chunksize: int = 100_000,
+            nodes: pd.DataFrame | None = None,
+            node_key: str | tuple[str] | None = None,
+            source_key: str = 'source',
+            target_key: str = 'target',
+            inner_sep: str | None = ';',
+            node_key_sep: str | None = ',',
+            directed: bool = True,
+            ignore: list[str] | None = None,
+            read_args: dict | None = None,
+        ):
+        """
+        Args:
+            path:
+                Path to the edge file: a CSV, TSV or SIF file (optionally
+                compressed) or a Parquet file. SIF files have three columns,
+                the source, the interaction and the target, and no header.
+            file_format:
+                One of "csv", "tsv", "sif" or "parquet". By default guessed
+                from the extension.
+            chunksize:
+                Number of edges to process at once.
+            read_args:
+                Passed to `pandas.read_csv` or
+                `pyarrow.parquet.ParquetFile.iter_batches`.
+            nodes, node_key, source_key, target_key, inner_sep,
+            node_key_sep, directed, ignore:
+                See `BootstrapDf`.
+        """
+
+        _bsbase.BootstrapBase.__init__(self, locals())
+
+
+    def _bootstrap(
+            self,
+            path: str,
+            file_format: str | None = None,
+            chunksize: int = 100_000,
+            nodes: pd.DataFrame | None = None,
+            node_key: str | tuple[str] | None = None,
+            source_key: str = 'source',
+            target_key: str = 'target',
+            inner_sep: str | None = ';',
+            node_key_sep: str | None = ',',
+            ignore: list[str] | None = None,
+            read_args: dict | None = None,
+        ):
+
+        self._init_keys(node_key, inner_sep, node_key_sep)
+        self._bootstrap_nodes(nodes = nodes, node_key_sep = node_key_sep)
+        n_existing = len(self._node_keys)
+        pairs = [_Buffer() for _ in range(3)]
+        columns = {}
+        n_edges = 0
+
+        for chunk in self._read(
+            path,
+            file_format,
+            chunksize,
+            source_key,
+            target_key,
+            read_args,
+        ):
+
+            eid, code, side = self._edge_pairs(chunk, source_key, target_key)
+
+            for buffer, values in zip(pairs, (eid + n_edges, code, side)):
+
+                buffer.extend(values)
+
+            attrs = self._edge_attr_cols(chunk, source_key, target_key, ignore)
+
+            for col, values in attrs.items():
+
+                columns.setdefault(col, _Buffer()).extend(values.to_numpy())
+
+            n_edges += len(chunk)
+
+        self._bootstrap_incidence(*(b.array() for b in pairs), n_edges)
+        self._add_new_nodes(n_existing)
+        self._edge_attrs = pd.DataFrame(
+            {
+                _nconstants.EDGE_ID: np.arange(n_edges),
+                **{col: buffer.array() for col, buffer in columns.items()},
+            },
+            copy = False,
+        )
+
+
+    @staticmethod
+    def _read(
+            path: str,
+            fmt: str | None,
+            chunksize: int,
+            source_key: str,
+            target_key: str,
+            read_args: dict | None,
+        ) -> Iterator[pd.DataFrame]:
+        """
+        Read the edge file in chunks.
+        """
+
+        fmt = fmt or file_format(path)
+        read_args = read_args or {}
+
+        if fmt not in _READERS:
+
+            raise ValueError(
+                f'Unknown file format: `{fmt}`; '
+                f'available formats: {", ".join(_READERS)}.'
+            )
+
+        if fmt == 'parquet':
+
+            return _read_parquet(path, chunksize, **read_args)
+
+        return _read_table(
+            path,
+            chunksize,
+            fmt,
+            source_key,
+            target_key,
+            **read_args,
+        )
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Persistent columnar storage of networks.
+
+A network is stored in a directory: the arrays of the node-edge incidence
+in NumPy `.npy` files, which can be memory-mapped at loading, the node keys
+and the attribute data frames in Parquet files, and the remaining
+properties in a small JSON file, with the names and kinds of the attribute
+indexes, which are built again at loading. In the attribute data frames
+node keys are replaced by their integer codes, and loaded as categoricals.
+Writing and reading Parquet requires `pyarrow`, from the `parquet` extra.
+"""
+
+from __future__ import annotations
+
+__all__ = ['load', 'save']
+
+import os
+import json
+
+import pandas as pd
+
+from pypath_common import _misc
+
+from networkcommons import _imports
+
+from .. import _index
+from .. import _incidence
+from .. import _constants as _nconstants
+
+FORMAT_VERSION = 1
+_ENTITIES = ('node', 'edge', 'edge_node')
+
+
+def _frame_path(path: str, entity: str) -> str:
+
+    return os.path.join(path, f'{entity}_attrs.parquet')
+
+
+def save(net: 'NetworkBase', path: str) -> None:
+    """
+    Save a network into a directory.
+
+    Args:
+        net:
+            A network object.
+        path:
+            Path to the directory, created if does not exist. Existing files
+            of a previously saved network are overwritten.
+    """
+
+    _imports.require('pyarrow', 'parquet')
+    os.makedirs(path, exist_ok = True)
+    inc = net._incidence
+    inc.save(path)
+
+    keys = pd.DataFrame.from_records(
+        [_misc.to_tuple(k) for k in inc.keys.tolist()],
+        columns = list(net.node_key),
+    )
+    keys.to_parquet(os.path.join(path, 'keys.parquet'), index = False)
+    key_index = pd.Index(inc.keys, tupleize_cols = False)
+
+    for entity in _ENTITIES:
+
+        df = net._attrs[entity]
+
+        if _nconstants.NODE_KEY in df.columns:
+
+            df = df.assign(**{
+                _nconstants.NODE_KEY: key_index.get_indexer(
+                    pd.Index(df[_nconstants.NODE_KEY], tupleize_cols = False),
+                ),
+            })
+
+        df.to_parquet(_frame_path(path, entity), index = False)
+
+    with open(os.path.join(path, 'network.json'), 'w') as fp:
+
+        json.dump(
+            {
+                'format': FORMAT_VERSION,
+                'node_key': list(net.node_key),
+                'directed': net.directed,
+                'indexes': [
+                    [entity, attr, index.kind]
+                    for (entity, attr), index in net._indexes.items()
+                ],
+            },
+            fp,
+        )
+
+
+def load(path: str, cls: type, mmap: bool = True) -> 'NetworkBase':
+    """
+    Load a network saved by `save`.
+
+    Args:
+        path:
+            Path to the directory of the saved network.
+        cls:
+            The class of the network object.
+        mmap:
+            Memory-map the incidence arrays instead of reading them into
+            memory. The mapped arrays are read-only, and the pages are
+            shared by all processes loading the same files.
+
+    Returns:
+        A network object.
+    """
+
+    _imports.require('pyarrow', 'parquet')
+
+    with open(os.path.join(path, 'network.json')) as fp:
+
+        meta = json.load(fp)
+
+    if meta['format'] != FORMAT_VERSION:
+
+        raise ValueError(
+            f'Unsupported network format version: {meta["format"]}; '
+            f'expected {FORMAT_VERSION}.'
+        )
+
+    node_key = tuple(meta['node_key'])
+    keys = pd.read_parquet(os.path.join(path, 'keys.parquet'))
+    keys = (
+        keys[node_key[0]].to_numpy(dtype = object)
+            if len(node_key) == 1 else
+        pd.Series(
+            list(zip(*(keys[c].tolist() for c in node_key))),
+            dtype = object,
+        ).to_numpy()
+    )
+
+    net = cls._from_parts(
+        incidence = _incidence.Incidence.load(path, keys, mmap = mmap),
+        attrs = {},
+        node_key = node_key,
+        directed = meta['directed'],
+    )
+
+    for entity in _ENTITIES:
+
+        df = pd.read_parquet(_frame_path(path, entity))
+
+        if _nconstants.NODE_KEY in df.columns:
+
+            df[_nconstants.NODE_KEY] = keys[df[_nconstants.NODE_KEY].to_numpy()]
+
+        net._attrs[entity] = df
+
+    net._intern_node_keys()
+    net._set_index()
+
+    for entity, attr, kind in meta.get('indexes', []):
+
+        net._indexes[(entity, attr)] = _index.build_index(
+            net._attrs[entity][attr],
+            kind = kind,
+        )
+
+    return net
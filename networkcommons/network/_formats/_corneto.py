@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Conversion of networks to CORNETO.
+"""
+
+from __future__ import annotations
+
+__all__ = ['to_corneto']
+
+from collections.abc import Iterable
+
+import lazy_import
+
+from pypath_common import _misc
+
+cn = lazy_import.lazy_module('corneto')
+
+
+def to_corneto(
+        net: 'NetworkBase',
+        eattrs: str | Iterable[str] | None = None,
+        nattrs: str | Iterable[str] | None = None,
+    ) -> 'cn.Graph':
+    """
+    Convert a network to a CORNETO graph.
+
+    CORNETO graphs have no bulk interface, hence the edges are added one by
+    one, but directly from the arrays of the node keys and attributes.
+    Hyperedges and edges with missing source or target are supported.
+
+    Args:
+        net:
+            A network object.
+        eattrs:
+            Edge attributes to include.
+        nattrs:
+            Node attributes to include.
+
+    Returns:
+        A CORNETO graph.
+    """
+
+    eattrs = _misc.to_list(eattrs)
+    nattrs = _misc.to_list(nattrs)
+
+    g = cn.Graph()
+    ncols = net._node_columns(nattrs)
+
+    for key, *values in zip(
+            net._incidence.keys.tolist(),
+            *(col.tolist() for col in ncols.values()),
+        ):
+
+        g.add_vertex(key, **dict(zip(nattrs, values)))
+
+    etype = (
+        cn._graph.EdgeType.DIRECTED
+            if net.directed else
+        cn._graph.EdgeType.UNDIRECTED
+    )
+
+    for batch in net.iteredge_batches(*eattrs):
+
+        source, target = (
+            batch[side]
+                if net.hyper else
+            [() if k is None else (k,) for k in batch[side].tolist()]
+            for side in ('source', 'target')
+        )
+
+        for s, t, *values in zip(
+            source,
+            target,
+            *(batch[a].tolist() for a in eattrs),
+        ):
+
+            g.add_edge(s, t, type = etype, **dict(zip(eattrs, values)))
+
+    return g
@@ -13,10 +13,18 @@
 # https://www.gnu.org/licenses/gpl-3.0.txt
 #
 
+"""
+Conversion of networks to igraph.
+"""
+
 from __future__ import annotations
 
+__all__ = ['to_igraph']
+
 from collections.abc import Iterable
 
+import numpy as np
+
 from pypath_common import _misc
 
 from networkcommons import _imports
@@ -27,17 +35,58 @@ with _imports.optional():
     import igraph
 
 
-
 def to_igraph(
         net: 'NetworkBase',
         eattrs: str | Iterable[str] | None = None,
         nattrs: str | Iterable[str] | None = None,
     ) -> 'igraph.Graph':
+    """
+    Convert a network to an igraph graph.
+
+    The edges are added by one call from the arrays of node codes, and the
+    attributes are assigned as whole columns. The node keys are available
+    in the `name` vertex attribute. Edges with missing source or target
+    are not included.
+
+    Args:
+        net:
+            A network object.
+        eattrs:
+            Edge attributes to include.
+        nattrs:
+            Node attributes to include.
+
+    Returns:
+        A directed or undirected igraph graph.
+    """
 
     net._not_hyper('Can not convert hypergraph to igraph.')
 
-    g = igraph.Graph()
-    g.add_vertices(net.ncount)
+    eattrs = _misc.to_list(eattrs)
+    nattrs = _misc.to_list(nattrs)
+
+    # no batch at all if the network has no edges
+    edges = next(net.iteredge_batches(*eattrs, codes = True), None) or {
+        a: np.array([], dtype = np.int64)
+        for a in ('source', 'target', *eattrs)
+    }
+    complete = (edges['source'] >= 0) & (edges['target'] >= 0)
+
+    g = igraph.Graph(
+        n = net.ncount,
+        edges = np.column_stack(
+            (edges['source'][complete], edges['target'][complete]),
+        ),
+        directed = net.directed,
+    )
+    g.vs['name'] = net._incidence.keys.tolist()
+
+    for attr, col in net._node_columns(nattrs).items():
+
+        g.vs[attr] = col.tolist()
+
+    for attr in eattrs:
+
+        g.es[attr] = edges[attr][complete].tolist()
 
-    eattrs = _misc.to_set(eattrs)
-    nattrs = _misc.to_set(nattrs)
+    return g
@@ -1,12 +1,96 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Conversion of networks to NetworkX.
+"""
+
+from __future__ import annotations
+
+__all__ = ['to_networkx']
+
+from collections.abc import Iterable
+
+import numpy as np
 import networkx as nx
 
+from pypath_common import _misc
+
+
 def to_networkx(
-        net: "NetworkBase",
-        node_attr: list[str] = None,
-        edge_attr: list[str] = None) -> nx.Graph:
-    netx = nx.Graph()
+        net: 'NetworkBase',
+        eattrs: str | Iterable[str] | None = None,
+        nattrs: str | Iterable[str] | None = None,
+    ) -> nx.Graph:
+    """
+    Convert a network to a NetworkX graph.
+
+    Nodes and edges are added in bulk, with their attribute dicts built
+    from the attribute columns. Edges with missing source or target are not
+    included, and of parallel edges the attributes of the last one are kept.
+
+    Args:
+        net:
+            A network object.
+        eattrs:
+            Edge attributes to include.
+        nattrs:
+            Node attributes to include.
+
+    Returns:
+        A `DiGraph` if the network is directed, otherwise a `Graph`.
+    """
+
+    net._not_hyper('Can not convert hypergraph to NetworkX.')
+
+    eattrs = _misc.to_list(eattrs)
+    nattrs = _misc.to_list(nattrs)
+
+    netx = nx.DiGraph() if net.directed else nx.Graph()
+
+    ncols = net._node_columns(nattrs)
+    netx.add_nodes_from(zip(
+        net._incidence.keys.tolist(),
+        _records(ncols, net.ncount),
+    ))
+
+    for batch in net.iteredge_batches(*eattrs):
+
+        complete = (batch['source'] != None) & (batch['target'] != None)
+        ecols = {a: batch[a][complete] for a in eattrs}
+        netx.add_edges_from(zip(
+            batch['source'][complete].tolist(),
+            batch['target'][complete].tolist(),
+            _records(ecols, complete.sum()),
+        ))
+
     return netx
 
 
-def from_networkx():
-    pass
\ No newline at end of file
+def _records(columns: dict[str, np.ndarray], n: int) -> Iterable[dict]:
+    """
+    Attribute dicts from attribute columns.
+    """
+
+    if not columns:
+
+        return ({} for _ in range(n))
+
+    names = list(columns)
+
+    return (
+        dict(zip(names, values))
+        for values in zip(*(col.tolist() for col in columns.values()))
+    )
@@ -0,0 +1,642 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Array based node-edge incidence of networks and hypergraphs.
+"""
+
+from __future__ import annotations
+
+__all__ = ['Incidence']
+
+from collections.abc import (
+    Hashable,
+    ItemsView,
+    Iterator,
+    Mapping,
+    ValuesView,
+)
+import os
+import functools as ft
+
+import numpy as np
+import pandas as pd
+
+
+def _index_dtype(n: int) -> type:
+
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+
+def _ptr(groups: np.ndarray, n: int) -> np.ndarray:
+    """
+    Offsets of `n` consecutive groups from the sorted group labels.
+    """
+
+    ptr = np.zeros(n + 1, dtype = np.int64)
+    np.cumsum(np.bincount(groups, minlength = n), out = ptr[1:])
+
+    return ptr
+
+
+def _readonly(*arrays: np.ndarray) -> None:
+
+    for a in arrays:
+
+        a.flags.writeable = False
+
+
+class Incidence:
+    """
+    Node-edge incidence in two compressed sparse row structures.
+
+    The nodes are represented by integer codes, the positions of their keys
+    in `keys`; the edges by their positions in the sorted array of edge IDs
+    `eids`. The nodes of the edge at position `i` are
+    `edge_nodes[edge_ptr[i]:edge_ptr[i + 1]]`, with their sides (0: source,
+    1: target) in `edge_sides`, sorted by side and node code. Similarly, the
+    edges of node `j` are `node_edges[node_ptr[j]:node_ptr[j + 1]]`, with
+    the sides in `node_sides`. The arrays are read-only, and can be shared
+    by networks.
+
+    The `edges` and `nodes` attributes are dict-like views of the incidence,
+    with the same contents as the adjacency dicts of the bootstrap: a tuple
+    of the source and target node keys of each edge ID, and a tuple of the
+    source and target side edge IDs of each node key.
+    """
+
+
+    def __init__(
+            self,
+            keys: np.ndarray,
+            eids: np.ndarray,
+            edge_ptr: np.ndarray,
+            edge_nodes: np.ndarray,
+            edge_sides: np.ndarray,
+            node_ptr: np.ndarray,
+            node_edges: np.ndarray,
+            node_sides: np.ndarray,
+            codes: dict[Hashable, int] | None = None,
+        ):
+
+        self.keys = keys
+        self.eids = eids
+        self.edge_ptr = edge_ptr
+        self.edge_nodes = edge_nodes
+        self.edge_sides = edge_sides
+        self.node_ptr = node_ptr
+        self.node_edges = node_edges
+        self.node_sides = node_sides
+        _readonly(*self._arrays())
+
+        if codes is not None:
+
+            self.__dict__['codes'] = codes
+
+        self.edges = EdgesView(self)
+        self.nodes = NodesView(self)
+
+
+    _NUMERIC = (
+        'eids',
+        'edge_ptr',
+        'edge_nodes',
+        'edge_sides',
+        'node_ptr',
+        'node_edges',
+        'node_sides',
+    )
+
+
+    def _arrays(self) -> list[np.ndarray]:
+
+        return [self.keys] + [getattr(self, a) for a in self._NUMERIC]
+
+
+    @classmethod
+    def from_pairs(
+            cls,
+            keys: list[Hashable],
+            eids: np.ndarray,
+            edge: np.ndarray,
+            node: np.ndarray,
+            side: np.ndarray,
+            codes: dict[Hashable, int] | None = None,
+        ) -> Incidence:
+        """
+        Build the incidence from node-edge pairs.
+
+        Args:
+            keys:
+                Node keys, in the order of their codes.
+            eids:
+                Edge IDs, sorted.
+            edge:
+                Edge position of each pair.
+            node:
+                Node code of each pair.
+            side:
+                Side of each pair: 0 for source, 1 for target.
+            codes:
+                Dict of node keys to codes, if available already.
+
+        Duplicate pairs are removed.
+        """
+
+        n_nodes, n_edges = len(keys), len(eids)
+        edge_dtype, node_dtype = _index_dtype(n_edges), _index_dtype(n_nodes)
+        n = max(n_nodes, 1)
+
+        # one sort orders the pairs by edge, side and node; the arithmetic
+        # is done in place, as the inputs can be large
+        pairs = np.array(edge, dtype = np.int64)
+        pairs *= 2
+        pairs += side
+        pairs *= n
+        pairs += node
+        pairs = np.unique(pairs)
+        edge_side, node = np.divmod(pairs, n)
+        del pairs
+        edge, side = np.divmod(edge_side, 2)
+        del edge_side
+        edge_nodes = node.astype(node_dtype)
+        edge_sides = side.astype(np.int8)
+        edge_ptr = _ptr(edge, n_edges)
+        node *= 2
+        node += side
+        del side
+        node_order = np.argsort(node, kind = 'stable')
+        node_sides = edge_sides[node_order]
+        node_edges = edge[node_order].astype(edge_dtype)
+        del edge, node
+
+        return cls(
+            keys = pd.Series(keys, dtype = object).to_numpy(),
+            eids = np.asarray(eids, dtype = np.int64),
+            edge_ptr = edge_ptr,
+            edge_nodes = edge_nodes,
+            edge_sides = edge_sides,
+            node_ptr = _ptr(edge_nodes[node_order], n_nodes),
+            node_edges = node_edges,
+            node_sides = node_sides,
+            codes = codes,
+        )
+
+
+    @classmethod
+    def from_dicts(
+            cls,
+            edges: Mapping[int, tuple[set, set]],
+            nodes: Mapping[Hashable, tuple[set, set]],
+        ) -> Incidence:
+        """
+        Build the incidence from adjacency dicts.
+
+        Args:
+            edges:
+                Dict of edge IDs to tuples of source and target node keys.
+            nodes:
+                Dict of node keys to tuples of source and target edge IDs.
+                Defines the order of the nodes; nodes found only in the
+                edges are added.
+        """
+
+        keys = list(nodes)
+        codes = {k: i for i, k in enumerate(keys)}
+        eids = sorted(edges)
+        pairs = [
+            (pos, codes.setdefault(k, len(codes)), side)
+            for pos, eid in enumerate(eids)
+            for side, side_nodes in enumerate(edges[eid])
+            for k in side_nodes
+        ]
+        keys.extend(list(codes)[len(keys):])
+        edge, node, side = (
+            np.array(pairs, dtype = np.int64).reshape(-1, 3).T
+        )
+
+        return cls.from_pairs(keys, eids, edge, node, side, codes = codes)
+
+
+    @ft.cached_property
+    def codes(self) -> dict[Hashable, int]:
+        """
+        Node codes by node keys.
+        """
+
+        return {k: i for i, k in enumerate(self.keys.tolist())}
+
+
+    @property
+    def ncount(self) -> int:
+
+        return len(self.keys)
+
+
+    @property
+    def ecount(self) -> int:
+
+        return len(self.eids)
+
+
+    @ft.cached_property
+    def hyper(self) -> bool:
+        """
+        Whether any edge has more than two distinct nodes.
+        """
+
+        sizes = np.diff(self.edge_ptr)
+
+        if not len(sizes) or sizes.max() <= 2:
+
+            return False
+
+        edge = np.repeat(np.arange(self.ecount, dtype = np.int64), sizes)
+        distinct = np.unique(edge * max(self.ncount, 1) + self.edge_nodes)
+
+        return bool(np.bincount(distinct // max(self.ncount, 1)).max() > 2)
+
+
+    def edge_pos(self, eid: int) -> int:
+        """
+        Position of an edge ID.
+        """
+
+        try:
+
+            pos = np.searchsorted(self.eids, eid)
+
+        except (TypeError, ValueError):
+
+            raise KeyError(eid)
+
+        if np.ndim(pos) or pos >= len(self.eids) or self.eids[pos] != eid:
+
+            raise KeyError(eid)
+
+        return int(pos)
+
+
+    def _pair_edges(self) -> np.ndarray:
+        """
+        Edge position of each node-edge pair.
+        """
+
+        return np.repeat(np.arange(self.ecount), np.diff(self.edge_ptr))
+
+
+    def endpoints(self, directed: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Source and target node codes of binary edges.
+
+        Edges with more than one node on a side are represented by the node
+        with the lowest code. The nodes of undirected edges are ordered by
+        their keys, loop edges have the same source and target.
+
+        Returns:
+            Source and target node codes by edge position, -1 for missing.
+        """
+
+        ptr = self.edge_ptr
+        first = ptr[:-1]
+        sizes = np.diff(ptr)
+        n_source = np.bincount(
+            self._pair_edges()[self.edge_sides == 0],
+            minlength = self.ecount,
+        )
+        nodes = np.append(self.edge_nodes, -1).astype(np.int64)
+        last = len(nodes) - 1
+        source = nodes[np.where(n_source > 0, first, last)]
+
+        if directed:
+
+            target = nodes[np.where(sizes > n_source, first + n_source, last)]
+
+        else:
+
+            target = nodes[np.where(sizes > 1, first + 1, first)]
+            target[sizes == 0] = -1
+            swap = np.zeros(self.ecount, dtype = bool)
+            both = (sizes > 1).nonzero()[0]
+            swap[both] = self.keys[target[both]] < self.keys[source[both]]
+            source, target = (
+                np.where(swap, target, source),
+                np.where(swap, source, target),
+            )
+
+        return source, target
+
+
+    def _pair_index(self, pos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Positions of the node-edge pairs of edges, and the number of pairs
+        by edge.
+        """
+
+        ptr = self.edge_ptr
+        sizes = np.diff(ptr)[pos]
+        offsets = np.cumsum(sizes) - sizes
+        idx = np.repeat(ptr[pos] - offsets, sizes) + np.arange(sizes.sum())
+
+        return idx, sizes
+
+
+    def node_edge_pos(
+            self,
+            codes: np.ndarray,
+            induced: bool = False,
+        ) -> np.ndarray:
+        """
+        Positions of the edges of nodes.
+
+        Args:
+            codes:
+                Node codes.
+            induced:
+                Only the edges all nodes of which are among `codes`.
+
+        Returns:
+            Edge positions, sorted.
+        """
+
+        ptr = self.node_ptr
+        sizes = np.diff(ptr)[codes]
+        offsets = np.cumsum(sizes) - sizes
+        idx = np.repeat(ptr[codes] - offsets, sizes) + np.arange(sizes.sum())
+        pos = np.unique(self.node_edges[idx]).astype(np.int64)
+
+        if induced and len(pos):
+
+            idx, sizes = self._pair_index(pos)
+            outside = ~np.isin(self.edge_nodes[idx], codes)
+            rows = np.repeat(np.arange(len(pos)), sizes)
+            pos = pos[np.bincount(rows[outside], minlength = len(pos)) == 0]
+
+        return pos
+
+
+    def subset(self, pos: np.ndarray) -> Incidence:
+        """
+        Incidence of a subset of the edges and their nodes.
+
+        Args:
+            pos:
+                Edge positions, sorted.
+        """
+
+        idx, sizes = self._pair_index(pos)
+        used, node = np.unique(self.edge_nodes[idx], return_inverse = True)
+
+        return self.from_pairs(
+            keys = self.keys[used],
+            eids = self.eids[pos],
+            edge = np.repeat(np.arange(len(pos)), sizes),
+            node = node,
+            side = self.edge_sides[idx],
+        )
+
+
+    def edge_sets(self, pos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Source and target node key sets of edges.
+
+        Args:
+            pos:
+                Edge positions.
+
+        Returns:
+            Two object arrays of sets.
+        """
+
+        idx, sizes = self._pair_index(pos)
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        rows = np.repeat(np.arange(len(pos)), sizes)
+        split = offsets[:-1] + np.bincount(
+            rows[self.edge_sides[idx] == 0],
+            minlength = len(pos),
+        )
+        keys = self.keys[self.edge_nodes[idx]].tolist()
+        offsets, split = offsets.tolist(), split.tolist()
+        source = np.empty(len(pos), dtype = object)
+        target = np.empty(len(pos), dtype = object)
+
+        for i in range(len(pos)):
+
+            source[i] = set(keys[offsets[i]:split[i]])
+            target[i] = set(keys[split[i]:offsets[i + 1]])
+
+        return source, target
+
+
+    def nbytes(self) -> int:
+        """
+        Memory used by the arrays, not including the node keys.
+        """
+
+        return sum(a.nbytes for a in self._arrays()[1:])
+
+
+    def save(self, path: str) -> None:
+        """
+        Save the numeric arrays into `.npy` files.
+
+        Args:
+            path:
+                Path to an existing directory. The node keys are not saved,
+                their storage is up to the caller.
+        """
+
+        for name in self._NUMERIC:
+
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+
+
+    @classmethod
+    def load(cls, path: str, keys: np.ndarray, mmap: bool = True) -> Incidence:
+        """
+        Load the arrays saved by `save`.
+
+        Args:
+            path:
+                Path to the directory of the `.npy` files.
+            keys:
+                The node keys, in the order of their codes.
+            mmap:
+                Memory-map the arrays instead of reading them into memory.
+        """
+
+        return cls(
+            keys = keys,
+            **{
+                name: np.load(
+                    os.path.join(path, f'{name}.npy'),
+                    mmap_mode = 'r' if mmap else None,
+                )
+                for name in cls._NUMERIC
+            },
+        )
+
+
+class _ItemsView(ItemsView):
+
+    def __iter__(self) -> Iterator[tuple]:
+
+        return self._mapping._iter_items()
+
+
+class _ValuesView(ValuesView):
+
+    def __iter__(self) -> Iterator[tuple[set, set]]:
+
+        return (value for _, value in self._mapping._iter_items())
+
+
+class _View(Mapping):
+    """
+    Dict-like view of one of the compressed sparse row structures.
+
+    Single items are built from the slice of the arrays on access; full
+    iteration over the items or values splits all rows at once.
+    """
+
+
+    def __init__(self, incidence: Incidence):
+
+        self._inc = incidence
+
+
+    def __repr__(self) -> str:
+
+        return f'<{self.__class__.__name__} of {len(self)} items>'
+
+
+    def _pos(self, label: Hashable) -> int:
+
+        raise NotImplementedError
+
+
+    def _arrays(self) -> tuple[np.ndarray, ...]:
+        """
+        Labels of the rows, row offsets, members, sides and member labels.
+        """
+
+        raise NotImplementedError
+
+
+    def __getitem__(self, label: Hashable) -> tuple[set, set]:
+
+        _, ptr, members, sides, member_labels = self._arrays()
+        pos = self._pos(label)
+        a, b = ptr[pos], ptr[pos + 1]
+        split = a + np.searchsorted(sides[a:b], 1)
+
+        return (
+            set(member_labels[members[a:split]].tolist()),
+            set(member_labels[members[split:b]].tolist()),
+        )
+
+
+    def _iter_items(self) -> Iterator[tuple[Hashable, tuple[set, set]]]:
+
+        labels, ptr, members, sides, member_labels = self._arrays()
+        rows = np.repeat(np.arange(len(labels)), np.diff(ptr))
+        split = (ptr[:-1] + np.bincount(
+            rows[sides == 0],
+            minlength = len(labels),
+        )).tolist()
+        ptr = ptr.tolist()
+        values = member_labels[members].tolist()
+
+        for i, label in enumerate(labels.tolist()):
+
+            yield label, (
+                set(values[ptr[i]:split[i]]),
+                set(values[split[i]:ptr[i + 1]]),
+            )
+
+
+    def items(self) -> ItemsView:
+
+        return _ItemsView(self)
+
+
+    def values(self) -> ValuesView:
+
+        return _ValuesView(self)
+
+
+    def __iter__(self) -> Iterator[Hashable]:
+
+        return iter(self._arrays()[0].tolist())
+
+
+    def __len__(self) -> int:
+
+        return len(self._arrays()[0])
+
+
+    def __contains__(self, label) -> bool:
+
+        try:
+
+            self._pos(label)
+
+        except KeyError:
+
+            return False
+
+        return True
+
+
+class EdgesView(_View):
+    """
+    Edge IDs to tuples of source and target node keys.
+    """
+
+
+    def _pos(self, eid: int) -> int:
+
+        return self._inc.edge_pos(eid)
+
+
+    def _arrays(self) -> tuple[np.ndarray, ...]:
+
+        inc = self._inc
+
+        return inc.eids, inc.edge_ptr, inc.edge_nodes, inc.edge_sides, inc.keys
+
+
+class NodesView(_View):
+    """
+    Node keys to tuples of source and target side edge IDs.
+    """
+
+
+    def _pos(self, key: Hashable) -> int:
+
+        try:
+
+            return self._inc.codes[key]
+
+        except TypeError:
+
+            raise KeyError(key)
+
+
+    def _arrays(self) -> tuple[np.ndarray, ...]:
+
+        inc = self._inc
+
+        return inc.keys, inc.node_ptr, inc.node_edges, inc.node_sides, inc.eids
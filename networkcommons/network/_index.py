@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Secondary indexes of attribute columns.
+
+Indexes speed up repeated selections on attribute columns: categorical
+columns are indexed by inverted lists of the rows for each distinct value,
+numeric columns by the row order of their sorted values. All indexes
+answer the same criteria as a scan of the column (see `match`):
+
+    - a scalar: rows equal to the value; a missing value (`None` or NaN)
+      selects the rows with missing values
+    - a set, list or array: rows equal to any of the values
+    - a tuple of two elements: on numeric columns, rows in the closed
+      range, `None` leaves the range open on that side; on any other
+      column, rows equal to the tuple
+    - a callable: rows for which it returns True, applied to the column
+      (by category indexes, to its distinct values)
+"""
+
+from __future__ import annotations
+
+__all__ = ['CategoryIndex', 'SortedIndex', 'build_index', 'match', 'scan']
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from . import _incidence
+
+_EMPTY = np.array([], dtype = np.int64)
+
+
+def _multi(criterion: Any) -> bool:
+
+    return isinstance(criterion, (set, frozenset, list, np.ndarray, pd.Index))
+
+
+def _range(criterion: Any) -> bool:
+
+    return isinstance(criterion, tuple) and len(criterion) == 2
+
+
+def _numeric(values: pd.Series) -> bool:
+
+    return (
+        pd.api.types.is_numeric_dtype(values) and
+        not pd.api.types.is_bool_dtype(values)
+    )
+
+
+def _missing(value: Any) -> bool:
+
+    return pd.api.types.is_scalar(value) and pd.isna(value)
+
+
+def _values(criterion: Any) -> tuple[list, bool]:
+    """
+    The values of an equality criterion, and if it selects missing values.
+    """
+
+    values = list(criterion) if _multi(criterion) else [criterion]
+
+    return (
+        [v for v in values if not _missing(v)],
+        any(_missing(v) for v in values),
+    )
+
+
+def match(
+        values: pd.Series,
+        criterion: Any,
+        numeric: bool | None = None,
+    ) -> np.ndarray:
+    """
+    Boolean mask of the values matching the criterion.
+
+    This is the definition of the criteria (see the module docstring), both
+    scans and indexes select the same rows.
+
+    Args:
+        values:
+            The attribute column.
+        criterion:
+            Selection criterion.
+        numeric:
+            Whether the column is numeric, i.e. tuples are ranges; by default
+            from the data type of `values`.
+    """
+
+    numeric = _numeric(values) if numeric is None else numeric
+
+    if callable(criterion):
+
+        return np.asarray(criterion(values), dtype = bool)
+
+    if _range(criterion) and numeric:
+
+        lo, hi = criterion
+        mask = np.ones(len(values), dtype = bool)
+
+        if lo is not None:
+
+            mask &= (values >= lo).to_numpy(dtype = bool, na_value = False)
+
+        if hi is not None:
+
+            mask &= (values <= hi).to_numpy(dtype = bool, na_value = False)
+
+        return mask
+
+    criterion, missing = _values(criterion)
+    mask = pd.Series(values.to_numpy(), dtype = object).isin(criterion)
+    mask = mask.to_numpy()
+
+    if missing:
+
+        mask |= pd.isna(values.to_numpy())
+
+    return mask
+
+
+class CategoryIndex:
+    """
+    Inverted lists of the rows by the distinct values of a column.
+    """
+
+    kind = 'category'
+
+
+    def __init__(self, values: pd.Series):
+        """
+        Args:
+            values:
+                An attribute column of hashable values.
+        """
+
+        try:
+
+            codes, categories = pd.factorize(
+                values.to_numpy(),
+                use_na_sentinel = False,
+            )
+
+        except TypeError:
+
+            raise ValueError(
+                f'Column `{values.name}` has unhashable values, '
+                'can not be indexed.'
+            )
+
+        self.categories = pd.Index(
+            categories,
+            dtype = object,
+            tupleize_cols = False,
+        )
+        self.numeric = _numeric(values)
+        self.order = np.argsort(codes, kind = 'stable')
+        self.ptr = _incidence._ptr(codes[self.order], len(self.categories))
+
+
+    def __len__(self) -> int:
+
+        return len(self.order)
+
+
+    def _codes(self, criterion: Any) -> np.ndarray:
+
+        return match(
+            pd.Series(self.categories),
+            criterion,
+            numeric = self.numeric,
+        ).nonzero()[0]
+
+
+    def count(self, criterion: Any) -> int:
+        """
+        Number of rows matching the criterion, without selecting them.
+        """
+
+        if callable(criterion):
+
+            return len(self)
+
+        codes = self._codes(criterion)
+
+        return int((self.ptr[codes + 1] - self.ptr[codes]).sum())
+
+
+    def rows(self, criterion: Any) -> np.ndarray:
+        """
+        Sorted row positions matching the criterion.
+        """
+
+        codes = self._codes(criterion)
+
+        if not len(codes):
+
+            return _EMPTY
+
+        return np.sort(np.concatenate([
+            self.order[self.ptr[c]:self.ptr[c + 1]]
+            for c in codes
+        ]))
+
+
+class SortedIndex:
+    """
+    Row order of the sorted values of a numeric column.
+    """
+
+    kind = 'sorted'
+
+
+    def __init__(self, values: pd.Series):
+        """
+        Args:
+            values:
+                A numeric attribute column. Missing values are kept apart
+                from the sorted values.
+        """
+
+        if not _numeric(values):
+
+            raise ValueError(
+                f'Column `{values.name}` is not numeric, '
+                'can not be indexed as sorted.'
+            )
+
+        array = values.to_numpy()
+        missing = pd.isna(array)
+        valid = (~missing).nonzero()[0]
+        self.order = valid[np.argsort(array[valid], kind = 'stable')]
+        self.values = array[self.order]
+        self.missing = missing.nonzero()[0]
+        self.missing_values = array[self.missing]
+
+
+    def __len__(self) -> int:
+
+        return len(self.order) + len(self.missing)
+
+
+    def _between(self, lo: Any, hi: Any) -> np.ndarray:
+
+        start = 0 if lo is None else np.searchsorted(self.values, lo, 'left')
+        end = (
+            len(self.values)
+                if hi is None else
+            np.searchsorted(self.values, hi, 'right')
+        )
+
+        return self.order[start:end]
+
+
+    def _select(self, criterion: Any) -> list[np.ndarray]:
+
+        if _range(criterion):
+
+            return [self._between(*criterion)]
+
+        values, missing = _values(criterion)
+
+        return (
+            [self._between(v, v) for v in set(values)] +
+            ([self.missing] if missing else [])
+        )
+
+
+    def count(self, criterion: Any) -> int:
+        """
+        Number of rows matching the criterion, without selecting them.
+        """
+
+        if callable(criterion):
+
+            return len(self)
+
+        return sum(len(rows) for rows in self._select(criterion))
+
+
+    def rows(self, criterion: Any) -> np.ndarray:
+        """
+        Sorted row positions matching the criterion.
+        """
+
+        if callable(criterion):
+
+            values = pd.Series(
+                np.concatenate([self.values, self.missing_values])
+                    if len(self.missing) else
+                self.values
+            )
+            order = np.concatenate([self.order, self.missing])
+
+            return np.sort(order[match(values, criterion)])
+
+        return np.sort(np.concatenate(self._select(criterion) or [_EMPTY]))
+
+
+def build_index(
+        values: pd.Series,
+        kind: str | None = None,
+    ) -> CategoryIndex | SortedIndex:
+    """
+    Index an attribute column.
+
+    Args:
+        values:
+            The attribute column.
+        kind:
+            Either "category" or "sorted"; by default sorted for numeric
+            and categorical for any other column.
+    """
+
+    kind = kind or ('sorted' if _numeric(values) else 'category')
+    kinds = {'category': CategoryIndex, 'sorted': SortedIndex}
+
+    if kind not in kinds:
+
+        raise ValueError(f'Unknown index kind: `{kind}`.')
+
+    return kinds[kind](values)
+
+
+def scan(values: pd.Series, criterion: Any) -> np.ndarray:
+    """
+    Sorted row positions matching the criterion, by a full column scan.
+
+    Args:
+        values:
+            The attribute column.
+        criterion:
+            Selection criterion, see the module docstring.
+    """
+
+    return match(values, criterion).nonzero()[0]
@@ -26,31 +26,74 @@ from __future__ import annotations
 
 __all__ = ['Network']
 
-from collections.abc import Hashable, Iterable, Iterator
+from collections.abc import Hashable, Iterable, Iterator, Mapping
 from typing import Any, NamedTuple
 import inspect
+import contextlib
+import functools as ft
 import importlib as imp
 import warnings
 
 import lazy_import
+import numpy as np
 import pandas as pd
+import networkx as nx
 cn = lazy_import.lazy_module('corneto')
 
 from pypath_common import _misc
 from pypath_common import _constants
 
-from networkcommons.data import network as _universe
 from networkcommons.noi._noi import Noi
 
-from networkcommons import utils
-
 from . import _bootstrap
+from . import _index
+from . import _universe
+from . import _incidence
+from ._formats import _columnar as _fmt_columnar
+from ._formats import _corneto as _fmt_corneto
+from ._formats import _igraph as _fmt_igraph
+from ._formats import _networkx as _fmt_networkx
 from . import _constants as _nconstants
 from networkcommons import _log
 
 
+_BATCH_SIZE = 100_000
+
+
+@ft.lru_cache(maxsize = 256)
+def _record_type(name: str, fields: tuple[tuple[str, type], ...]) -> type:
+    """
+    Named tuple class, created only once for the same fields.
+    """
+
+    return NamedTuple(name, list(fields))
+
+
+def _attrs_property(entity: str) -> property:
+    """
+    Attribute data frame, copied before the first access if shared.
+
+    This is copy on first access, not on write: pandas can not tell if the
+    frame returned will be modified in place by the caller, hence it has to
+    be owned by the instance. Internal code only reading the frames accesses
+    `_attrs` instead, to keep them shared.
+    """
+
+    return property(
+        lambda self: self._own_attrs(entity),
+        lambda self, df: self._set_attrs(entity, df),
+        doc = f'Data frame of {entity.replace("_", "-")} attributes.',
+    )
+
+
 class NetworkBase:
 
+    _ATTRS = ('node', 'edge', 'edge_node')
+
+    node_attrs = _attrs_property('node')
+    edge_attrs = _attrs_property('edge')
+    edge_node_attrs = _attrs_property('edge_node')
+
 
     def __init__(
             self,
@@ -65,6 +108,7 @@ class NetworkBase:
             edge_node_attrs: pd.DataFrame | None = None,
             directed: bool = True,
             ignore: list[str] | None = None,
+            indexes: str | Iterable[str] | None = None,
         ):
 
         if isinstance(edges, self.__class__):
@@ -87,18 +131,129 @@ class NetworkBase:
             if k not in {'self'}
         }
 
-        proc = bs(**args)
+        self._setup(
+            bs(**args),
+            copy = bs is _bootstrap.BootstrapCopy,
+            indexes = indexes,
+        )
+
+
+    def _setup(
+            self,
+            proc: _bootstrap._base.BootstrapBase,
+            copy: bool = False,
+            indexes: str | Iterable[str] | None = None,
+        ) -> None:
+        """
+        Populate the instance from the data structures of a bootstrap.
+        """
 
-        self.edges = proc._edges
-        self.nodes = proc._nodes
+        self._attrs = {}
+        self._shared = set()
+        self._indexes = {}
+        self._incidence = (
+            _incidence.Incidence.from_dicts(proc._edges, proc._nodes)
+                if proc._incidence is None else
+            proc._incidence
+        )
         self.edge_attrs = proc._edge_attrs
         self.node_attrs = proc._node_attrs
         self.edge_node_attrs = proc._edge_node_attrs
         self.node_key = proc.node_key
         self.directed = proc.directed
+        # attributes shared with other instances: copied before the first
+        # access by either instance
+        self._shared = set(proc._shared)
+        # secondary indexes of attribute columns by (entity, attribute)
+        self._indexes = dict(proc._indexes)
+
+        if not copy:
+
+            self._intern_node_keys()
+            self._set_index()
+            self._sort()
+
+        self.add_index(*_misc.to_list(indexes))
+
+
+    @classmethod
+    def from_file(
+            cls,
+            path: str,
+            file_format: str | None = None,
+            chunksize: int = 100_000,
+            nodes: pd.DataFrame | None = None,
+            node_key: str | tuple[str] | None = None,
+            source_key: str = 'source',
+            target_key: str = 'target',
+            inner_sep: str | None = ';',
+            node_key_sep: str | None = ',',
+            directed: bool = True,
+            ignore: list[str] | None = None,
+            indexes: str | Iterable[str] | None = None,
+            **read_args,
+        ) -> NetworkBase:
+        """
+        Create a network from an edge file, reading it in chunks.
+
+        The edge list is never loaded in full: the peak memory is close to
+        the size of the resulting network.
+
+        Args:
+            path:
+                Path to a CSV, TSV, SIF or Parquet file. Parquet requires
+                `pyarrow`, from the `parquet` extra.
+            file_format:
+                One of "csv", "tsv", "sif" or "parquet". By default guessed
+                from the extension.
+            chunksize:
+                Number of edges to process at once.
+            read_args:
+                Passed to `pandas.read_csv` or
+                `pyarrow.parquet.ParquetFile.iter_batches`.
+            indexes:
+                Attributes to index, see `add_index`.
+            nodes, node_key, source_key, target_key, inner_sep,
+            node_key_sep, directed, ignore:
+                As for data frame inputs.
+        """
+
+        the_locals = locals()
+        args = {
+            k: the_locals[k]
+            for k in inspect.signature(_bootstrap.BootstrapStream.__init__).parameters
+            if k not in {'self', 'read_args'}
+        }
+        net = cls.__new__(cls)
+        net._setup(
+            _bootstrap.BootstrapStream(read_args = read_args, **args),
+            indexes = indexes,
+        )
+
+        return net
+
+
+    @classmethod
+    def _from_parts(
+            cls,
+            incidence: _incidence.Incidence,
+            attrs: dict[str, pd.DataFrame],
+            node_key: tuple[str],
+            directed: bool,
+        ) -> NetworkBase:
+        """
+        Create a network from its incidence and attribute data frames.
+        """
 
-        self._set_index()
-        self._sort()
+        net = cls.__new__(cls)
+        net._attrs = dict(attrs)
+        net._shared = set()
+        net._indexes = {}
+        net._incidence = incidence
+        net.node_key = node_key
+        net.directed = directed
+
+        return net
 
 
     def reload(self):
@@ -113,13 +268,41 @@ class NetworkBase:
         setattr(self, '__class__', new)
 
 
+    @property
+    def edges(self) -> _incidence.EdgesView:
+        """
+        Adjacency information: source and target nodes by edge IDs.
+        """
+
+        return self._incidence.edges
+
+
+    @property
+    def nodes(self) -> _incidence.NodesView:
+        """
+        Adjacency information: source and target side edges by node keys.
+        """
+
+        return self._incidence.nodes
+
+
     @property
     def hyper(self) -> bool:
         """
         Whether the network is a hypergraph.
         """
 
-        return any(len(s | t) > 2 for s, t in self.edges.values())
+        return self._incidence.hyper
+
+
+    def _not_hyper(self, msg: str | None = None) -> None:
+        """
+        Raise an error if the network is a hypergraph.
+        """
+
+        if self.hyper:
+
+            raise ValueError(msg or 'Not available for hypergraphs.')
 
 
     def __len__(self) -> int:
@@ -133,7 +316,9 @@ class NetworkBase:
         Number of edges.
         """
 
-        return len(getattr(self, 'edges', ()))
+        incidence = getattr(self, '_incidence', None)
+
+        return incidence.ecount if incidence else 0
 
 
     @property
@@ -142,7 +327,9 @@ class NetworkBase:
         Number of nodes.
         """
 
-        return len(getattr(self, 'nodes', ()))
+        incidence = getattr(self, '_incidence', None)
+
+        return incidence.ncount if incidence else 0
 
 
     def __repr__(self) -> str:
@@ -154,7 +341,7 @@ class NetworkBase:
 
         try:
 
-            return self.nodes.get(key, self.edges[key])
+            return self.nodes[key] if key in self.nodes else self.edges[key]
 
         except KeyError:
 
@@ -166,6 +353,96 @@ class NetworkBase:
         return key in self.nodes
 
 
+    def _own_attrs(self, entity: str) -> pd.DataFrame:
+
+        if entity in self._shared:
+
+            # the caller might modify the frame, and the indexes shared with
+            # other instances would not follow
+            self._drop_indexes(entity)
+
+            if pd.options.mode.copy_on_write is not True:
+
+                self._attrs[entity] = self._attrs[entity].copy()
+
+            self._shared.discard(entity)
+
+        return self._attrs[entity]
+
+
+    def _set_attrs(self, entity: str, df: pd.DataFrame) -> None:
+
+        self._attrs[entity] = df
+        self._shared.discard(entity)
+        self._drop_indexes(entity)
+
+
+    def _drop_indexes(self, entity: str) -> None:
+
+        self._indexes = {
+            key: index
+            for key, index in self._indexes.items()
+            if key[0] != entity
+        }
+
+
+    def _share(self) -> dict[str, pd.DataFrame]:
+        """
+        Attribute data frames to be shared with a new instance.
+
+        With the copy-on-write mode of pandas enabled, shallow copies are
+        shared, as pandas copies the data at the first modification.
+        Otherwise the frames themselves are shared, and each instance copies
+        them before its first access. In both cases, the first access drops
+        the indexes of the frame, which are shared as well.
+        """
+
+        self._shared.update(self._ATTRS)
+
+        if pd.options.mode.copy_on_write is True:
+
+            return {e: df.copy(deep = False) for e, df in self._attrs.items()}
+
+        return dict(self._attrs)
+
+
+    def _intern_node_keys(self) -> None:
+        """
+        Store the node key columns as categoricals of the same categories.
+
+        The categories, the node keys sorted if possible, are the single
+        lookup table of the integer codes in all attribute data frames.
+        """
+
+        categories = pd.Index(
+            self._incidence.keys,
+            dtype = object,
+            tupleize_cols = False,
+        )
+
+        with contextlib.suppress(TypeError):
+
+            categories = categories.sort_values()
+
+        dtype = pd.CategoricalDtype(categories)
+
+        for entity in ('node', 'edge_node'):
+
+            df = self._attrs[entity]
+
+            if _nconstants.NODE_KEY in df.columns:
+
+                col = df[_nconstants.NODE_KEY]
+                # replace the column instead of setting its values, the data
+                # frame might be a filtered copy (see `_subnetwork`)
+                df.isetitem(
+                    df.columns.get_loc(_nconstants.NODE_KEY),
+                    col.cat.set_categories(categories)
+                        if isinstance(col.dtype, pd.CategoricalDtype) else
+                    col.astype(dtype),
+                )
+
+
     def _set_index(self) -> None:
 
         INDEX_COLS = {
@@ -176,64 +453,231 @@ class NetworkBase:
 
         for entity, cols in INDEX_COLS.items():
 
-            if not (df := getattr(self, f'{entity}_attrs')).empty:
+            if not (df := self._own_attrs(entity)).empty:
 
                 df.index = df[cols]
 
 
     def _sort(self) -> None:
 
-        self.edge_attrs.sort_index(inplace = True)
-        self.node_attrs.sort_index(inplace = True)
-        self.edge_node_attrs.sort_index(inplace = True)
+        for entity in self._ATTRS:
 
+            self._own_attrs(entity).sort_index(inplace = True)
 
-    def iteredges(self, *attrs: str) -> Iterator[tuple]:
+
+    @staticmethod
+    def _attr_columns(
+            df: pd.DataFrame,
+            attrs: tuple[str, ...],
+            entity: str,
+        ) -> dict[str, np.ndarray]:
         """
-        Iterate edges as named tuples.
+        Attribute columns as arrays, None for missing attributes.
+        """
+
+        if (noattr := set(attrs) - set(df.columns)):
+
+            msg = f'No such {entity} attribute(s): {", ".join(noattr)}.'
+            warnings.warn(msg)
+
+        return {
+            a: (
+                df[a].to_numpy()
+                    if a in df.columns else
+                np.full(len(df), None, dtype = object)
+            )
+            for a in attrs
+        }
+
+
+    def _node_columns(self, attrs: Iterable[str]) -> dict[str, np.ndarray]:
+        """
+        Node attribute columns in the order of the node codes.
+
+        None for nodes missing from the node attributes data frame.
+        """
+
+        node_attrs = self._attrs['node']
+        columns = self._attr_columns(node_attrs, tuple(attrs), 'node')
+
+        if not columns:
+
+            return columns
+
+        keys = self._incidence.keys
+        pos = node_attrs.index.get_indexer(pd.Index(keys, tupleize_cols = False))
+
+        if (pos < 0).any():
+
+            columns = {
+                a: np.append(col.astype(object), None)
+                for a, col in columns.items()
+            }
+
+        return {a: col[pos] for a, col in columns.items()}
+
+
+    def iteredge_batches(
+            self,
+            *attrs: str,
+            batch_size: int | None = None,
+            codes: bool = False,
+        ) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Iterate edges in batches of arrays.
 
         Args:
             attrs:
                 Attributes to include.
+            batch_size:
+                Number of edges in one batch, by default all edges in one
+                batch.
+            codes:
+                Return the integer codes of the nodes instead of their keys,
+                -1 for missing nodes. The keys are available by the codes in
+                `self._incidence.keys`. Not available for hypergraphs.
+
+        Yields:
+            Dicts with `source` and `target` arrays, and one array for each
+            attribute. For hypergraphs, `source` and `target` are arrays of
+            sets of node keys.
         """
 
-        if (noattr := set(attrs) - set(self.edge_attrs.columns)):
+        yield from self._edge_batches(attrs, batch_size, codes)
 
-            msg = f'No such edge attribute(s): {", ".join(noattr)}.'
-            warnings.warn(msg)
 
-        Edge = NamedTuple(
-            'Edge',
-            [
-                ('source', str | int | tuple | set),
-                ('target', str | int | tuple | set),
-            ] + [
-                (a, _misc.df_dtype_to_builtin(self.edge_attrs, a))
-                for a in attrs
-            ]
+    def _edge_ids(self) -> np.ndarray:
+        """
+        Edge IDs in the order of the rows of the edge attributes data frame.
+        """
+
+        edge_attrs = self._attrs['edge']
+
+        return (
+            edge_attrs[_nconstants.EDGE_ID].to_numpy()
+                if _nconstants.EDGE_ID in edge_attrs.columns else
+            self._incidence.eids
         )
+
+
+    def _edge_batches(
+            self,
+            attrs: tuple[str, ...],
+            batch_size: int | None = None,
+            codes: bool = False,
+            rows: np.ndarray | None = None,
+        ) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Batches of edges, optionally only the edges in certain rows of the
+        edge attributes data frame.
+        """
+
+        inc = self._incidence
+        columns = self._attr_columns(self._attrs['edge'], attrs, 'edge')
+        pos = np.searchsorted(inc.eids, self._edge_ids())
+
+        if rows is not None:
+
+            pos = pos[rows]
+            columns = {a: col[rows] for a, col in columns.items()}
+
         hyper = self.hyper
 
-        for i in self.edge_attrs.iterrows():
+        if hyper and codes:
+
+            raise ValueError('Node codes are not available for hypergraphs.')
+
+        if not hyper:
+
+            source, target = inc.endpoints(self.directed)
+
+            if not codes:
+
+                keys = np.append(inc.keys, None)
+                source, target = keys[source], keys[target]
+
+        batch_size = batch_size or len(pos) or 1
+
+        for i in range(0, len(pos), batch_size):
+
+            batch = pos[i:i + batch_size]
+
+            yield {
+                **dict(zip(
+                    ('source', 'target'),
+                    inc.edge_sets(batch) if hyper else (source[batch], target[batch]),
+                )),
+                **{a: col[i:i + batch_size] for a, col in columns.items()},
+            }
+
+
+    def iternode_batches(
+            self,
+            *attrs: str,
+            batch_size: int | None = None,
+        ) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Iterate nodes in batches of arrays.
+
+        Args:
+            attrs:
+                Node attributes to include.
+            batch_size:
+                Number of nodes in one batch, by default all nodes in one
+                batch.
+
+        Yields:
+            Dicts with the `key` array, and one array for each attribute.
+        """
+
+        node_attrs = self._attrs['node']
+        columns = self._attr_columns(node_attrs, attrs, 'node')
+        keys = node_attrs.index.to_numpy()
+        batch_size = batch_size or len(keys) or 1
+
+        for i in range(0, len(keys), batch_size):
+
+            yield {
+                'key': keys[i:i + batch_size],
+                **{a: col[i:i + batch_size] for a, col in columns.items()},
+            }
+
 
-            source, target = self.edges[i[0]]
+    def iteredges(self, *attrs: str) -> Iterator[tuple]:
+        """
+        Iterate edges as named tuples.
+
+        Args:
+            attrs:
+                Attributes to include.
+        """
 
-            if not hyper:
+        return self._edge_records(attrs)
 
-                if self.directed:
 
-                    source = _misc.first(source)
-                    target = _misc.first(target)
+    def _edge_records(
+            self,
+            attrs: tuple[str, ...],
+            rows: np.ndarray | None = None,
+        ) -> Iterator[tuple]:
 
-                else:
+        Edge = _record_type(
+            'Edge',
+            (
+                ('source', str | int | tuple | set),
+                ('target', str | int | tuple | set),
+            ) +
+            tuple(
+                (a, _misc.df_dtype_to_builtin(self._attrs['edge'], a))
+                for a in attrs
+            ),
+        )
 
-                    source, *target = sorted(source | target)
-                    target = _misc.first(target) or source  # loop edge
+        for batch in self._edge_batches(attrs, _BATCH_SIZE, rows = rows):
 
-            yield Edge(
-                source,
-                target,
-                *(getattr(i[1], a, None) for a in attrs)
+            yield from map(
+                Edge._make,
+                pd.DataFrame(batch, copy = False).itertuples(index = False, name = None),
             )
 
 
@@ -251,30 +695,420 @@ class NetworkBase:
                 variables that uniquely define each node.
         """
 
-        Node = NamedTuple(
+        Node = _record_type(
             'Node',
-            [
-                ('key', str | int | tuple)
-            ] + [
-                (a, _misc.df_dtype_to_builtin(self.node_attrs, a))
+            (('key', str | int | tuple),) +
+            tuple(
+                (a, _misc.df_dtype_to_builtin(self._attrs['node'], a))
                 for a in attrs
+            ),
+        )
+
+        for batch in self.iternode_batches(*attrs, batch_size = _BATCH_SIZE):
+
+            yield from map(
+                Node._make,
+                pd.DataFrame(batch, copy = False).itertuples(index = False, name = None),
+            )
+
+
+    def _attr_entity(self, attr: str) -> str:
+        """
+        The entity of an attribute available for edge selection.
+        """
+
+        for entity in ('edge', 'edge_node'):
+
+            if attr in self._attrs[entity].columns:
+
+                return entity
+
+        raise ValueError(f'No such edge or edge-node attribute: `{attr}`.')
+
+
+    def add_index(self, *attrs: str, kind: str | None = None) -> None:
+        """
+        Create secondary indexes of edge or edge-node attributes.
+
+        The indexes are used by `select_edges`, and are shared by the copies
+        of the network. Replacing an attribute data frame drops its indexes;
+        after modifying the data frame in place, create the index again.
+
+        Args:
+            attrs:
+                Names of edge or edge-node attributes (columns of
+                `edge_attrs` or `edge_node_attrs`).
+            kind:
+                Either "category" or "sorted"; by default sorted for numeric
+                and categorical for any other column.
+        """
+
+        for attr in attrs:
+
+            entity = self._attr_entity(attr)
+            self._indexes[(entity, attr)] = _index.build_index(
+                self._attrs[entity][attr],
+                kind = kind,
+            )
+
+
+    def _select_rows(self, criteria: dict[str, Any]) -> np.ndarray:
+        """
+        Rows of the edge attributes data frame matching all criteria.
+
+        For each entity, the rows of the most selective indexed criterion
+        are looked up in its index, and only these rows are checked against
+        the other criteria.
+        """
+
+        by_entity = {}
+
+        for attr, criterion in criteria.items():
+
+            by_entity.setdefault(self._attr_entity(attr), {})[attr] = criterion
+
+        eids = self._edge_ids()
+        result = np.arange(len(eids))
+
+        for entity, entity_criteria in by_entity.items():
+
+            df = self._attrs[entity]
+            indexed = [
+                (self._indexes[(entity, attr)].count(criterion), attr)
+                for attr, criterion in entity_criteria.items()
+                if (entity, attr) in self._indexes
             ]
+            first = min(indexed)[1] if indexed else None
+            rows = (
+                self._indexes[(entity, first)].rows(entity_criteria[first])
+                    if first else
+                np.arange(len(df))
+            )
+
+            for attr, criterion in entity_criteria.items():
+
+                if attr != first and len(rows):
+
+                    values = df[attr] if len(rows) == len(df) else df[attr].iloc[rows]
+                    rows = rows[_index.scan(values, criterion)]
+
+            if entity == 'edge_node':
+
+                # edges with any edge-node pair matching all criteria
+                selected = np.unique(
+                    df[_nconstants.EDGE_ID].to_numpy()[rows]
+                )
+                rows = np.nonzero(np.isin(eids, selected))[0]
+
+            result = np.intersect1d(result, rows, assume_unique = True)
+
+        return result
+
+
+    def select_edges(self, **criteria: Any) -> NetworkView:
+        """
+        Select edges by their attributes.
+
+        Edges are selected if they match all criteria. Criteria on edge-node
+        attributes select the edges with at least one node matching all of
+        them. Indexed attributes are looked up in their indexes (see
+        `add_index`), the others are scanned.
+
+        Args:
+            criteria:
+                Attribute names and criteria: a value, None or NaN for
+                missing values; a set or list of values; for numeric
+                attributes, a tuple of the lower and upper bounds of a
+                range, either of them None; or a callable returning a
+                boolean array from the column. Indexes and scans select
+                the same edges (see `_index.match`).
+
+        Returns:
+            A view of the selected edges, referring to this network.
+        """
+
+        return NetworkView(self, self._select_rows(criteria))
+
+
+    def select_nodes(
+            self,
+            nodes: Iterable[Hashable],
+            induced: bool = False,
+        ) -> NetworkView:
+        """
+        Select the edges of nodes.
+
+        Args:
+            nodes:
+                Node keys; keys not in the network are ignored.
+            induced:
+                Select only the edges between the nodes, i.e. the edges all
+                nodes of which are in `nodes`. By default the edges with at
+                least one node in `nodes` are selected.
+
+        Returns:
+            A view of the selected edges, referring to this network.
+        """
+
+        codes = self._incidence.codes
+        nodes = np.array(
+            sorted({codes[n] for n in nodes if n in codes}),
+            dtype = np.int64,
+        )
+        pos = self._incidence.node_edge_pos(nodes, induced = induced)
+        selected = self._incidence.eids[pos]
+        eids = self._edge_ids()
+        rows = (
+            np.nonzero(np.isin(eids, selected))[0]
+                if len(selected) < len(eids) else
+            np.arange(len(eids))
         )
 
-        for key, vars in self.node_attrs.iterrows():
+        return NetworkView(self, rows)
+
+
+    def _subnetwork(self, rows: np.ndarray) -> NetworkBase:
+        """
+        A new network of the edges in certain rows of the edge attributes
+        data frame, and their nodes.
+        """
+
+        eids = self._edge_ids()[rows]
+        inc = self._incidence.subset(np.searchsorted(self._incidence.eids, eids))
+        edge_node = self._attrs['edge_node']
+        node = self._attrs['node']
+        attrs = {
+            'edge': self._attrs['edge'].iloc[rows],
+            'edge_node': (
+                edge_node[edge_node[_nconstants.EDGE_ID].isin(eids)]
+                    if _nconstants.EDGE_ID in edge_node.columns else
+                edge_node.copy()
+            ),
+            'node': (
+                node[node[_nconstants.NODE_KEY].isin(inc.keys)]
+                    if _nconstants.NODE_KEY in node.columns else
+                node.copy()
+            ),
+        }
+
+        net = self._from_parts(inc, attrs, self.node_key, self.directed)
+        net._intern_node_keys()
+        net._set_index()
 
-            yield Node(key, *(getattr(vars, a, None) for a in attrs))
+        return net
+
+
+    def save(self, path: str) -> None:
+        """
+        Save the network into a directory of columnar files.
+
+        The incidence arrays are saved in `.npy` files, the node keys and
+        the attribute data frames in Parquet files. Attribute values must be
+        representable in Arrow. The attribute indexes are not saved, only
+        their names and kinds, and are built again by `load`. Requires
+        `pyarrow`, from the `parquet` extra.
+
+        Args:
+            path:
+                Path to the directory, created if does not exist.
+        """
+
+        _fmt_columnar.save(self, path)
+
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> NetworkBase:
+        """
+        Load a network saved by `save`.
+
+        No bootstrap is necessary: the incidence arrays are memory-mapped,
+        and only the node keys and the attribute data frames are read.
+
+        Args:
+            path:
+                Path to the directory of the saved network.
+            mmap:
+                Memory-map the incidence arrays instead of reading them into
+                memory.
+        """
+
+        return _fmt_columnar.load(path, cls = cls, mmap = mmap)
+
+
+    def to_igraph(
+            self,
+            eattrs: str | Iterable[str] | None = None,
+            nattrs: str | Iterable[str] | None = None,
+        ) -> 'igraph.Graph':
+        """
+        Convert the network to an igraph graph.
+
+        Args:
+            eattrs:
+                Edge attributes to include.
+            nattrs:
+                Node attributes to include.
+        """
+
+        return _fmt_igraph.to_igraph(self, eattrs = eattrs, nattrs = nattrs)
+
+
+    def to_networkx(
+            self,
+            eattrs: str | Iterable[str] | None = None,
+            nattrs: str | Iterable[str] | None = None,
+        ) -> nx.Graph:
+        """
+        Convert the network to a NetworkX graph.
+
+        Args:
+            eattrs:
+                Edge attributes to include.
+            nattrs:
+                Node attributes to include.
+        """
+
+        return _fmt_networkx.to_networkx(self, eattrs = eattrs, nattrs = nattrs)
+
+
+    def to_corneto(
+            self,
+            eattrs: str | Iterable[str] | None = None,
+            nattrs: str | Iterable[str] | None = None,
+        ) -> cn.Graph:
+        """
+        Convert the network to a CORNETO graph.
+
+        Args:
+            eattrs:
+                Edge attributes to include.
+            nattrs:
+                Node attributes to include.
+        """
+
+        return _fmt_corneto.to_corneto(self, eattrs = eattrs, nattrs = nattrs)
+
+
+class NetworkView:
+    """
+    A subset of the edges of a network, without copying its data.
+
+    Created by `NetworkBase.select_edges`. Selecting from a view narrows it
+    down further; `to_network` creates an independent network of the
+    selected edges and their nodes.
+    """
+
+
+    def __init__(self, network: NetworkBase, rows: np.ndarray):
+        """
+        Args:
+            network:
+                The network the view refers to.
+            rows:
+                Sorted positions of the selected edges in the edge attributes
+                data frame of the network.
+        """
+
+        self.network = network
+        self._rows = rows
+
+
+    def __len__(self) -> int:
+
+        return self.ecount
+
+
+    @property
+    def ecount(self) -> int:
+        """
+        Number of edges.
+        """
+
+        return len(self._rows)
+
+
+    def __repr__(self) -> str:
+
+        return f'<{self.__class__.__name__} {self.ecount}E of {self.network!r}>'
+
+
+    @property
+    def eids(self) -> np.ndarray:
+        """
+        IDs of the selected edges.
+        """
+
+        return self.network._edge_ids()[self._rows]
+
+
+    @property
+    def edge_attrs(self) -> pd.DataFrame:
+        """
+        Attributes of the selected edges.
+        """
+
+        return self.network._attrs['edge'].iloc[self._rows]
+
+
+    def select_edges(self, **criteria: Any) -> NetworkView:
+        """
+        Select edges from the view, see `NetworkBase.select_edges`.
+        """
+
+        return NetworkView(
+            self.network,
+            np.intersect1d(self._rows, self.network._select_rows(criteria)),
+        )
+
+
+    def iteredge_batches(
+            self,
+            *attrs: str,
+            batch_size: int | None = None,
+            codes: bool = False,
+        ) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Iterate the selected edges in batches of arrays, see
+        `NetworkBase.iteredge_batches`.
+        """
+
+        return self.network._edge_batches(attrs, batch_size, codes, self._rows)
+
+
+    def iteredges(self, *attrs: str) -> Iterator[tuple]:
+        """
+        Iterate the selected edges as named tuples.
+        """
+
+        return self.network._edge_records(attrs, self._rows)
+
+
+    __iter__ = iteredges
+
+
+    def to_network(self) -> NetworkBase:
+        """
+        A new network of the selected edges and their nodes.
+        """
+
+        return self.network._subnetwork(self._rows)
 
 
 class Network:
     """
     A molecular interaction network.
+
+    The network is the subnetwork of the universe around the nodes of
+    interest. The universe is loaded only when the network is first used.
+    Named universes are loaded once per process, and shared read-only by all
+    instances (see the `_universe` module), hence only the subnetwork is
+    built for each instance.
     """
 
 
     def __init__(
         self,
-        universe: str | None = "omnipath", # this will be the initial graph ()
+        universe: str | Any | None = "omnipath", # this will be the initial graph ()
         noi: Noi | list[str] | list[list[str]] | dict[str, list[str]] = None,
     ):
         """
@@ -282,81 +1116,122 @@ class Network:
             universe:
                 The prior knowledge universe: a complete set of interactions
                 that the instance uses to extract subnetworks from and that
-                will be queried in operations applied on the instance.
+                will be queried in operations applied on the instance. Either
+                the name of a registered universe, a network (`NetworkBase`,
+                data frame, NetworkX or CORNETO graph), or a function
+                returning a network.
             noi:
-                Nodes of interest.
+                Nodes of interest. If not provided, the network is the whole
+                universe.
         """
 
-        self._co: cn.Graph = None
-        self._edges: pd.DataFrame = None
-        self._nodes: pd.DataFrame = None
+        self._network: NetworkBase | None = None
         self.universe = universe
         self.noi = noi
 
 
-    def _load(self):
+    @property
+    def network(self) -> NetworkBase:
         """
-        Populates the object from the universe (initial graph).
+        The network, loaded at the first access.
         """
-        if isinstance(self.universe, str):
-            self.universe = _universe.getattr(f'get_{self.universe}')
 
-        if callable(self.universe):
-            self.universe = self.universe()
+        if self._network is None:
 
-        type_dict = {
-            cn._graph.Graph: 'corneto',
-            nx.Graph: 'networkx',
-            nx.DiGraph: 'networkx',
-            pd.DataFrame: 'pandas',
-        }
+            self._load()
+
+        return self._network
 
-        getattr(self, f'_from_{type_dict[type(self.universe)]}')()
 
+    def _load(self):
+        """
+        Populates the object from the universe (initial graph).
+        """
 
-    def _from_corneto(self):
+        universe = (
+            _universe.get(self.universe)
+                if isinstance(self.universe, str) else
+            _universe.build(
+                self.universe()
+                    if callable(self.universe) else
+                self.universe
+            )
+        )
+        nodes = self._noi_nodes()
+        self._network = (
+            universe
+                if nodes is None else
+            universe.select_nodes(nodes).to_network()
+        )
 
-        self._co = self.universe
-        self._attrs_from_corneto()
 
+    def _noi_nodes(self) -> set[Hashable] | None:
+        """
+        Node keys of all nodes of interest.
+        """
 
-    def _from_networkx(self):
+        if self.noi is None:
 
-        self._co = utils.to_cornetograph(self.universe)
-        self._attrs_from_corneto()
+            return None
 
+        groups = (
+            self.noi.values()
+                if isinstance(self.noi, Mapping) else
+            [self.noi]
+        )
 
-    def _from_pandas(self):
+        return {
+            getattr(node, 'identifier', node)
+            for group in groups
+            for item in group
+            for node in (
+                item
+                    if isinstance(item, (list, tuple, set)) else
+                [item]
+            )
+        }
 
-        nxgraph = utils.network_from_df(self.universe)
-        self._co = utils.to_cornetograph(nxgraph)
-        self._attrs_from_corneto()
 
+    def _attrs(self, attrs: str | list[str] | None) -> tuple[list, list]:
+        """
+        The edge and node attributes found in the network.
+        """
 
-    def _attrs_from_corneto(self):
+        attrs = _misc.to_list(attrs)
+        # read only: the properties would copy the frames of the universe
+        network_attrs = self.network._attrs
 
-        self._nodes = utils.node_attrs_from_corneto(self._co)
-        self._edges = utils.edge_attrs_from_corneto(self._co)
+        return (
+            [a for a in attrs if a in network_attrs['edge'].columns],
+            [a for a in attrs if a in network_attrs['node'].columns],
+        )
 
 
-    def as_igraph(self, attrs: str | list[str]) -> "igraph.Graph":
+    def as_igraph(self, attrs: str | list[str] | None = None) -> "igraph.Graph":
         """
         Return the graph as an igraph object with the desired attributes.
         """
 
-        pass
+        eattrs, nattrs = self._attrs(attrs)
 
-    def as_nx(self, attrs: str | list[str]) -> nx.DiGraph:
+        return self.network.to_igraph(eattrs = eattrs, nattrs = nattrs)
+
+
+    def as_nx(self, attrs: str | list[str] | None = None) -> nx.DiGraph:
         """
-        Return the graph as an igraph object with the desired attributes.
+        Return the graph as a NetworkX object with the desired attributes.
         """
 
-        pass
+        eattrs, nattrs = self._attrs(attrs)
 
+        return self.network.to_networkx(eattrs = eattrs, nattrs = nattrs)
 
-    def as_corneto(self, attrs: str | list[str]) -> cn.Graph:
+
+    def as_corneto(self, attrs: str | list[str] | None = None) -> cn.Graph:
         """
-        Return the graph as an igraph object with the desired attributes.
+        Return the graph as a CORNETO object with the desired attributes.
         """
 
-        return self._co.copy()
+        eattrs, nattrs = self._attrs(attrs)
+
+        return self.network.to_corneto(eattrs = eattrs, nattrs = nattrs)
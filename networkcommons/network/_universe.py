@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+
+#
+# This file is part of the `networkcommons` Python module
+#
+# Copyright 2024
+# Heidelberg University Hospital
+#
+# File author(s): Saez Lab (omnipathdb@gmail.com)
+#
+# Distributed under the GPLv3 license
+# See the file `LICENSE` or read a copy at
+# https://www.gnu.org/licenses/gpl-3.0.txt
+#
+
+"""
+Registry of prior knowledge universes, loaded once per process.
+
+A universe is the complete network that `Network` objects extract their
+subnetworks from. Universes are loaded on first use, compiled into a
+`NetworkBase` and kept in a process-level cache. Each request gets a clone
+of the cached network sharing its data, hence the universe is shared
+read-only by all instances, and cloning it costs nearly nothing.
+"""
+
+from __future__ import annotations
+
+__all__ = ['build', 'clear', 'get', 'register', 'registered']
+
+from collections.abc import Callable
+from typing import Any
+import json
+import threading
+
+import lazy_import
+import pandas as pd
+import networkx as nx
+
+from networkcommons import _log
+
+from . import _network
+from . import _constants as _nconstants
+
+cn = lazy_import.lazy_module('corneto')
+_data_network = lazy_import.lazy_module('networkcommons.data.network')
+
+
+_REGISTRY: dict[str, Callable] = {}
+_CACHE: dict[tuple, _network.NetworkBase] = {}
+_LOCK = threading.RLock()
+# built in universes: functions in `networkcommons.data.network`
+_BUILTIN = {
+    'omnipath': 'get_omnipath',
+    'phosphositeplus': 'get_phosphositeplus',
+    'lianaplus': 'get_lianaplus',
+    'cosmos': 'get_cosmos_pkn',
+}
+
+
+def register(name: str, loader: Callable, replace: bool = False) -> None:
+    """
+    Register a universe.
+
+    Args:
+        name:
+            Name of the universe.
+        loader:
+            A function returning the universe network: a `NetworkBase`, a
+            data frame of edges, a NetworkX graph or a CORNETO graph. Keyword
+            arguments of `get` are passed to this function.
+        replace:
+            Replace the universe if a universe with the same name is
+            registered already; its cached networks are dropped.
+    """
+
+    with _LOCK:
+
+        if name in registered() and not replace:
+
+            raise ValueError(f'Universe `{name}` is registered already.')
+
+        _REGISTRY[name] = loader
+        clear(name)
+
+
+def registered() -> list[str]:
+    """
+    Names of the available universes.
+    """
+
+    return sorted(set(_BUILTIN) | set(_REGISTRY))
+
+
+def _loader(name: str) -> Callable:
+
+    if name in _REGISTRY:
+
+        return _REGISTRY[name]
+
+    if name in _BUILTIN:
+
+        return getattr(_data_network, _BUILTIN[name])
+
+    raise ValueError(
+        f'Unknown universe: `{name}`; '
+        f'available universes: {", ".join(registered())}.'
+    )
+
+
+def _cache_key(name: str, kwargs: dict) -> tuple:
+
+    return name, json.dumps(kwargs, sort_keys = True, default = str)
+
+
+def get(name: str, **kwargs) -> _network.NetworkBase:
+    """
+    A universe network, loaded only at the first request in the process.
+
+    Args:
+        name:
+            Name of a registered universe.
+        kwargs:
+            Passed to the loader of the universe; each combination of
+            arguments is loaded and cached separately.
+
+    Returns:
+        A clone of the cached network, sharing its data until accessed
+        (see `BootstrapCopy`): modifying it does not affect the cache or
+        other clones.
+    """
+
+    key = _cache_key(name, kwargs)
+
+    with _LOCK:
+
+        if key not in _CACHE:
+
+            _log(f'Universe `{name}`: loading.')
+            _CACHE[key] = build(_loader(name)(**kwargs))
+            _log(f'Universe `{name}`: loaded: {_CACHE[key]!r}.')
+
+        return _network.NetworkBase(_CACHE[key])
+
+
+def clear(name: str | None = None) -> None:
+    """
+    Remove universes from the cache.
+
+    Args:
+        name:
+            Remove only this universe, by default all.
+    """
+
+    with _LOCK:
+
+        for key in list(_CACHE):
+
+            if name is None or key[0] == name:
+
+                del _CACHE[key]
+
+
+def build(universe: Any) -> _network.NetworkBase:
+    """
+    Convert a network of any supported type to `NetworkBase`.
+
+    Args:
+        universe:
+            A `NetworkBase`, a data frame of edges with source and target
+            columns, a NetworkX graph or a CORNETO graph.
+    """
+
+    if isinstance(universe, _network.NetworkBase):
+
+        return universe
+
+    if isinstance(universe, pd.DataFrame):
+
+        return _network.NetworkBase(edges = universe)
+
+    if isinstance(universe, nx.Graph):
+
+        return _network.NetworkBase(
+            edges = nx.to_pandas_edgelist(universe),
+            nodes = pd.DataFrame.from_records(
+                [
+                    {_nconstants.DEFAULT_KEY: node, **attrs}
+                    for node, attrs in universe.nodes(data = True)
+                ],
+            ) if universe.number_of_nodes() else None,
+            directed = universe.is_directed(),
+        )
+
+    if isinstance(universe, cn.Graph):
+
+        return _from_corneto(universe)
+
+    raise TypeError(f'Can not use `{type(universe).__name__}` as universe.')
+
+
+def _from_corneto(graph: cn.Graph) -> _network.NetworkBase:
+
+    edges = pd.DataFrame.from_records([
+        {
+            'source': set(source),
+            'target': set(target),
+            **{k: v for k, v in attrs.items() if not k.startswith('__')},
+        }
+        for (source, target), attrs in zip(graph.E, graph.get_attr_edges())
+    ])
+    nodes = pd.DataFrame.from_records(graph.get_attr_vertices())
+    nodes.insert(0, _nconstants.DEFAULT_KEY, list(graph.V))
+
+    return _network.NetworkBase(edges = edges, nodes = nodes)
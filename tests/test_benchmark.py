@@ -0,0 +1,78 @@
+import json
+
+import pytest
+import networkx as nx
+
+from networkcommons import _benchmark
+
+
+def test_synthetic_pkn():
+
+    pkn = _benchmark.synthetic_pkn(1000, seed = 1)
+
+    assert isinstance(pkn, nx.DiGraph)
+    assert pkn.number_of_edges() == 1000
+    assert {d['sign'] for _, _, d in pkn.edges(data = True)} == {1, -1}
+    assert nx.utils.edges_equal(
+        pkn.edges(data = True),
+        _benchmark.synthetic_pkn(1000, seed = 1).edges(data = True),
+    )
+    assert not nx.utils.edges_equal(
+        pkn.edges(),
+        _benchmark.synthetic_pkn(1000, seed = 2).edges(),
+    )
+
+
+def test_synthetic_inputs():
+
+    pkn = _benchmark.synthetic_pkn(1000)
+    inputs = _benchmark.synthetic_inputs(pkn, n_sources = 3, n_targets = 10)
+
+    assert len(inputs['source_dict']) == 3
+    assert len(inputs['target_dict']) == 10
+    assert all(pkn.out_degree(s) for s in inputs['source_dict'])
+    assert all(pkn.in_degree(t) for t in inputs['target_dict'])
+    assert set(inputs['tf_regn'].target) <= set(inputs['target_dict'])
+    assert inputs['target_dict'] == _benchmark.synthetic_inputs(
+        pkn,
+        n_sources = 3,
+        n_targets = 10,
+    )['target_dict']
+
+
+def test_run_benchmarks_compare(tmp_path):
+
+    results = _benchmark.run_benchmarks(
+        sizes = ['1k'],
+        benchmarks = ['shortest_paths', 'ppr'],
+        repeat = 1,
+    )
+    path = tmp_path / 'results.json'
+    _benchmark.save_results(results, str(path))
+    baseline = _benchmark.load_results(str(path))
+
+    assert [r['benchmark'] for r in baseline['results']] == ['shortest_paths', 'ppr']
+    assert all(r['time'] > 0 and r['memory'] > 0 for r in baseline['results'])
+    assert not _benchmark.compare(results, baseline).regression.any()
+
+    slower = json.loads(json.dumps(results))
+    slower['results'][0]['time'] = baseline['results'][0]['time'] * 2
+    slower['results'][1]['memory'] = baseline['results'][1]['memory'] * 2
+
+    assert _benchmark.compare(slower, baseline).regression.tolist() == [True, True]
+    assert not _benchmark.compare(slower, baseline, 3, 3).regression.any()
+
+
+def test_run_benchmarks_all():
+
+    results = _benchmark.run_benchmarks(sizes = ['1k'], repeat = 1)
+
+    assert [r['benchmark'] for r in results['results']] == list(_benchmark.BENCHMARKS)
+    assert not [r['error'] for r in results['results'] if 'error' in r]
+
+
+def test_run_benchmarks_unknown():
+
+    with pytest.raises(ValueError, match = 'Unknown sizes'):
+
+        _benchmark.run_benchmarks(sizes = ['1m'])
@@ -4,8 +4,11 @@ import pandas as pd
 import numpy as np
 from unittest.mock import patch, MagicMock
 import random
+import scipy.stats
+import scipy.spatial.distance
 
 from networkcommons.eval import _metrics
+from networkcommons import methods
 
 
 @pytest.fixture
@@ -60,6 +63,12 @@ def test_get_recovered_offtargets(network):
     assert result['perc_offtargets'][0] == 2 / 3 * 100
 
 
+def test_get_recovered_offtargets_duplicates(network):
+    result = _metrics.get_recovered_offtargets(network, ['B', 'B', 'D', 'W', 'W'])
+    assert result['n_offtargets'][0] == 2
+    assert result['perc_offtargets'][0] == 2 / 3 * 100
+
+
 
 @patch('networkcommons.data.omics.panacea_experiments')
 @patch('networkcommons.data.omics.panacea_gold_standard')
@@ -161,6 +170,89 @@ def test_get_offtarget_panacea_evaluation(
     mock_log.assert_called_with("EVAL: finished offtarget recovery evaluation using PANACEA TF activity scores.")
 
 
+@patch('networkcommons.data.omics.panacea_experiments')
+@patch('networkcommons.data.omics.panacea_gold_standard')
+@patch('networkcommons.data.network.get_omnipath')
+@patch('networkcommons.utils.network_from_df')
+@patch('networkcommons.eval._metrics._offtarget_panacea_task')
+def test_get_offtarget_panacea_evaluation_partial(
+    mock_task,
+    mock_network_from_df,
+    mock_get_omnipath,
+    mock_panacea_gold_standard,
+    mock_panacea_experiments,
+    tmp_path,
+):
+    mock_panacea_experiments.return_value = pd.DataFrame({
+        'group': ['CellA_DrugA', 'CellA_DrugB', 'CellB_DrugA'],
+        'tf_scores': [True, True, True]
+    })
+    mock_panacea_gold_standard.return_value = pd.DataFrame(columns=['cmpd', 'target', 'rank'])
+    mock_task.side_effect = lambda cell_drug: (
+        None
+        if cell_drug == 'CellA_DrugB' else
+        pd.DataFrame({'perc_offtargets': [10.0], 'cell_drug': [cell_drug]})
+    )
+    partial_path = tmp_path / 'partial.tsv'
+
+    result_df = _metrics.get_offtarget_panacea_evaluation(partial_path=str(partial_path))
+
+    assert result_df.cell_drug.tolist() == ['CellA_DrugA', 'CellB_DrugA']
+    partial = pd.read_csv(partial_path, sep='\t')
+    assert sorted(partial.cell_drug) == ['CellA_DrugA', 'CellB_DrugA']
+    assert mock_task.call_count == 3
+    mock_get_omnipath.assert_called_once()
+    assert _metrics._SHARED == {}
+
+
+def test_gold_standard():
+    gold_standard = _metrics.GoldStandard(pd.DataFrame({
+        'cmpd': ['DrugA', 'DrugB', 'DrugA', 'DrugA', 'DrugB'],
+        'target': ['TargetA', 'TargetB', 'TargetC', 'TargetD', 'TargetA'],
+        'rank': [1, 1, 2, 3, 2],
+    }))
+
+    assert len(gold_standard) == 2
+    assert 'DrugA' in gold_standard
+    assert gold_standard.compounds == ['DrugA', 'DrugB']
+    assert gold_standard.primary_targets('DrugA').tolist() == ['TargetA']
+    assert gold_standard.offtargets('DrugA').tolist() == ['TargetC', 'TargetD']
+    assert gold_standard.offtargets('DrugB').tolist() == ['TargetA']
+    assert len(gold_standard.primary_targets('DrugC')) == 0
+
+
+def test_get_recovered_offtargets_gold_standard(network):
+    gold_standard = _metrics.GoldStandard(pd.DataFrame({
+        'cmpd': ['X', 'X', 'X', 'X', 'Y'],
+        'target': ['A', 'B', 'D', 'B', 'W'],
+        'rank': [1, 2, 3, 4, 1],
+    }))
+
+    result = _metrics.get_recovered_offtargets(network, gold_standard, compound='X')
+
+    assert result['n_offtargets'][0] == 2
+    assert result['perc_offtargets'][0] == 100.
+    assert np.isnan(_metrics.get_recovered_offtargets(network, gold_standard, compound='Y')['perc_offtargets'][0])
+
+    with pytest.raises(ValueError, match='compound'):
+        _metrics.get_recovered_offtargets(network, gold_standard)
+
+
+def test_get_recovered_offtargets_many(network):
+    networks = {'net1': network, 'net2': nx.DiGraph([('W', 'X')]), 'net3': nx.DiGraph()}
+    offtargets = ['B', 'D', 'W']
+
+    result = _metrics.get_recovered_offtargets(networks, offtargets)
+
+    assert result.network.tolist() == ['net1', 'net2', 'net3']
+    assert result.n_offtargets.tolist() == [2, 1, 0]
+    for name, graph in networks.items():
+        single = _metrics.get_recovered_offtargets(graph, offtargets)
+        row = result.set_index('network').loc[name]
+        assert row.n_offtargets == single.n_offtargets[0]
+        assert row.perc_offtargets == single.perc_offtargets[0]
+
+
 def test_all_nodes_in_ec50_dict():
     network = nx.Graph([(1, 2), (2, 3)])
     ec50_dict = {1: 5.0, 2: 10.0, 3: 15.0}
@@ -217,6 +309,58 @@ def test_empty_network():
     pd.testing.assert_frame_equal(result, expected_result)
 
 
+@pytest.mark.parametrize('elements', ['nodes', 'edges'])
+@pytest.mark.parametrize('metric', ['jaccard', 'hamming'])
+def test_get_network_distances(elements, metric):
+    networks = {f'net{i}': _random_graph(i, n=30, p=0.05) for i in range(6)}
+    networks['empty1'] = nx.DiGraph()
+    networks['empty2'] = nx.DiGraph()
+
+    sets = [set(getattr(graph, elements)) for graph in networks.values()]
+    universe = sorted(set().union(*sets))
+    indicators = np.array([[item in items for item in universe] for items in sets])
+    expected = scipy.spatial.distance.squareform(scipy.spatial.distance.pdist(indicators, metric))
+
+    result = _metrics.get_network_distances(networks, elements=elements, metric=metric)
+
+    assert list(result.index) == list(result.columns) == list(networks)
+    np.testing.assert_allclose(result.to_numpy(), expected)
+
+
+def test_get_network_distances_overlap():
+    networks = {
+        'a': nx.Graph([(1, 2), (2, 3)]),
+        'b': nx.Graph([(3, 2)]),
+        'c': nx.Graph([(4, 5)]),
+        'd': nx.Graph(),
+    }
+
+    result = _metrics.get_network_distances(networks, elements='edges', metric='overlap')
+
+    assert result.loc['a', 'b'] == 0.
+    assert result.loc['a', 'c'] == 1.
+    assert result.loc['a', 'd'] == 1.
+    assert result.loc['d', 'd'] == 0.
+
+    with pytest.raises(ValueError, match='Unknown distance'):
+        _metrics.get_network_distances(networks, metric='foo')
+
+
+def test_get_ec50_evaluation_batch():
+    networks = {
+        'shortest_path': nx.Graph([(1, 2), (2, 3)]),
+        'shortest_path__random001': nx.Graph([(1, 5)]),
+        'all_paths': nx.Graph([(6, 7)]),
+        'empty': nx.Graph(),
+    }
+    ec50_dict = {1: 5.0, 2: 10.0, 4: 20.0, 5: 1.0}
+
+    expected = _metrics.get_metric_from_networks(networks, _metrics.get_ec50_evaluation, ec50_dict=ec50_dict)
+    result = _metrics.get_ec50_evaluation_batch(networks, ec50_dict)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
 def test_run_ora():
     graph = nx.DiGraph()
     graph.add_nodes_from(["geneA", "geneB", "geneC", "geneD", "geneE", "geneF"])
@@ -243,6 +387,84 @@ def test_run_ora():
     pd.testing.assert_frame_equal(ora_results, expected_results)
 
 
+def test_get_phosphorylation_status_batch():
+    networks = {
+        'shortest_path': nx.DiGraph([('node1', 'node2'), ('node2', 'node5')]),
+        'shortest_path__random001': nx.DiGraph([('node3', 'node4')]),
+        'all_paths': nx.DiGraph([('node6', 'node7')]),
+        'empty': nx.DiGraph(),
+    }
+    dataframe = pd.DataFrame(
+        {'stat': [0.5, 1.5, -0.5, 0.0, -2.0]},
+        index=['node1', 'node2', 'node3', 'node4', 'node1'],
+    )
+
+    expected = _metrics.get_metric_from_networks(networks, _metrics.get_phosphorylation_status, dataframe=dataframe)
+    result = _metrics.get_phosphorylation_status_batch(networks, dataframe)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_hypergeom_sf():
+    rng = np.random.default_rng(0)
+    n = rng.integers(1, 300, 500)
+    N = rng.integers(1, 300, 500)
+    k = rng.integers(0, np.minimum(n, N) + 1)
+
+    np.testing.assert_allclose(
+        _metrics._hypergeom_sf(k, 2000, n, N),
+        scipy.stats.hypergeom.sf(k - 1, 2000, n, N),
+        rtol=1e-9,
+        atol=1e-300,
+    )
+
+
+@pytest.mark.parametrize('n_background', [20000, None])
+def test_run_ora_batch(n_background):
+    rng = np.random.default_rng(1)
+    genes = [f'gene{i}' for i in range(200)]
+    net = pd.DataFrame({
+        'source': [f'set{i}' for i in rng.integers(0, 30, 1000)],
+        'target': rng.choice(genes, 1000),
+    }).drop_duplicates()
+    networks = {
+        (f'm{i % 2}__random{i:03d}' if i > 1 else f'm{i}'): nx.DiGraph(
+            list(zip(rng.choice(genes + ['other'], 30), rng.choice(genes, 30)))
+        )
+        for i in range(8)
+    }
+
+    expected = _metrics.get_metric_from_networks(
+        networks,
+        _metrics.run_ora,
+        net=net,
+        n_background=n_background,
+    )
+    result = _metrics.run_ora_batch(networks, net, n_background=n_background)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_run_ora_batch_repeated_rows():
+    net = pd.DataFrame({
+        'source': ['set1', 'set1', 'set1', 'set2', 'set2'],
+        'target': ['A', 'B', 'B', 'C', 'D'],
+    })
+    networks = {'net1': nx.DiGraph([('A', 'B'), ('B', 'C')])}
+
+    expected = _metrics.get_metric_from_networks(networks, _metrics.run_ora, net=net.drop_duplicates())
+    result = _metrics.run_ora_batch(networks, net)
+
+    pd.testing.assert_frame_equal(_metrics.get_metric_from_networks(networks, _metrics.run_ora, net=net), expected)
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.loc[result['ora_Term'] == 'set1', 'ora_Set size'].tolist() == [2]
+
+
+def test_run_ora_batch_unsupported():
+    with pytest.raises(TypeError, match='min_n'):
+        _metrics.run_ora_batch({'net': nx.DiGraph([('A', 'B')])}, pd.DataFrame(), min_n=5)
+
+
 def test_get_phosphorylation_status():
     network = nx.DiGraph()
     network.add_nodes_from(['node1', 'node2', 'node3'])
@@ -394,6 +616,42 @@ def test_get_graph_metrics():
     assert 'network' not in metrics.columns
 
 
+def test_get_graph_metrics_selected():
+    network = nx.DiGraph([('A', 'B'), ('B', 'C'), ('C', 'D'), ('D', 'E')])
+
+    metrics = _metrics.get_graph_metrics(
+        network,
+        {'D': 1},
+        metrics=['closeness', 'eccentricity', 'diameter', 'nodes'],
+    )
+
+    assert list(metrics.columns) == ['Mean closeness', 'Mean eccentricity', 'Diameter', 'Number of nodes']
+    assert metrics['Mean eccentricity'].item() == 2.0
+    assert metrics['Diameter'].item() == 4
+
+    with pytest.raises(ValueError, match='Unknown graph metrics: foo'):
+        _metrics.get_graph_metrics(network, {}, metrics=['foo'])
+
+
+def test_get_graph_metrics_many():
+    networks = {
+        f'net{i}': nx.gnp_random_graph(20, 0.1, seed=i, directed=True)
+        for i in range(10)
+    }
+    target_dict = {0: 1, 1: 1, 'X': -1}
+
+    metrics = _metrics.get_graph_metrics(networks, target_dict, betweenness_k=10, seed=1)
+
+    assert metrics.network.tolist() == list(networks)
+    assert 'Mean betweenness stderr' in metrics.columns
+    for name, graph in networks.items():
+        row = metrics.set_index('network').loc[name]
+        assert row['Number of edges'] == graph.number_of_edges()
+        assert row['Mean degree'] == pytest.approx(_metrics.get_mean_degree(graph))
+        assert row['Mean closeness'] == pytest.approx(_metrics.get_mean_closeness(graph))
+        assert row['Connected targets'] == 2
+
+
 def test_get_graph_metrics_invalid_type():
     with pytest.raises(TypeError, match="The network must be a networkx graph or a dictionary of networkx graphs."):
         _metrics.get_graph_metrics(123, {})
@@ -410,6 +668,25 @@ def test_shuffle_dict_keys():
     assert shuffled_dict == expected_dict
 
 
+def test_get_metric_from_networks_parallel(monkeypatch):
+    networks = {
+        f'shortest_path__random{i:03d}' if i else 'shortest_path': nx.path_graph(i + 2, create_using=nx.DiGraph)
+        for i in range(12)
+    }
+    monkeypatch.setattr(_metrics, '_CHUNK_EDGES', 10)
+
+    chunks = _metrics._chunk_networks(networks)
+    serial = _metrics.get_metric_from_networks(networks, _metrics.get_recovered_offtargets, offtargets=[3, 4], timing=True)
+    parallel = _metrics.get_metric_from_networks(networks, _metrics.get_recovered_offtargets, n_jobs=2, offtargets=[3, 4])
+
+    assert 1 < len(chunks) < len(networks)
+    assert [name for chunk in chunks for name, _ in chunk] == list(networks)
+    assert serial.network.tolist() == list(networks)
+    assert (serial.time >= 0).all()
+    pd.testing.assert_frame_equal(serial.drop(columns='time'), parallel)
+    assert serial.n_offtargets.tolist() == [0, 0, 1] + [2] * 9
+
+
 def test_get_metric_from_networks_non_callable():
     networks = {
         'real_network__1': nx.path_graph(5),
@@ -465,3 +742,92 @@ def test_perform_random_controls_without_item_list(mock_shuffle, network):
     
 
 
+def _random_graph(seed, n=60, p=0.06):
+    graph = nx.gnp_random_graph(n, p, seed=seed, directed=True)
+    nx.set_edge_attributes(graph, {e: {'sign': (-1) ** sum(e)} for e in graph.edges})
+    return nx.relabel_nodes(graph, {i: f'N{i}' for i in graph.nodes})
+
+
+def test_perform_random_controls_labels_equivalent():
+    graph = _random_graph(1)
+    source_dict = {'N0': 1}
+    target_dict = {'N10': 1, 'N20': -1, 'N30': 1}
+
+    results = _metrics.perform_random_controls(
+        graph,
+        methods.run_shortest_paths,
+        3,
+        'sp',
+        randomise_measurements=False,
+        seed=7,
+        source_dict=source_dict,
+        target_dict=target_dict,
+    )
+
+    labels = np.array(list(graph.nodes), dtype=object)
+    for i, seed in enumerate(np.random.SeedSequence(7).spawn(3)):
+        perm = np.random.default_rng(seed).permutation(len(labels))
+        shuffled = nx.relabel_nodes(graph, dict(zip(labels, labels[perm])))
+        expected, _ = methods.run_shortest_paths(shuffled, source_dict, target_dict)
+        result = results[f'sp__random{i + 1:03d}']
+
+        assert set(result.edges) == set(expected.edges)
+        assert dict(result.edges) == dict(expected.edges)
+
+
+def test_perform_random_controls_edge_swap():
+    graph = _random_graph(2)
+    inference_function = lambda g, **kw: (g, None)
+
+    results = _metrics.perform_random_controls(
+        graph,
+        inference_function,
+        2,
+        'net',
+        randomise_measurements=True,
+        item_list=list(graph.nodes),
+        randomisation='edge_swap',
+        seed=1,
+        target_dict={'N1': 1},
+    )
+    again = _metrics.perform_random_controls(
+        graph,
+        inference_function,
+        2,
+        'net',
+        randomise_measurements=True,
+        item_list=list(graph.nodes),
+        randomisation='edge_swap',
+        seed=1,
+        target_dict={'N1': 1},
+    )
+
+    for name, randomised in results.items():
+        assert dict(randomised.in_degree) == dict(graph.in_degree)
+        assert dict(randomised.out_degree) == dict(graph.out_degree)
+        assert randomised.number_of_edges() == graph.number_of_edges()
+        assert nx.number_of_selfloops(randomised) == 0
+        assert set(randomised.edges) != set(graph.edges)
+        assert set(randomised.edges) == set(again[name].edges)
+
+    with pytest.raises(ValueError, match='Unknown randomisation'):
+        _metrics.perform_random_controls(graph, inference_function, 1, 'net', randomisation='foo')
+
+
+def test_perform_random_controls_parallel():
+    graph = _random_graph(3)
+    kwargs = {
+        'source_dict': {'N0': 1},
+        'target_dict': {'N10': 1, 'N20': -1},
+        'randomise_measurements': True,
+        'item_list': list(graph.nodes),
+        'seed': 5,
+    }
+
+    serial = _metrics.perform_random_controls(graph, methods.run_shortest_paths, 4, 'sp', **kwargs)
+    parallel = _metrics.perform_random_controls(graph, methods.run_shortest_paths, 4, 'sp', n_jobs=2, **kwargs)
+
+    assert list(serial) == list(parallel)
+    for name in serial:
+        assert set(serial[name].edges) == set(parallel[name].edges)
+    assert _metrics._SHARED == {}
@@ -0,0 +1,131 @@
+import pytest
+import networkx as nx
+import pandas as pd
+from unittest.mock import patch, MagicMock
+
+from networkcommons.eval import _metrics, _store
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def store(tmp_path):
+    return _store.EvalStore(str(tmp_path / 'store'))
+
+
+def test_fingerprint():
+    g1 = nx.DiGraph([('A', 'B', {'sign': 1}), ('B', 'C', {'sign': -1})])
+    g2 = nx.DiGraph([('B', 'C', {'sign': -1}), ('A', 'B', {'sign': 1})])
+    g3 = nx.DiGraph([('A', 'B', {'sign': -1}), ('B', 'C', {'sign': -1})])
+
+    assert _store.fingerprint(g1) == _store.fingerprint(g2)
+    assert _store.fingerprint(g1) != _store.fingerprint(g3)
+    assert _store.fingerprint({'a': 1, 'b': 2}) == _store.fingerprint({'b': 2, 'a': 1})
+    assert _store.fingerprint({'a': 1}) != _store.fingerprint({'a': 2})
+
+
+def test_fingerprint_content():
+    gs = pd.DataFrame({'cmpd': ['X', 'X', 'Y'], 'target': ['A', 'B', 'C'], 'rank': [1, 2, 1]})
+    gs1 = _metrics.GoldStandard(gs)
+    gs2 = _metrics.GoldStandard(gs.copy())
+    gs3 = _metrics.GoldStandard(gs.assign(target=['A', 'D', 'C']))
+
+    assert _store.fingerprint({'gs': gs1}) == _store.fingerprint({'gs': gs2})
+    assert _store.fingerprint({'gs': gs1}) != _store.fingerprint({'gs': gs3})
+    assert _store.fingerprint([{1, 2}]) == _store.fingerprint([{2, 1}])
+
+    with pytest.raises(TypeError, match='object'):
+        _store.fingerprint({'k': object()})
+
+
+def test_store_put_get(store):
+    unit = {'dataset': 'd', 'condition': 'c', 'method': 'm', 'params': {'k': 3}}
+    result = pd.DataFrame({'value': [1.0, 2.0]})
+
+    assert not store.has(**unit)
+    assert store.get(**unit) is None
+
+    store.put(result, **unit)
+
+    assert store.has(**unit)
+    assert not store.has(**{**unit, 'params': {'k': 4}})
+    pd.testing.assert_frame_equal(store.get(**unit), result)
+
+    store.put(result, **{**unit, 'method': 'm2'})
+    everything = store.read()
+
+    assert len(everything) == 4
+    assert set(everything._method) == {'m', 'm2'}
+    assert len(store.read(method='m2')) == 2
+    assert store.read(dataset='other').empty
+
+
+def test_get_metric_from_networks_store(store):
+    networks = {
+        'shortest_path': nx.DiGraph([('A', 'B'), ('B', 'C')]),
+        'shortest_path__random001': nx.DiGraph([('A', 'C')]),
+    }
+    function = MagicMock(
+        side_effect = lambda graph: pd.DataFrame({'n': [graph.number_of_nodes()]}),
+        __name__ = 'get_number_nodes',
+    )
+
+    first = _metrics.get_metric_from_networks(networks, function, store=store)
+    networks['all_paths'] = nx.DiGraph([('A', 'B')])
+    second = _metrics.get_metric_from_networks(networks, function, store=store)
+
+    assert function.call_count == 3
+    pd.testing.assert_frame_equal(first, second.iloc[:2])
+    assert second.n.tolist() == [3, 2, 2]
+    assert second.type.tolist() == ['real', 'random', 'real']
+
+
+@patch('networkcommons.eval._metrics.get_metric_from_networks')
+@patch('networkcommons.methods.run_corneto_carnival')
+@patch('networkcommons.methods.run_shortest_paths')
+@patch('networkcommons.data.omics.panacea_tables')
+def test_offtarget_panacea_task_resume(
+    mock_panacea_tables,
+    mock_run_shortest_paths,
+    mock_run_corneto_carnival,
+    mock_get_metric_from_networks,
+    store,
+):
+    graph = nx.DiGraph([('TargetA', 'Node1'), ('Node1', 'TargetB')])
+    _metrics._SHARED.update({
+        'graph': graph,
+        'gold_standard': _metrics.GoldStandard(pd.DataFrame({
+            'cmpd': ['DrugA', 'DrugA'],
+            'target': ['TargetA', 'TargetB'],
+            'rank': [1, 2],
+        })),
+        'store': store,
+        'pkn': _store.fingerprint(graph),
+    })
+    mock_panacea_tables.return_value = pd.DataFrame({'items': ['Node1'], 'act': [0.5]})
+    mock_get_metric_from_networks.side_effect = lambda networks, *args, **kwargs: (
+        pd.DataFrame({'perc_offtargets': 50.0, 'network': list(networks)})
+    )
+
+    for method in _metrics._PANACEA_METHODS:
+        if method != 'corneto':
+            store.put(
+                pd.DataFrame({'perc_offtargets': [10.0], 'network': [method], 'cell_drug': ['CellA_DrugA']}),
+                dataset='panacea',
+                condition='CellA_DrugA',
+                method=method,
+                params=_metrics._PANACEA_METHODS[method],
+                pkn=_metrics._SHARED['pkn'],
+            )
+
+    try:
+        result = _metrics._offtarget_panacea_task('CellA_DrugA')
+        again = _metrics._offtarget_panacea_task('CellA_DrugA')
+    finally:
+        _metrics._SHARED.clear()
+
+    mock_run_shortest_paths.assert_not_called()
+    mock_run_corneto_carnival.assert_called_once()
+    assert result.network.tolist() == list(_metrics._PANACEA_METHODS)
+    assert result.perc_offtargets.tolist() == [10.0] * 6 + [50.0]
+    pd.testing.assert_frame_equal(result, again)
@@ -0,0 +1,88 @@
+import pytest
+import networkx as nx
+import numpy as np
+
+from networkcommons.eval import _topology
+from networkcommons.methods import _snapshot
+
+
+@pytest.fixture
+def random_graphs():
+    return [
+        nx.gnp_random_graph(30, 0.08, seed=seed, directed=directed)
+        for seed in range(4)
+        for directed in (True, False)
+    ]
+
+
+@pytest.mark.parametrize('normalized', [True, False])
+def test_get_betweenness_exact(random_graphs, normalized):
+    for graph in random_graphs:
+        expected = nx.betweenness_centrality(graph, normalized=normalized)
+        result = _topology.get_betweenness(graph, normalized=normalized)
+
+        assert list(result.index) == list(graph.nodes)
+        np.testing.assert_allclose(
+            result.betweenness,
+            [expected[node] for node in graph.nodes],
+            atol=1e-12,
+        )
+        assert (result.stderr == 0).all()
+        assert result.attrs['mean_stderr'] == 0
+
+
+def test_get_betweenness_snapshot_blocks(random_graphs, monkeypatch):
+    graph = random_graphs[0]
+    expected = _topology.get_betweenness(graph)
+    monkeypatch.setattr(_topology, '_BLOCK_CELLS', 70)
+    result = _topology.get_betweenness(_snapshot.Snapshot(graph))
+
+    np.testing.assert_allclose(result.betweenness, expected.betweenness)
+    assert _topology._ADJACENCY == {}
+
+
+def test_get_betweenness_approximate():
+    graph = nx.gnp_random_graph(300, 0.02, seed=1, directed=True)
+    exact = _topology.get_betweenness(graph)
+    approx = _topology.get_betweenness(graph, k=100, seed=2)
+    again = _topology.get_betweenness(graph, k=100, seed=2)
+
+    np.testing.assert_array_equal(approx.betweenness, again.betweenness)
+    assert (approx.stderr > 0).any()
+    assert abs(approx.attrs['mean'] - exact.attrs['mean']) < 4 * approx.attrs['mean_stderr']
+
+
+def test_get_betweenness_parallel():
+    graph = nx.gnp_random_graph(60, 0.05, seed=3, directed=True)
+    serial = _topology.get_betweenness(graph)
+    parallel = _topology.get_betweenness(graph, n_jobs=2)
+
+    np.testing.assert_allclose(parallel.betweenness, serial.betweenness)
+
+
+@pytest.mark.parametrize('wf_improved', [True, False])
+def test_get_distance_metrics_closeness(random_graphs, wf_improved):
+    for graph in random_graphs:
+        expected = nx.closeness_centrality(graph, wf_improved=wf_improved)
+        result = _topology.get_distance_metrics(graph, wf_improved=wf_improved)
+
+        np.testing.assert_allclose(
+            result.closeness,
+            [expected[node] for node in graph.nodes],
+            atol=1e-12,
+        )
+
+
+def test_get_distance_metrics_eccentricity(monkeypatch):
+    graph = nx.connected_watts_strogatz_graph(40, 4, 0.1, seed=1)
+    expected = nx.eccentricity(graph)
+    monkeypatch.setattr(_topology, '_BLOCK_CELLS', 100)
+    result = _topology.get_distance_metrics(graph)
+
+    assert result.eccentricity.tolist() == [expected[node] for node in graph.nodes]
+    assert result.attrs['diameter'] == nx.diameter(graph)
+
+    path = _topology.get_distance_metrics(nx.DiGraph([('A', 'B'), ('B', 'C'), ('D', 'C')]))
+
+    assert path.eccentricity.tolist() == [2, 1, 0, 1]
+    assert path.attrs['diameter'] == 2
@@ -1,7 +1,10 @@
 import pytest
+import numpy as np
+import pandas as pd
 import networkx as nx
+import corneto as cn
 from networkcommons.network._formats._networkx import to_networkx
-from networkcommons.network._network import NetworkBase
+from networkcommons.network._network import NetworkBase, Network
 
 @pytest.fixture
 def small_network():
@@ -16,3 +19,158 @@ def test_to_networkx(small_network):
     #convert it to networkx
     netx = to_networkx(small_network)
     assert isinstance(netx, nx.Graph)
+
+
+@pytest.fixture
+def attr_network():
+
+    return NetworkBase(
+        edges = pd.DataFrame({
+            'source': ['A', 'B', 'C'],
+            'target': ['B', 'C', None],
+            'weight': [1., 2., 3.],
+        }),
+        nodes = pd.DataFrame({'_id': ['A', 'B'], 'color': ['red', 'blue']}),
+    )
+
+
+def test_to_networkx_attrs(attr_network):
+
+    netx = attr_network.to_networkx('weight', 'color')
+
+    assert isinstance(netx, nx.DiGraph)
+    assert list(netx.edges(data = 'weight')) == [('A', 'B', 1.), ('B', 'C', 2.)]
+    assert netx.nodes['B'] == {'color': 'blue'}
+    assert pd.isna(netx.nodes['C']['color'])
+
+
+def test_to_igraph(attr_network):
+
+    g = attr_network.to_igraph('weight', 'color')
+
+    assert g.is_directed()
+    assert g.vs['name'] == ['A', 'B', 'C']
+    assert g.vs['color'][:2] == ['red', 'blue']
+    assert [(g.vs[e.source]['name'], g.vs[e.target]['name']) for e in g.es] == [
+        ('A', 'B'),
+        ('B', 'C'),
+    ]
+    assert g.es['weight'] == [1., 2.]
+
+
+def test_export_empty(attr_network):
+
+    empty = attr_network.select_edges(weight = 10.).to_network()
+    g = empty.to_igraph('weight', 'color')
+
+    assert (g.vcount(), g.ecount()) == (0, 0)
+    assert empty.to_networkx('weight').number_of_edges() == 0
+    assert empty.to_corneto('weight').num_edges == 0
+
+    network = Network(
+        universe = pd.DataFrame({'source': ['A'], 'target': ['B']}),
+        noi = ['X'],
+    )
+
+    assert network.as_igraph().ecount() == 0
+
+
+def test_to_corneto(attr_network):
+
+    g = attr_network.to_corneto('weight', 'color')
+
+    assert g.E == (
+        (frozenset({'A'}), frozenset({'B'})),
+        (frozenset({'B'}), frozenset({'C'})),
+        (frozenset({'C'}), frozenset()),
+    )
+    assert [e['weight'] for e in g.get_attr_edges()] == [1., 2., 3.]
+    assert g.get_attr_vertex('A')['color'] == 'red'
+
+
+def test_hypergraph_export():
+
+    net = NetworkBase(
+        edges = pd.DataFrame({'source': [{'A', 'B'}], 'target': ['C']}),
+    )
+
+    assert net.to_corneto().E == ((frozenset({'A', 'B'}), frozenset({'C'})),)
+
+    with pytest.raises(ValueError, match = 'hypergraph'):
+
+        net.to_igraph()
+
+
+def test_network_as_nx():
+
+    network = Network(
+        universe = cn.Graph.from_sif_tuples([('A', 1, 'B'), ('B', -1, 'C')]),
+    )
+    netx = network.as_nx('interaction')
+
+    assert list(netx.edges(data = 'interaction')) == [('A', 'B', 1), ('B', 'C', -1)]
+    assert network.as_igraph('interaction').es['interaction'] == [1, -1]
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load(attr_network, tmp_path, mmap):
+
+    attr_network.save(str(tmp_path))
+    net = NetworkBase.load(str(tmp_path), mmap = mmap)
+
+    assert isinstance(net._incidence.edge_ptr, np.memmap) == mmap
+    assert net.edges == attr_network.edges
+    assert net.nodes == attr_network.nodes
+    assert net.directed and net.node_key == attr_network.node_key
+    assert list(net.iteredges('weight')) == list(attr_network.iteredges('weight'))
+    pd.testing.assert_frame_equal(
+        net.node_attrs.fillna({'color': ''}),
+        attr_network.node_attrs.fillna({'color': ''}),
+    )
+    pd.testing.assert_frame_equal(net.edge_attrs, attr_network.edge_attrs)
+
+
+def test_save_load_indexes(tmp_path):
+
+    network = NetworkBase(
+        edges = [
+            {'source': 'A', 'target': 'B', 'weight': 1.},
+            {'source': 'B', 'target': 'C', 'weight': 3.},
+        ],
+    )
+    network.add_index('weight')
+    network.add_index('_side', kind = 'category')
+    network.save(str(tmp_path))
+    net = NetworkBase.load(str(tmp_path))
+
+    assert {key: index.kind for key, index in net._indexes.items()} == {
+        ('edge', 'weight'): 'sorted',
+        ('edge_node', '_side'): 'category',
+    }
+    assert net.select_edges(weight = (2, None)).eids.tolist() == [1]
+    assert (
+        net.select_edges(_node_key = 'B', _side = 'source').eids.tolist() ==
+        [1]
+    )
+
+
+def test_save_load_composite_keys(tmp_path):
+
+    network = NetworkBase(
+        edges = [
+            {'source': ('A', 'human'), 'target': ('B', 'mouse'), 'sign': 1},
+            {'source': ('B', 'mouse'), 'target': ('A', 'human'), 'sign': -1},
+        ],
+        node_key = ('name', 'organism'),
+        directed = False,
+    )
+    network.save(str(tmp_path))
+    net = NetworkBase.load(str(tmp_path))
+
+    assert net.nodes == network.nodes
+    assert not net.directed
+    assert net.node_attrs.index.tolist() == [('A', 'human'), ('B', 'mouse')]
+    pd.testing.assert_frame_equal(
+        net.edge_node_attrs.reset_index(drop = True),
+        network.edge_node_attrs.reset_index(drop = True),
+    )
@@ -0,0 +1,12 @@
+import pytest
+
+from networkcommons import _imports
+
+
+def test_require():
+
+    assert _imports.require('json', 'parquet').dumps(1) == '1'
+
+    with pytest.raises(ImportError, match = r'networkcommons\[parquet\]'):
+
+        _imports.require('nonexistent_module.sub', 'parquet')
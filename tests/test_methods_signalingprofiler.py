@@ -0,0 +1,241 @@
+import pytest
+
+import pandas as pd
+import networkx as nx
+
+from networkcommons.methods import _signalingprofiler
+
+from unittest.mock import patch
+
+
+@pytest.fixture
+def gomf():
+
+    return pd.DataFrame({
+        'gene_name': ['K1', 'K2', 'P1', 'T1', 'T2', 'K1', 'K1'],
+        'mf': ['kin', 'kin', 'phos', 'tf', 'tf', 'tf', 'kin'],
+    })
+
+
+@pytest.fixture
+def mf_index(gomf):
+
+    with patch(
+        'networkcommons.methods._signalingprofiler._downloader._open',
+        return_value = gomf,
+    ) as mock_open:
+
+        _signalingprofiler._mf_index(update = True)
+
+        yield mock_open
+
+
+def test_mf_index(mf_index):
+
+    labels, index = _signalingprofiler._mf_index()
+
+    assert labels == ('kin', 'phos', 'tf')
+    assert index['K1'] == 0b101
+    assert index['P1'] == 0b010
+    assert index.dtype.itemsize == 1
+    mf_index.assert_called_once()
+
+
+def test_mf_index_many_labels(monkeypatch, tmp_path):
+
+    labels = [f'mf{i:02}' for i in range(10)]
+    gomf = pd.DataFrame({
+        'gene_name': ['G1'] * 10 + ['G2', 'G3'],
+        'mf': labels + ['mf07', 'mf09'],
+    })
+    monkeypatch.setattr(_signalingprofiler, '_MF_INDEX', {})
+    monkeypatch.setattr(
+        _signalingprofiler,
+        '_mf_index_path',
+        lambda: str(tmp_path / 'gomf_index.pickle'),
+    )
+
+    with patch(
+        'networkcommons.methods._signalingprofiler._downloader._open',
+        return_value = gomf,
+    ):
+
+        result, index = _signalingprofiler._mf_index(update = True)
+
+    assert result == tuple(labels)
+    assert index['G1'] == (1 << 10) - 1
+    assert index['G2'] == 1 << 7
+    assert index['G3'] == 1 << 9
+    assert index.dtype.itemsize == 2
+
+
+def test_mf_index_persisted(mf_index):
+
+    _signalingprofiler._MF_INDEX.clear()
+    labels, index = _signalingprofiler._mf_index()
+
+    assert labels == ('kin', 'phos', 'tf')
+    assert index['T2'] == 0b100
+    mf_index.assert_called_once()
+
+
+def test_mf_index_source_changed(mf_index, monkeypatch):
+
+    monkeypatch.setattr(_signalingprofiler, '_mf_source_stamp', lambda: (1, 1))
+    _signalingprofiler._mf_index()
+    _signalingprofiler._MF_INDEX.clear()
+    _signalingprofiler._mf_index()
+
+    assert mf_index.call_count == 2
+
+    monkeypatch.setattr(_signalingprofiler, '_mf_source_stamp', lambda: (2, 1))
+    _signalingprofiler._mf_index()
+
+    assert mf_index.call_count == 3
+
+
+def test_mf_classifier(mf_index):
+
+    proteins = {'K1': 1, 'P1': -1, 'T2': 1, 'X': -1}
+
+    result = _signalingprofiler._mf_classifier(proteins, with_exp = True)
+
+    assert result == {
+        'kin': {'K1': 1},
+        'phos': {'P1': -1},
+        'tf': {'K1': 1, 'T2': 1},
+        'other': {'X': -1},
+    }
+
+    result = _signalingprofiler._mf_classifier(
+        proteins,
+        only_proteins = ['K1', 'P1'],
+    )
+
+    assert result == {'kin': {'K1': ''}, 'phos': {'P1': ''}, 'tf': {'K1': ''}}
+    mf_index.assert_called_once()
+
+
+@pytest.fixture
+def layered_net():
+
+    network = nx.DiGraph()
+    network.add_edges_from(
+        [
+            ('S', 'K1', {'sign': 1}),
+            ('K1', 'P1', {'sign': -1}),
+            ('P1', 'T1', {'sign': -1}),
+            ('K1', 'X', {'sign': 1}),
+            ('X', 'T1', {'sign': 1}),
+            ('S', 'Y', {'sign': 1}),
+            ('Y', 'Z', {'sign': 1}),
+            ('Z', 'W', {'sign': 1}),
+            ('W', 'K2', {'sign': 1}),
+            ('K2', 'T2', {'sign': 1}),
+        ]
+    )
+
+    return network
+
+
+@pytest.mark.parametrize('layers, max_length', [(1, 3), (2, [2, 2]), (3, [1, 3])])
+def test_generate_naive_network_engines(mf_index, layered_net, layers, max_length):
+
+    sources = {'S': 1}
+    measurements = {'K1': 1, 'P1': -1, 'T1': 1, 'K2': 1, 'T2': 1, 'X': 1}
+
+    expected = _signalingprofiler._generate_naive_network(
+        sources,
+        measurements,
+        layered_net,
+        layers,
+        max_length,
+    )
+    result = _signalingprofiler._generate_naive_network(
+        sources,
+        measurements,
+        layered_net,
+        layers,
+        max_length,
+        engine = 'layered',
+    )
+
+    assert set(result.edges) == set(expected.edges)
+    assert all(
+        result.edges[e]['sign'] == layered_net.edges[e]['sign']
+        for e in result.edges
+    )
+
+
+def test_generate_naive_network_layered(mf_index, layered_net):
+
+    result = _signalingprofiler._generate_naive_network(
+        {'S': 1},
+        {'K1': 1, 'T1': 1, 'T2': 1},
+        layered_net,
+        2,
+        [1, 2],
+        engine = 'layered',
+    )
+
+    assert set(result.edges) == {
+        ('S', 'K1'),
+        ('K1', 'P1'),
+        ('P1', 'T1'),
+        ('K1', 'X'),
+        ('X', 'T1'),
+    }
+
+
+def test_generate_naive_network_invalid_engine(layered_net):
+
+    with pytest.raises(ValueError, match = 'engine'):
+
+        _signalingprofiler._generate_naive_network(
+            {'S': 1},
+            {'T1': 1},
+            layered_net,
+            1,
+            3,
+            engine = 'igraph',
+        )
+
+
+@pytest.mark.parametrize('n_jobs, engine', [(1, 'networkx'), (2, 'layered')])
+def test_run_signalingprofiler_batch(mf_index, layered_net, n_jobs, engine):
+
+    measurements = {
+        'sample1': {'K1': 1, 'P1': -1, 'T1': 1},
+        'sample2': {'K2': 1, 'T2': 1},
+    }
+
+    opt_nets, timings = _signalingprofiler.run_signalingprofiler_batch(
+        {'S': 1},
+        measurements,
+        layered_net,
+        2,
+        [2, 2],
+        solver = 'scipy',
+        n_jobs = n_jobs,
+        engine = engine,
+    )
+
+    assert set(opt_nets) == {'sample1', 'sample2'}
+    assert all(isinstance(net, nx.Graph) for net in opt_nets.values())
+    assert {'S', 'K1'} <= set(opt_nets['sample1'].nodes)
+    assert list(timings.columns) == ['sample', 'stage', 'time']
+    assert len(timings) == 4
+    assert set(timings.stage) == {'naive_network', 'carnival'}
+
+
+def test_run_signalingprofiler_batch_missing_sources(layered_net):
+
+    with pytest.raises(ValueError, match = 'sample2'):
+
+        _signalingprofiler.run_signalingprofiler_batch(
+            {'sample1': {'S': 1}},
+            {'sample1': {'T1': 1}, 'sample2': {'T1': 1}},
+            layered_net,
+            1,
+            3,
+        )
@@ -0,0 +1,58 @@
+import pytest
+
+import numpy as np
+import networkx as nx
+
+from networkcommons.methods import _snapshot
+
+
+@pytest.fixture
+def net():
+
+    network = nx.DiGraph()
+    network.add_edges_from(
+        [('A', 'B', {'sign': 1}), ('B', 'C', {'sign': -1}), ('A', 'D', {})]
+    )
+    network.add_node('E')
+
+    return network
+
+
+def test_snapshot(net):
+
+    snap = _snapshot.Snapshot(net, edge_attrs = 'sign')
+
+    assert len(snap) == 5
+    assert snap.ecount == 3
+    assert list(snap.labels) == ['A', 'B', 'C', 'D', 'E']
+    assert snap.indptr.tolist() == [0, 2, 3, 3, 3, 3]
+    assert snap.successors[0] == [1, 3]
+    np.testing.assert_array_equal(snap.edge_data['sign'], [1, np.nan, -1])
+
+
+def test_snapshot_undirected():
+
+    snap = _snapshot.Snapshot(nx.Graph([(1, 2), (2, 2)]))
+
+    assert snap.ecount == 3
+    assert snap.successors == [[1], [0, 1]]
+
+
+def test_distances(net):
+
+    snap = _snapshot.Snapshot(net)
+
+    assert snap.distances(['A']).tolist() == [0, 1, 2, 1, -1]
+    assert snap.distances(['A'], cutoff = 1).tolist() == [0, 1, -1, 1, -1]
+    assert snap.distances(['C'], reverse = True).tolist() == [2, 1, 0, -1, -1]
+    assert snap.distances(['X']).tolist() == [-1] * 5
+
+
+def test_to_networkx(net):
+
+    snap = _snapshot.Snapshot(net)
+    sub = snap.to_networkx([(0, 1), (1, 2)])
+
+    assert isinstance(sub, nx.DiGraph)
+    assert set(sub.edges) == {('A', 'B'), ('B', 'C')}
+    assert sub.edges['B', 'C']['sign'] == -1
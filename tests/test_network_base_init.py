@@ -117,3 +117,72 @@ def test_copy():
     assert (result.node_attrs.index == result.node_attrs[_c.NODE_KEY]).all()
     assert result.edge_attrs.index.is_monotonic_increasing
     assert (result.edge_attrs.index == result.edge_attrs[_c.EDGE_ID]).all()
+
+
+def test_copy_on_write():
+
+    edges = pd.DataFrame({
+        'source': ['a', 'b', 'a'],
+        'target': ['b', 'c', 'c'],
+        'weight': [1, 2, 3],
+    })
+    parent = _network.NetworkBase(edges = edges)
+    clone = _network.NetworkBase(parent)
+
+    assert clone._incidence is parent._incidence
+    assert clone.nodes['b'] == parent.nodes['b']
+
+    clone.edge_attrs.loc[0, 'weight'] = 10
+    parent.node_attrs['color'] = 'red'
+
+    assert parent.edge_attrs.weight.tolist() == [1, 2, 3]
+    assert clone.edge_attrs.weight.tolist() == [10, 2, 3]
+    assert 'color' not in clone.node_attrs.columns
+
+    grandchild = _network.NetworkBase(clone)
+    grandchild.edge_attrs['weight'] *= 2
+
+    assert clone.edge_attrs.weight.tolist() == [10, 2, 3]
+    assert grandchild.edge_attrs.weight.tolist() == [20, 4, 6]
+
+
+def test_copy_on_write_read_only():
+
+    parent = _network.NetworkBase(
+        edges = pd.DataFrame({
+            'source': ['a', 'b', 'a'],
+            'target': ['b', 'c', 'c'],
+            'weight': [1, 2, 3],
+        }),
+        nodes = pd.DataFrame({'_id': ['a', 'b', 'c'], 'color': ['r', 'g', 'b']}),
+    )
+    clone = _network.NetworkBase(parent, indexes = 'weight')
+
+    assert clone.select_edges(weight = (2, None)).ecount == 2
+    assert len(list(clone.iteredges('weight'))) == 3
+    assert len(list(clone.iternodes('color'))) == 3
+    assert clone.to_networkx(eattrs = ['weight']).number_of_edges() == 3
+
+    for entity, df in parent._attrs.items():
+
+        assert clone._attrs[entity] is df
+
+    assert clone._shared == parent._shared == set(parent._ATTRS)
+
+
+def test_node_keys_interned():
+
+    net = _network.NetworkBase(
+        edges = [
+            {'source': ('B', 9606), 'target': ('A', 9606)},
+            {'source': ('A', 9606), 'target': ('C', 10090)},
+        ],
+        node_key = ('uniprot', 'organism'),
+    )
+    node_keys = net.node_attrs[_c.NODE_KEY]
+    edge_node_keys = net.edge_node_attrs[_c.NODE_KEY]
+
+    assert isinstance(node_keys.dtype, pd.CategoricalDtype)
+    assert node_keys.cat.categories.equals(edge_node_keys.cat.categories)
+    assert node_keys.tolist() == [('A', 9606), ('B', 9606), ('C', 10090)]
+    assert (edge_node_keys == ('A', 9606)).sum() == 2
@@ -190,3 +190,29 @@ def test_edge_processing_with_custom_separator(toy_network_binary_str):
     assert 'A' in bs._nodes
     assert 'B' in bs._nodes
     assert 'C' in bs._nodes
+
+
+def test_bootstrap_mixed_cells_input_unchanged(toy_network_binary_str):
+
+    edges, nodes = toy_network_binary_str
+    edges = pd.DataFrame({
+        'source': [{'A', 'B'}, 'A;C', 'A;C', 'D'],
+        'target': ['B', {'C'}, 'D', 'D'],
+        'weight': [1, 2, 3, 4],
+    })
+    edges_original = edges.copy()
+    nodes_original = nodes.copy()
+    bs = BootstrapDf(edges = edges, nodes = nodes, node_key = 'id')
+
+    assert bs._edges == {
+        0: ({'A', 'B'}, {'B'}),
+        1: ({'A', 'C'}, {'C'}),
+        2: ({'A', 'C'}, {'D'}),
+        3: ({'D'}, {'D'}),
+    }
+    assert bs._nodes['A'] == ({0, 1, 2}, set())
+    assert bs._nodes['D'] == ({3}, {2, 3})
+    assert bs._edge_attrs[_c.EDGE_ID].tolist() == [0, 1, 2, 3]
+    assert set(bs._node_attrs['id']) == {'A', 'B', 'C', 'D'}
+    pd.testing.assert_frame_equal(edges, edges_original)
+    pd.testing.assert_frame_equal(nodes, nodes_original)
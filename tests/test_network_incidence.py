@@ -0,0 +1,148 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from networkcommons.network import _network
+from networkcommons.network import _incidence
+
+
+@pytest.fixture
+def adjacency():
+
+    edges = {
+        0: ({'a'}, {'b'}),
+        1: ({'b', 'c'}, {'d'}),
+        2: ({'d'}, {'d'}),
+    }
+    nodes = {
+        'a': ({0}, set()),
+        'b': ({1}, {0}),
+        'c': ({1}, set()),
+        'd': ({2}, {1, 2}),
+    }
+
+    return edges, nodes
+
+
+def test_from_dicts(adjacency):
+
+    edges, nodes = adjacency
+    inc = _incidence.Incidence.from_dicts(edges, nodes)
+
+    assert inc.ecount == 3
+    assert inc.ncount == 4
+    assert inc.edges == edges
+    assert inc.nodes == nodes
+    assert dict(inc.edges.items()) == edges
+    assert list(inc.nodes.values()) == list(nodes.values())
+    assert inc.edge_ptr.tolist() == [0, 2, 5, 7]
+    assert inc.node_ptr.tolist() == [0, 1, 3, 4, 7]
+    assert inc.hyper
+    assert not inc.edge_nodes.flags.writeable
+
+
+def test_views(adjacency):
+
+    inc = _incidence.Incidence.from_dicts(*adjacency)
+
+    assert 1 in inc.edges
+    assert 3 not in inc.edges
+    assert 'x' not in inc.edges
+    assert 'd' in inc.nodes
+    assert 'x' not in inc.nodes
+    assert ['x'] not in inc.nodes
+    assert inc.nodes.get('x') is None
+
+    with pytest.raises(KeyError):
+
+        inc.edges[5]
+
+
+def test_from_pairs_duplicates():
+
+    inc = _incidence.Incidence.from_pairs(
+        keys = ['a', 'b'],
+        eids = np.array([0, 1]),
+        edge = np.array([0, 0, 0, 1, 1]),
+        node = np.array([0, 1, 0, 1, 1]),
+        side = np.array([0, 1, 0, 0, 1]),
+    )
+
+    assert inc.edges == {0: ({'a'}, {'b'}), 1: ({'b'}, {'b'})}
+    assert inc.nodes == {'a': ({0}, set()), 'b': ({1}, {0, 1})}
+    assert not inc.hyper
+
+
+def test_network_base_incidence():
+
+    net = _network.NetworkBase(
+        edges = pd.DataFrame({
+            'source': ['a', 'b;c', 'd'],
+            'target': ['b', 'd', 'd'],
+        }),
+    )
+
+    assert isinstance(net._incidence, _incidence.Incidence)
+    assert net.hyper
+    assert net.ecount == 3
+    assert net.ncount == 4
+    assert net['d'] == ({2}, {1, 2})
+    assert net[1] == ({'b', 'c'}, {'d'})
+
+
+def test_iteredges():
+
+    net = _network.NetworkBase(
+        edges = pd.DataFrame({
+            'source': ['z', 'b', 'c'],
+            'target': ['b', 'b', 'a'],
+            'weight': [1., 2., 3.],
+        }),
+        directed = False,
+    )
+    batches = list(net.iteredge_batches('weight', batch_size = 2))
+
+    assert [len(b['source']) for b in batches] == [2, 1]
+    assert batches[0]['source'].tolist() == ['b', 'b']
+    assert batches[0]['target'].tolist() == ['z', 'b']
+    assert batches[1]['weight'].tolist() == [3.]
+    assert [tuple(e) for e in net.iteredges('weight')] == [
+        ('b', 'z', 1.),
+        ('b', 'b', 2.),
+        ('a', 'c', 3.),
+    ]
+    assert list(net)[0]._fields == ('source', 'target')
+
+    codes = next(net.iteredge_batches(codes = True))
+
+    assert net._incidence.keys[codes['target']].tolist() == ['z', 'b', 'c']
+
+
+def test_iteredges_hyper():
+
+    net = _network.NetworkBase(
+        edges = pd.DataFrame({
+            'source': [{'a', 'b'}, 'c'],
+            'target': ['c', 'a'],
+        }),
+    )
+
+    assert [tuple(e) for e in net.iteredges()] == [
+        ({'a', 'b'}, {'c'}),
+        ({'c'}, {'a'}),
+    ]
+
+    with pytest.raises(ValueError, match = 'hypergraphs'):
+
+        next(net.iteredge_batches(codes = True))
+
+
+def test_iternodes():
+
+    net = _network.NetworkBase(
+        edges = [('a', 'b')],
+        nodes = {'a': {'color': 'blue'}, 'b': {'color': 'red'}},
+    )
+
+    assert list(net.iternodes('color')) == [('a', 'blue'), ('b', 'red')]
+    assert next(net.iternode_batches('color'))['color'].tolist() == ['blue', 'red']
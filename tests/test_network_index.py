@@ -0,0 +1,165 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from networkcommons.network import _network
+from networkcommons.network import _index
+
+
+@pytest.fixture
+def net():
+
+    return _network.NetworkBase(
+        edges = pd.DataFrame({
+            'source': ['A', 'B', 'C', 'A', 'D'],
+            'target': ['B', 'C', 'D', 'C', 'A'],
+            'resource': ['X', 'Y', 'X', 'Z', 'X'],
+            'sign': [1, -1, 1, 1, -1],
+            'curation_effort': [1, 3, 2, np.nan, 5],
+        }),
+        indexes = ['resource', 'curation_effort'],
+    )
+
+
+def test_indexes():
+
+    values = pd.Series(['X', 'Y', 'X', None, 'Z'])
+    index = _index.build_index(values)
+
+    assert index.kind == 'category'
+    assert index.rows('X').tolist() == [0, 2]
+    assert index.rows({'Y', 'Z', 'W'}).tolist() == [1, 4]
+    assert index.rows('W').tolist() == []
+
+    values = pd.Series([3., 1., np.nan, 2., 5.])
+    index = _index.build_index(values)
+
+    assert index.kind == 'sorted'
+    assert index.rows((2, None)).tolist() == [0, 3, 4]
+    assert index.rows((None, 2)).tolist() == [1, 3]
+    assert index.rows([1, 5]).tolist() == [1, 4]
+    assert index.rows(lambda v: v > 2).tolist() == [0, 4]
+
+
+@pytest.mark.parametrize('kind', ['category', 'sorted'])
+@pytest.mark.parametrize(
+    'criterion',
+    [
+        2.,
+        np.nan,
+        None,
+        [1, np.nan],
+        {3, 5, 7},
+        (2, None),
+        (None, 3),
+        (2, 3),
+        lambda v: v > 2,
+        lambda v: v.isna(),
+    ],
+)
+def test_index_equals_scan(kind, criterion):
+
+    values = pd.Series([3., 1., np.nan, 2., 5., 2., np.nan])
+    index = _index.build_index(values, kind = kind)
+    rows = _index.scan(values, criterion)
+
+    assert index.rows(criterion).tolist() == rows.tolist()
+
+    if not callable(criterion):
+
+        assert index.count(criterion) == len(rows)
+
+
+@pytest.mark.parametrize(
+    'criterion',
+    ['X', None, ['X', None], ('X', 'Y'), lambda v: v == 'Z'],
+)
+def test_category_index_equals_scan(criterion):
+
+    values = pd.Series(['X', 'Y', None, 'Z', 'X', ('X', 'Y')], dtype = object)
+    index = _index.build_index(values)
+
+    assert index.rows(criterion).tolist() == _index.scan(values, criterion).tolist()
+
+
+def test_select_edges(net):
+
+    assert set(net._indexes) == {('edge', 'resource'), ('edge', 'curation_effort')}
+
+    view = net.select_edges(resource = 'X', sign = 1)
+
+    assert isinstance(view, _network.NetworkView)
+    assert view.eids.tolist() == [0, 2]
+    assert [tuple(e) for e in view.iteredges('sign')] == [
+        ('A', 'B', 1),
+        ('C', 'D', 1),
+    ]
+
+    view = net.select_edges(sign = 1, curation_effort = (2, None))
+
+    assert view.eids.tolist() == [2]
+    assert view.select_edges(resource = 'Y').ecount == 0
+    assert net.select_edges(resource = {'X', 'Z'}).select_edges(
+        curation_effort = (None, 4),
+    ).eids.tolist() == [0, 2]
+
+
+def test_select_edges_scan_equal(net):
+
+    criteria = {'resource': ['X', 'Y'], 'curation_effort': (1.5, 5)}
+    indexed = net.select_edges(**criteria).eids
+    net._indexes.clear()
+
+    assert net.select_edges(**criteria).eids.tolist() == indexed.tolist() == [1, 2, 4]
+
+
+def test_view_to_network(net):
+
+    sub = net.select_edges(resource = 'X').to_network()
+
+    assert isinstance(sub, _network.NetworkBase)
+    assert sub.ecount == 3
+    assert sub.ncount == 4
+    assert sub.edges == {0: ({'A'}, {'B'}), 2: ({'C'}, {'D'}), 4: ({'D'}, {'A'})}
+    assert sub.edge_attrs.resource.tolist() == ['X', 'X', 'X']
+    assert sub.select_edges(sign = -1).eids.tolist() == [4]
+
+
+def test_indexes_maintained(net):
+
+    copy = _network.NetworkBase(net)
+
+    assert copy._indexes == net._indexes
+
+    net.edge_attrs = net.edge_attrs.iloc[:2]
+
+    assert ('edge', 'resource') not in net._indexes
+    assert copy.select_edges(resource = 'X').ecount == 3
+
+    with pytest.raises(ValueError, match = 'No such'):
+
+        net.add_index('color')
+
+
+def test_indexes_clone_modified(net):
+
+    clone = _network.NetworkBase(net)
+    clone.edge_attrs.loc[clone.edge_attrs.resource == 'Y', 'resource'] = 'W'
+
+    assert clone.select_edges(resource = 'W').eids.tolist() == [1]
+    assert clone.select_edges(resource = 'Y').ecount == 0
+    assert net.select_edges(resource = 'Y').eids.tolist() == [1]
+    assert ('edge', 'resource') in net._indexes
+
+
+def test_select_edge_node_attrs():
+
+    net = _network.NetworkBase(
+        edges = [
+            {'source': 'A', 'target': 'B'},
+            {'source': 'B', 'target': 'C'},
+        ],
+    )
+    net.add_index('_side')
+
+    assert net.select_edges(_node_key = 'B', _side = 'source').eids.tolist() == [1]
@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from networkcommons.network import _network
+from networkcommons.network._bootstrap import _stream
+
+
+@pytest.fixture
+def edges():
+
+    return pd.DataFrame({
+        'source': ['A', 'B', 'C;D', 'A', 'E'],
+        'target': ['B', 'C', 'A', 'E', 'B'],
+        'sign': [1, -1, 1, 1, -1],
+        'resource': ['X', 'Y', 'X', 'W', 'Z'],
+    })
+
+
+def _assert_same(net, ref):
+
+    assert net.edges == ref.edges
+    assert net.nodes == ref.nodes
+    assert net.directed == ref.directed
+    pd.testing.assert_frame_equal(net.node_attrs, ref.node_attrs)
+    pd.testing.assert_frame_equal(
+        net.edge_attrs,
+        ref.edge_attrs,
+        check_dtype = False,
+    )
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'tsv', 'parquet'])
+def test_from_file(edges, tmp_path, fmt):
+
+    path = tmp_path / f'edges.{fmt}'
+
+    if fmt == 'parquet':
+
+        edges.to_parquet(path, index = False)
+
+    else:
+
+        edges.to_csv(path, sep = ',' if fmt == 'csv' else '\t', index = False)
+
+    net = _network.NetworkBase.from_file(str(path), chunksize = 2)
+
+    _assert_same(net, _network.NetworkBase(edges = edges))
+
+
+def test_from_file_sif(tmp_path):
+
+    path = tmp_path / 'pkn.sif'
+    path.write_text('A\t1\tB\nB\t-1\tC\nC\t1\tA\n')
+    net = _network.NetworkBase.from_file(
+        str(path),
+        chunksize = 2,
+        indexes = 'interaction',
+        directed = False,
+    )
+
+    assert net.ecount == 3
+    assert net.edge_attrs.interaction.tolist() == [1, -1, 1]
+    assert net.select_edges(interaction = 1).eids.tolist() == [0, 2]
+    assert not net.directed
+
+
+def test_from_file_unknown(tmp_path):
+
+    with pytest.raises(ValueError, match = 'guess the format'):
+
+        _network.NetworkBase.from_file(str(tmp_path / 'edges.xyz'))
+
+
+def test_buffer():
+
+    buffer = _stream._Buffer(capacity = 2)
+    buffer.extend(np.array([1, 2, 3]))
+    buffer.extend(np.array([4.5]))
+    buffer.extend(np.array(['x'], dtype = object))
+
+    assert len(buffer) == 5
+    assert buffer.array().tolist() == [1, 2, 3, 4.5, 'x']
+    assert len(buffer) == 0
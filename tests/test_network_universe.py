@@ -0,0 +1,88 @@
+import pytest
+import pandas as pd
+
+from networkcommons.network import _network
+from networkcommons.network import _universe
+
+
+@pytest.fixture
+def universe():
+
+    calls = []
+
+    def loader(**kwargs):
+
+        calls.append(kwargs)
+
+        return pd.DataFrame({
+            'source': ['a', 'b', 'c', 'd'],
+            'target': ['b', 'c', 'd', 'a'],
+            'sign': [1, -1, 1, 1],
+        })
+
+    _universe.register('test', loader, replace = True)
+
+    yield calls
+
+    _universe.clear('test')
+    _universe._REGISTRY.pop('test')
+
+
+def test_universe_cached(universe):
+
+    net1 = _universe.get('test')
+    net2 = _universe.get('test')
+
+    assert len(universe) == 1
+    assert net1 is not net2
+    assert net1._incidence is net2._incidence
+    assert net1.ecount == 4
+
+    net1.edge_attrs['sign'] = 0
+
+    assert _universe.get('test').edge_attrs['sign'].tolist() == [1, -1, 1, 1]
+
+    _universe.get('test', organism = 10090)
+
+    assert universe == [{}, {'organism': 10090}]
+
+
+def test_universe_unknown():
+
+    with pytest.raises(ValueError, match = 'Unknown universe'):
+
+        _universe.get('nonexistent')
+
+    with pytest.raises(ValueError, match = 'registered already'):
+
+        _universe.register('omnipath', lambda: None)
+
+
+def test_network_noi(universe):
+
+    net1 = _network.Network(universe = 'test', noi = ['a'])
+    net2 = _network.Network(universe = 'test', noi = {'g1': ['b', 'c']})
+
+    assert not universe
+    assert net1.network.edges == {0: ({'a'}, {'b'}), 3: ({'d'}, {'a'})}
+    assert net2.network.ncount == 4
+    assert len(universe) == 1
+    whole = _network.Network(universe = 'test')
+    whole.as_nx('sign')
+    whole.as_igraph('sign')
+
+    assert whole.network._attrs['edge'] is _universe._CACHE[_universe._cache_key('test', {})]._attrs['edge']
+
+
+def test_select_nodes():
+
+    net = _network.NetworkBase(
+        edges = pd.DataFrame({
+            'source': ['a', 'b', 'c'],
+            'target': ['b', 'c', 'a'],
+        }),
+    )
+
+    assert net.select_nodes(['a', 'x']).eids.tolist() == [0, 2]
+    assert net.select_nodes(['a', 'b'], induced = True).eids.tolist() == [0]
+    assert net.select_nodes(['x']).ecount == 0
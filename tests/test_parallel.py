@@ -0,0 +1,39 @@
+import pytest
+
+from networkcommons import _conf
+from networkcommons import _parallel
+
+from unittest.mock import patch
+
+
+@pytest.fixture
+def cpu_conf():
+
+    original = _conf.get('cpu_count')
+    _conf.setup(cpu_count = 2)
+
+    yield
+
+    _conf.setup(cpu_count = original)
+
+
+@patch('networkcommons._parallel.multiprocessing.cpu_count', return_value = 8)
+def test_cpu_count(mock_cpu_count):
+
+    assert _parallel.cpu_count() == _conf.get('cpu_count', default = 8)
+    assert _parallel.cpu_count(3) == 3
+
+
+@patch('networkcommons._parallel.multiprocessing.cpu_count', return_value = 8)
+def test_cpu_count_config(mock_cpu_count, cpu_conf):
+
+    assert _parallel.cpu_count() == 2
+    assert _parallel.cpu_count(3) == 3
+
+
+def test_serial_executor():
+
+    with _parallel.executor(n_jobs = 1) as ex:
+
+        assert isinstance(ex, _parallel.SerialExecutor)
+        assert ex.submit(sum, [1, 2]).result() == 3